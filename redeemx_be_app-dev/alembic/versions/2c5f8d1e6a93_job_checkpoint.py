@@ -0,0 +1,29 @@
+"""job checkpoints
+
+Revision ID: 2c5f8d1e6a93
+Revises: f1c8e4a2b7d9
+Create Date: 2026-10-20 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2c5f8d1e6a93'
+down_revision: Union[str, None] = 'f1c8e4a2b7d9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('job') as batch_op:
+        batch_op.add_column(sa.Column('checkpoint', sa.TEXT().with_variant(mysql.LONGTEXT(), 'mysql'), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('job') as batch_op:
+        batch_op.drop_column('checkpoint')
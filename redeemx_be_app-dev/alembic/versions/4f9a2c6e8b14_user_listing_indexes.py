@@ -0,0 +1,39 @@
+"""user listing indexes
+
+Revision ID: 4f9a2c6e8b14
+Revises: b8e1d4a7c253
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f9a2c6e8b14'
+down_revision: Union[str, None] = 'b8e1d4a7c253'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ('ix_user_is_user_created_at', 'user', ['is_user', 'created_at', 'id']),
+    ('ix_user_is_vendor_created_at', 'user', ['is_vendor', 'created_at', 'id']),
+]
+
+
+def upgrade() -> None:
+    for index_name, table_name, columns in INDEXES:
+        if op.get_bind().dialect.name == 'mysql':
+            op.execute(
+                f"CREATE INDEX `{index_name}` ON `{table_name}` "
+                f"({', '.join(f'`{column}`' for column in columns)}) ALGORITHM=INPLACE LOCK=NONE"
+            )
+        else:
+            op.create_index(index_name, table_name, columns, unique=False)
+
+
+def downgrade() -> None:
+    for index_name, table_name, columns in reversed(INDEXES):
+        op.drop_index(index_name, table_name=table_name)
@@ -0,0 +1,97 @@
+"""initial schema
+
+The tables as the application created them before migrations were introduced,
+so an existing database can be stamped at this revision.
+
+Revision ID: 5b0e7d2c4a91
+Revises: 
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b0e7d2c4a91'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('user',
+    sa.Column('id', sa.String(length=255), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('username', sa.String(length=30), nullable=False),
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('password', sa.String(length=255), nullable=False),
+    sa.Column('email', sa.String(length=255), nullable=False),
+    sa.Column('emp_id', sa.String(length=255), nullable=True),
+    sa.Column('mobile_number', sa.String(length=255), nullable=False),
+    sa.Column('is_vendor', sa.Boolean(), nullable=False),
+    sa.Column('is_user', sa.Boolean(), nullable=False),
+    sa.Column('is_admin', sa.Boolean(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('email')
+    )
+    op.create_table('dailyreports',
+    sa.Column('id', sa.String(length=255), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('points_redeemed_by_employees', sa.Integer(), nullable=False),
+    sa.Column('vendor_balance_points', sa.Integer(), nullable=False),
+    sa.Column('points_redeemed_by_vendor', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('vendor',
+    sa.Column('id', sa.String(length=255), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('vendor_name', sa.String(length=100), nullable=False),
+    sa.Column('description', sa.String(length=500), nullable=True),
+    sa.Column('qr_code', sa.TEXT(), nullable=True),
+    sa.Column('user_id', sa.String(length=255), nullable=True),
+    sa.Column('bank_name', sa.String(length=100), nullable=False),
+    sa.Column('account_holder_name', sa.String(length=100), nullable=False),
+    sa.Column('account_number', sa.String(length=20), nullable=False),
+    sa.Column('ifsc_code', sa.String(length=11), nullable=False),
+    sa.Column('branch_name', sa.String(length=100), nullable=False),
+    sa.Column('aadhar_card', sa.String(length=12), nullable=False),
+    sa.Column('pan_card', sa.String(length=10), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id'),
+    sa.UniqueConstraint('vendor_name')
+    )
+    op.create_table('claim',
+    sa.Column('id', sa.String(length=255), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('vendor_id', sa.String(length=255), nullable=False),
+    sa.Column('points', sa.Integer(), nullable=False),
+    sa.Column('status', sa.Enum('PENDING', 'APPROVED', 'REJECTED', name='claim_status'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('admin_name', sa.String(length=255), nullable=True),
+    sa.Column('transaction_reference_id', sa.String(length=50), nullable=True),
+    sa.ForeignKeyConstraint(['vendor_id'], ['vendor.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('transaction',
+    sa.Column('id', sa.String(length=255), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('points', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.String(length=255), nullable=True),
+    sa.Column('vendor_id', sa.String(length=255), nullable=True),
+    sa.Column('description', sa.String(length=255), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.ForeignKeyConstraint(['vendor_id'], ['vendor.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('transaction')
+    op.drop_table('claim')
+    op.drop_table('vendor')
+    op.drop_table('dailyreports')
+    op.drop_table('user')
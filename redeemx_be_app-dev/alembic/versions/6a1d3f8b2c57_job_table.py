@@ -0,0 +1,48 @@
+"""job table
+
+Revision ID: 6a1d3f8b2c57
+Revises: 4f9a2c6e8b14
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6a1d3f8b2c57'
+down_revision: Union[str, None] = '4f9a2c6e8b14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('job',
+    sa.Column('id', sa.String(length=255), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('kind', sa.String(length=64), nullable=False),
+    sa.Column('status', sa.String(length=16), nullable=False),
+    sa.Column('created_by', sa.String(length=255), nullable=True),
+    sa.Column('filename', sa.String(length=255), nullable=True),
+    sa.Column('processed', sa.Integer(), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=True),
+    sa.Column('message', sa.String(length=255), nullable=True),
+    sa.Column('error', sa.TEXT(), nullable=True),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('payload', sa.LargeBinary().with_variant(mysql.LONGBLOB(), 'mysql'), nullable=True),
+    sa.Column('summary', sa.TEXT(), nullable=True),
+    sa.Column('result', sa.TEXT().with_variant(mysql.LONGTEXT(), 'mysql'), nullable=True),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_job_status_updated_at', 'job', ['status', 'updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_job_status_updated_at', table_name='job')
+    op.drop_table('job')
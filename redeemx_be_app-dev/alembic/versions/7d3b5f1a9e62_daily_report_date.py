@@ -0,0 +1,31 @@
+"""daily report date
+
+Revision ID: 7d3b5f1a9e62
+Revises: e2a6c9f04b58
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d3b5f1a9e62'
+down_revision: Union[str, None] = 'e2a6c9f04b58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing rows were written once per claim request and keep a NULL report_date.
+    with op.batch_alter_table('dailyreports') as batch_op:
+        batch_op.add_column(sa.Column('report_date', sa.Date(), nullable=True))
+        batch_op.create_unique_constraint('report_date', ['report_date'])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('dailyreports') as batch_op:
+        batch_op.drop_constraint('report_date', type_='unique')
+        batch_op.drop_column('report_date')
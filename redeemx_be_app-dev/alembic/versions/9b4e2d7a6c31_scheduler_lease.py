@@ -0,0 +1,50 @@
+"""scheduler lease and run history
+
+Revision ID: 9b4e2d7a6c31
+Revises: c3e7a9d15f20
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b4e2d7a6c31'
+down_revision: Union[str, None] = 'c3e7a9d15f20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('schedulerlease',
+    sa.Column('name', sa.String(length=64), nullable=False),
+    sa.Column('owner', sa.String(length=255), nullable=True),
+    sa.Column('lease_until', sa.DateTime(), nullable=True),
+    sa.Column('last_scheduled_for', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.create_table('schedulerrun',
+    sa.Column('id', sa.String(length=255), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('name', sa.String(length=64), nullable=False),
+    sa.Column('scheduled_for', sa.DateTime(), nullable=False),
+    sa.Column('owner', sa.String(length=255), nullable=False),
+    sa.Column('status', sa.String(length=16), nullable=False),
+    sa.Column('catch_up', sa.Boolean(), nullable=False),
+    sa.Column('message', sa.String(length=255), nullable=True),
+    sa.Column('error', sa.TEXT(), nullable=True),
+    sa.Column('started_at', sa.DateTime(), nullable=False),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.Column('duration_ms', sa.Integer(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_schedulerrun_name_scheduled_for', 'schedulerrun', ['name', 'scheduled_for'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_schedulerrun_name_scheduled_for', table_name='schedulerrun')
+    op.drop_table('schedulerrun')
+    op.drop_table('schedulerlease')
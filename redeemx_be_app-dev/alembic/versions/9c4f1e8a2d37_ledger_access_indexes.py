@@ -0,0 +1,54 @@
+"""ledger access indexes
+
+Revision ID: 9c4f1e8a2d37
+Revises: a4d8f2b61e39
+Create Date: 2026-10-18 10:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c4f1e8a2d37'
+down_revision: Union[str, None] = 'a4d8f2b61e39'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ('ix_transaction_user_id_created_at', 'transaction', ['user_id', 'created_at', 'points']),
+    ('ix_transaction_vendor_id_created_at', 'transaction', ['vendor_id', 'created_at', 'user_id', 'points']),
+    ('ix_transaction_created_at', 'transaction', ['created_at', 'user_id', 'vendor_id', 'points']),
+    ('ix_claim_vendor_id_status_created_at', 'claim', ['vendor_id', 'status', 'created_at']),
+    ('ix_claim_status_created_at', 'claim', ['status', 'created_at']),
+]
+
+
+def _existing_indexes(table_name):
+    return {index['name'] for index in sa.inspect(op.get_bind()).get_indexes(table_name)}
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    for index_name, table_name, columns in INDEXES:
+        # Databases created by create_db_and_tables() after these indexes were
+        # declared on the models already have them.
+        if not context.is_offline_mode() and index_name in _existing_indexes(table_name):
+            continue
+        if bind.dialect.name == 'mysql':
+            # Build without blocking reads or ledger writes on the live table.
+            op.execute(
+                f"CREATE INDEX `{index_name}` ON `{table_name}` "
+                f"({', '.join(f'`{column}`' for column in columns)}) ALGORITHM=INPLACE LOCK=NONE"
+            )
+        else:
+            op.create_index(index_name, table_name, columns, unique=False)
+
+
+def downgrade() -> None:
+    for index_name, table_name, columns in reversed(INDEXES):
+        if index_name in _existing_indexes(table_name):
+            op.drop_index(index_name, table_name=table_name)
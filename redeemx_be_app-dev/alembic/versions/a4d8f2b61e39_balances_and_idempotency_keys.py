@@ -0,0 +1,104 @@
+"""materialized balances and idempotency keys
+
+Revision ID: a4d8f2b61e39
+Revises: 5b0e7d2c4a91
+Create Date: 2026-10-18 10:15:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4d8f2b61e39'
+down_revision: Union[str, None] = '5b0e7d2c4a91'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _existing_tables():
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def upgrade() -> None:
+    # Databases created by create_db_and_tables() after these tables were
+    # declared on the models already have them, kept in step by the app.
+    existing = set() if context.is_offline_mode() else _existing_tables()
+    now = sa.func.now()
+    transaction = sa.table('transaction',
+                           sa.column('points', sa.Integer()),
+                           sa.column('user_id', sa.String()),
+                           sa.column('vendor_id', sa.String()))
+
+    if 'userbalance' not in existing:
+        userbalance = op.create_table('userbalance',
+        sa.Column('user_id', sa.String(length=255), nullable=False),
+        sa.Column('points', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+        sa.PrimaryKeyConstraint('user_id')
+        )
+        # Backfill from the existing ledger.
+        op.execute(
+            userbalance.insert().from_select(
+                ['user_id', 'points', 'updated_at'],
+                sa.select(transaction.c.user_id, sa.func.sum(transaction.c.points), now)
+                .where(transaction.c.user_id.isnot(None))
+                .group_by(transaction.c.user_id)
+            )
+        )
+
+    if 'vendorbalance' not in existing:
+        vendorbalance = op.create_table('vendorbalance',
+        sa.Column('vendor_id', sa.String(length=255), nullable=False),
+        sa.Column('received_points', sa.Integer(), nullable=False),
+        sa.Column('claimed_points', sa.Integer(), nullable=False),
+        sa.Column('pending_claim_points', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['vendor_id'], ['vendor.id'], ),
+        sa.PrimaryKeyConstraint('vendor_id')
+        )
+        # Backfill from the existing ledger and pending claims, one row per vendor.
+        vendor = sa.table('vendor', sa.column('id', sa.String()))
+        claim = sa.table('claim',
+                         sa.column('vendor_id', sa.String()),
+                         sa.column('points', sa.Integer()),
+                         sa.column('status', sa.String()))
+
+        def ledger_sum(points, *conditions):
+            return (sa.select(sa.func.coalesce(sa.func.sum(points), 0))
+                    .where(transaction.c.vendor_id == vendor.c.id, *conditions)
+                    .scalar_subquery())
+
+        pending = (sa.select(sa.func.coalesce(sa.func.sum(claim.c.points), 0))
+                   .where(claim.c.vendor_id == vendor.c.id, claim.c.status == 'PENDING')
+                   .scalar_subquery())
+        op.execute(
+            vendorbalance.insert().from_select(
+                ['vendor_id', 'received_points', 'claimed_points', 'pending_claim_points', 'updated_at'],
+                sa.select(vendor.c.id,
+                          ledger_sum(-transaction.c.points, transaction.c.points < 0),
+                          ledger_sum(transaction.c.points, transaction.c.points > 0),
+                          pending, now)
+            )
+        )
+
+    if 'idempotencykey' not in existing:
+        op.create_table('idempotencykey',
+        sa.Column('id', sa.String(length=64), nullable=False),
+        sa.Column('request_hash', sa.String(length=64), nullable=False),
+        sa.Column('status_code', sa.Integer(), nullable=True),
+        sa.Column('response_body', sa.TEXT(), nullable=True),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_idempotencykey_expires_at', 'idempotencykey', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_idempotencykey_expires_at', table_name='idempotencykey')
+    op.drop_table('idempotencykey')
+    op.drop_table('vendorbalance')
+    op.drop_table('userbalance')
@@ -0,0 +1,49 @@
+"""keyset pagination indexes
+
+Revision ID: b8e1d4a7c253
+Revises: 7d3b5f1a9e62
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8e1d4a7c253'
+down_revision: Union[str, None] = '7d3b5f1a9e62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Put id right after created_at so a (created_at, id) keyset page is read in index order.
+INDEXES = [
+    ('ix_transaction_user_id_created_at', 'transaction',
+     ['user_id', 'created_at', 'points'], ['user_id', 'created_at', 'id', 'points']),
+    ('ix_transaction_vendor_id_created_at', 'transaction',
+     ['vendor_id', 'created_at', 'user_id', 'points'], ['vendor_id', 'created_at', 'id', 'user_id', 'points']),
+]
+
+
+def _replace_index(index_name, table_name, columns):
+    if op.get_bind().dialect.name == 'mysql':
+        # Swap the definition in one online ALTER so the ledger is never left without the index.
+        op.execute(
+            f"ALTER TABLE `{table_name}` DROP INDEX `{index_name}`, "
+            f"ADD INDEX `{index_name}` ({', '.join(f'`{column}`' for column in columns)}), "
+            f"ALGORITHM=INPLACE, LOCK=NONE"
+        )
+    else:
+        op.drop_index(index_name, table_name=table_name)
+        op.create_index(index_name, table_name, columns, unique=False)
+
+
+def upgrade() -> None:
+    for index_name, table_name, old_columns, new_columns in INDEXES:
+        _replace_index(index_name, table_name, new_columns)
+
+
+def downgrade() -> None:
+    for index_name, table_name, old_columns, new_columns in INDEXES:
+        _replace_index(index_name, table_name, old_columns)
@@ -0,0 +1,32 @@
+"""roster grant guard
+
+Revision ID: c3e7a9d15f20
+Revises: 6a1d3f8b2c57
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3e7a9d15f20'
+down_revision: Union[str, None] = '6a1d3f8b2c57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('rostergrant',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('roster_size', sa.Integer(), nullable=False),
+    sa.Column('transaction_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('day')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('rostergrant')
@@ -0,0 +1,36 @@
+"""pending redemption totals
+
+Revision ID: d6c1b8e3f472
+Revises: 9b4e2d7a6c31
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd6c1b8e3f472'
+down_revision: Union[str, None] = '9b4e2d7a6c31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('pendingtotal',
+    sa.Column('transaction_id', sa.String(length=255), nullable=False),
+    sa.Column('vendor_id', sa.String(length=255), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('points', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['transaction_id'], ['transaction.id'], ),
+    sa.ForeignKeyConstraint(['vendor_id'], ['vendor.id'], ),
+    sa.PrimaryKeyConstraint('transaction_id')
+    )
+    op.create_index('ix_pendingtotal_vendor_id', 'pendingtotal', ['vendor_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_pendingtotal_vendor_id', table_name='pendingtotal')
+    op.drop_table('pendingtotal')
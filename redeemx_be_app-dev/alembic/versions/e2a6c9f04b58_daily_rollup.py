@@ -0,0 +1,50 @@
+"""daily rollup
+
+Revision ID: e2a6c9f04b58
+Revises: 9c4f1e8a2d37
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a6c9f04b58'
+down_revision: Union[str, None] = '9c4f1e8a2d37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    dailyrollup = op.create_table('dailyrollup',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('vendor_id', sa.String(length=255), nullable=False),
+    sa.Column('has_user', sa.Boolean(), nullable=False),
+    sa.Column('points', sa.Integer(), nullable=False),
+    sa.Column('transaction_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'vendor_id', 'has_user')
+    )
+
+    # Backfill from the existing ledger.
+    transaction = sa.table('transaction',
+                           sa.column('created_at', sa.DateTime()),
+                           sa.column('points', sa.Integer()),
+                           sa.column('user_id', sa.String()),
+                           sa.column('vendor_id', sa.String()))
+    day = sa.func.date(transaction.c.created_at)
+    vendor_id = sa.func.coalesce(transaction.c.vendor_id, '')
+    has_user = transaction.c.user_id.isnot(None)
+    op.execute(
+        dailyrollup.insert().from_select(
+            ['day', 'vendor_id', 'has_user', 'points', 'transaction_count'],
+            sa.select(day, vendor_id, has_user, sa.func.sum(transaction.c.points), sa.func.count())
+            .group_by(day, vendor_id, has_user)
+        )
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('dailyrollup')
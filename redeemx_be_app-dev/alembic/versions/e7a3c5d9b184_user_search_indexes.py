@@ -0,0 +1,40 @@
+"""user search indexes
+
+Revision ID: e7a3c5d9b184
+Revises: d6c1b8e3f472
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a3c5d9b184'
+down_revision: Union[str, None] = 'd6c1b8e3f472'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ('ix_user_name', 'user', ['name']),
+    ('ix_user_username', 'user', ['username']),
+    ('ix_user_emp_id', 'user', ['emp_id']),
+]
+
+
+def upgrade() -> None:
+    for index_name, table_name, columns in INDEXES:
+        if op.get_bind().dialect.name == 'mysql':
+            op.execute(
+                f"CREATE INDEX `{index_name}` ON `{table_name}` "
+                f"({', '.join(f'`{column}`' for column in columns)}) ALGORITHM=INPLACE LOCK=NONE"
+            )
+        else:
+            op.create_index(index_name, table_name, columns, unique=False)
+
+
+def downgrade() -> None:
+    for index_name, table_name, columns in reversed(INDEXES):
+        op.drop_index(index_name, table_name=table_name)
@@ -0,0 +1,38 @@
+"""job uploads kept as files
+
+Revision ID: f1c8e4a2b7d9
+Revises: e7a3c5d9b184
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c8e4a2b7d9'
+down_revision: Union[str, None] = 'e7a3c5d9b184'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Jobs still queued with an inline upload cannot be run from a file; fail them so they are resubmitted.
+    op.execute(
+        "UPDATE job SET status = 'failed', message = 'Failed', "
+        "error = 'Upload stored before an upgrade; please upload the file again' "
+        "WHERE status IN ('queued', 'running') AND payload IS NOT NULL"
+    )
+    with op.batch_alter_table('job') as batch_op:
+        batch_op.add_column(sa.Column('payload_path', sa.String(length=1024), nullable=True))
+        batch_op.drop_column('payload')
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('job') as batch_op:
+        batch_op.add_column(sa.Column('payload', sa.LargeBinary().with_variant(mysql.LONGBLOB(), 'mysql'),
+                                      nullable=True))
+        batch_op.drop_column('payload_path')
@@ -0,0 +1,24 @@
+from dataclasses import dataclass
+from dotenv import load_dotenv
+import os
+
+load_dotenv()
+
+
+@dataclass(frozen=True)
+class AuthSettings:
+    """JWT signing configuration, read from the environment once at import."""
+    secret_key: str
+    algorithm: str
+    token_cache_size: int
+
+
+def load_auth_settings() -> AuthSettings:
+    return AuthSettings(
+        secret_key=os.getenv("SECRET_KEY"),
+        algorithm=os.getenv("ALGORITHM"),
+        token_cache_size=int(os.getenv("TOKEN_CACHE_SIZE", "10000")),
+    )
+
+
+auth_settings = load_auth_settings()
@@ -1,20 +1,24 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-import jwt
-import os
+
+from src.auth.utils import decode_access_token
+from src.auth.service import token_cache
 
 security = HTTPBearer()
 
 def validate_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
     token = credentials.credentials  
-    payload = jwt.decode(token, os.getenv('SECRET_KEY'), algorithms=os.getenv('ALGORITHM'))
+    payload = token_cache.get(token)
+    if payload is None:
+        payload = decode_access_token(token)
+        token_cache.put(token, payload)
     
     if not payload:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid token: user ID not found",
         )
-    return payload
+    return dict(payload)
 
 
-auth_user:dict=Depends(validate_token)
\ No newline at end of file
+auth_user:dict=Depends(validate_token)
@@ -2,13 +2,13 @@ from fastapi import APIRouter, Response, Request
 from sqlmodel import Session, select, or_
 from typing import Annotated,Any
 import os
-from src.database import session
+from src.database import async_session
 from dotenv import load_dotenv
 
 
 from src.user.models import User
 from src.response import RestResponse
-from src.user.utils import verify_password
+from src.user.utils import verify_password_in_pool
 from src.auth.utils import create_access_token
 from src.auth.schemas import UserLoginSchema
 from src.logging_config import logger
@@ -19,19 +19,25 @@ router = APIRouter()
 
 
 @router.post('/login')
-def user_login(user: UserLoginSchema, request:Request, response:Response, session=session):
+async def user_login(user: UserLoginSchema, request:Request, response:Response, session=async_session):
     request_info = f"{request.method} {request.url.path}"
     logger.info(f"Login attempt - Request: {request_info}, User: {user.email}:{user.emp_id}, IP: {request.client.host}")
-    db_user = session.exec(select(User).where(or_(User.email==user.email, User.emp_id==user.emp_id))).first()
+    db_user = (await session.exec(select(User).where(or_(User.email==user.email, User.emp_id==user.emp_id)))).first()
     if not db_user:
         logger.error(f"Failed login - Request: {request_info}, User: {user.email}:{user.emp_id}, Reason: Invalid Email/Employee ID")
         response.status_code = 400
         return RestResponse(error="Invalid Email/Employee Id")
     
-    if not verify_password(user.password, db_user.password):
+    valid, new_hash = await verify_password_in_pool(user.password, db_user.password)
+    if not valid:
         logger.error(f"Failed login - Request: {request_info}, User: {user.email}:{user.emp_id}, Reason: Invalid Password")
         response.status_code = 400
         return RestResponse(error="Invalid Password")
+    if new_hash:
+        # Stored with a different bcrypt cost; upgrade it now that the plain password is known.
+        db_user.password = new_hash
+        session.add(db_user)
+        logger.info(f"Password rehashed - Request: {request_info}, User: {db_user.email}")
     
     token = create_access_token(data={"email":db_user.email, 
                                       "user_id":str(db_user.id), 
@@ -0,0 +1,68 @@
+from collections import OrderedDict
+from threading import Lock
+import hashlib
+import time
+
+from src.auth.constants import auth_settings
+
+
+class TokenCache:
+    """Bounded LRU of verified JWT payloads, keyed by the token's SHA-256.
+
+    An entry is only served until the token's own `exp`, so caching never
+    extends a token's lifetime. Tokens without `exp` are not cached.
+    """
+
+    def __init__(self, max_size:int):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(token:str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token:str):
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= time.time():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, token:str, payload:dict):
+        expires_at = payload.get("exp")
+        if expires_at is None or self.max_size <= 0:
+            return
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (payload, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+token_cache = TokenCache(auth_settings.token_cache_size)
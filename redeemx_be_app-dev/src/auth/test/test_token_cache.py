@@ -0,0 +1,80 @@
+import jwt
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from fastapi import FastAPI, Depends
+from fastapi.testclient import TestClient
+
+from src.auth.constants import auth_settings
+from src.auth.dependencies import validate_token
+from src.auth.service import TokenCache, token_cache
+from src.auth.utils import create_access_token, decode_access_token
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    token_cache.clear()
+    yield
+    token_cache.clear()
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+
+    @app.get("/me")
+    def me(auth_user=Depends(validate_token)):
+        return auth_user
+
+    return TestClient(app)
+
+
+def test_repeated_token_is_decoded_once(client):
+    token = create_access_token({"user_id": "employee", "is_user": True})
+    headers = {"Authorization": f"Bearer {token}"}
+
+    with patch("src.auth.dependencies.decode_access_token", wraps=decode_access_token) as decode:
+        for _ in range(5):
+            assert client.get("/me", headers=headers).json()["user_id"] == "employee"
+    assert decode.call_count == 1
+    assert token_cache.stats()["hits"] == 4
+    assert token_cache.stats()["misses"] == 1
+
+
+def test_cached_payload_expires_with_the_token():
+    cache = TokenCache(max_size=10)
+    cache.put("live", {"user_id": "a", "exp": (datetime.utcnow() + timedelta(minutes=5)).timestamp()})
+    cache.put("expired", {"user_id": "b", "exp": (datetime.utcnow() - timedelta(seconds=1)).timestamp()})
+    cache.put("no-exp", {"user_id": "c"})
+
+    assert cache.get("live")["user_id"] == "a"
+    assert cache.get("expired") is None
+    assert cache.get("no-exp") is None
+    assert cache.stats()["size"] == 1
+
+
+def test_cache_evicts_least_recently_used():
+    cache = TokenCache(max_size=2)
+    exp = (datetime.utcnow() + timedelta(minutes=5)).timestamp()
+    cache.put("a", {"exp": exp})
+    cache.put("b", {"exp": exp})
+    cache.get("a")
+    cache.put("c", {"exp": exp})
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+
+
+def test_expired_token_is_still_rejected(client):
+    token = jwt.encode({"user_id": "employee", "exp": datetime.utcnow() - timedelta(seconds=5)},
+                       auth_settings.secret_key, algorithm=auth_settings.algorithm)
+    with pytest.raises(jwt.ExpiredSignatureError):
+        client.get("/me", headers={"Authorization": f"Bearer {token}"})
+    assert token_cache.stats()["size"] == 0
+
+
+def test_callers_cannot_modify_the_cached_payload(client):
+    token = create_access_token({"user_id": "employee", "is_user": True})
+    first = validate_token(type("Credentials", (), {"credentials": token})())
+    first["is_admin"] = True
+    assert "is_admin" not in validate_token(type("Credentials", (), {"credentials": token})())
@@ -1,17 +1,16 @@
 from datetime import datetime, timedelta
-import os
 import jwt
 
+from src.auth.constants import auth_settings
+
 
 def create_access_token(data: dict):
     to_encode = data.copy()
     expire = datetime.utcnow()+timedelta(hours=24)
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, os.getenv("SECRET_KEY"), algorithm=os.getenv("ALGORITHM"))
+    encoded_jwt = jwt.encode(to_encode, auth_settings.secret_key, algorithm=auth_settings.algorithm)
     return encoded_jwt
 
 def decode_access_token(token: str):
-    payload = jwt.decode(token, os.getenv("SECRET_KEY"), algorithms=os.getenv("ALGORITHM"))
+    payload = jwt.decode(token, auth_settings.secret_key, algorithms=[auth_settings.algorithm])
     return payload
-
-    
\ No newline at end of file
@@ -0,0 +1,161 @@
+"""Compare the async balance-read and redemption routes with their sync equivalents.
+
+Both modes serve the same handlers against the same database: the sync side
+runs them as plain `def` routes on a Session (one threadpool thread per
+request, 40 by default), the async side is the real router on an
+AsyncSession. Point --sync-url/--async-url at MySQL to measure real round
+trips; the default is a throwaway SQLite file.
+
+    python3 src/benchmarks/async_routes.py --requests 2000 --concurrency 10 50 200
+"""
+import sys
+import os
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+os.environ.setdefault("ALGORITHM", "HS256")
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from typing import Optional
+
+import httpx
+from fastapi import FastAPI, APIRouter, Request, Response, Header
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import SQLModel, Session, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.database import session, get_session, get_async_session
+from src.auth.dependencies import auth_user
+from src.auth.utils import create_access_token
+from src.user.models import User
+from src.vendor.models import Vendor
+from src.transaction.models import Transaction
+from src.transaction.schemas import TransactionUserInputSchema
+from src.transaction.service import record_transaction, get_user_balance, settle_pending_totals
+from src.transaction.router import router as transaction_router, _user_vendor_transaction
+from src.idempotency import run_idempotent
+
+sync_router = APIRouter()
+
+
+@sync_router.get("/user/points")
+def sync_user_points(response:Response, session=session, auth_user=auth_user):
+    return {"data": {"points": get_user_balance(session, auth_user.get("user_id"))}}
+
+
+@sync_router.post("/user/vendor/transaction")
+def sync_user_vendor_transaction(request:Request, transaction:TransactionUserInputSchema, response:Response, session=session,
+                                 auth_user=auth_user, idempotency_key:Optional[str] = Header(None, alias="Idempotency-Key")):
+    result = run_idempotent(session, response, idempotency_key, auth_user.get("user_id"), "transaction.user_vendor", transaction,
+                            lambda: _user_vendor_transaction(request, transaction, response, session, auth_user))
+    settle_pending_totals(session)
+    return result
+
+
+def build_app(sync_url, async_url):
+    engine = create_engine(sync_url)
+    async_engine = create_async_engine(async_url)
+
+    def override_session():
+        with Session(engine) as db:
+            try:
+                yield db
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+
+    async def override_async_session():
+        async with AsyncSession(async_engine, expire_on_commit=False) as db:
+            try:
+                yield db
+                await db.commit()
+            except Exception:
+                await db.rollback()
+                raise
+
+    app = FastAPI()
+    app.include_router(transaction_router, prefix="/async")
+    app.include_router(sync_router, prefix="/sync")
+    app.dependency_overrides[get_session] = override_session
+    app.dependency_overrides[get_async_session] = override_async_session
+    return app, engine, async_engine
+
+
+def seed(engine, users):
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as db:
+        owner = User(name="Bench Vendor", username="bench-vendor", password="Password123", email="bench-vendor@example.com",
+                     mobile_number="9876543210", is_vendor=True)
+        vendor = Vendor(vendor_name="Bench Canteen", qr_code="qr", user_id=owner.id, bank_name="Bank",
+                        account_holder_name="Owner", account_number="12345678", ifsc_code="ABCD0123456",
+                        branch_name="Main", aadhar_card="123456789012", pan_card="ABCDE1234F")
+        employees = [User(name=f"Bench {i}", username=f"bench{i}", password="Password123", email=f"bench{i}@example.com",
+                          mobile_number="9876543210", emp_id=f"BENCH{i:05}", is_user=True) for i in range(users)]
+        db.add_all([owner, vendor, *employees])
+        db.commit()
+        for employee in employees:
+            record_transaction(db, Transaction(user_id=employee.id, points=10**9))
+        db.commit()
+        return vendor.vendor_name, [create_access_token({"user_id": employee.id, "is_user": True}) for employee in employees]
+
+
+async def run(app, mode, scenario, tokens, vendor_name, total, concurrency):
+    gate = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(client, i):
+        headers = {"Authorization": f"Bearer {tokens[i % len(tokens)]}"}
+        async with gate:
+            started = time.perf_counter()
+            if scenario == "balance":
+                response = await client.get(f"/{mode}/user/points", headers=headers)
+            else:
+                response = await client.post(f"/{mode}/user/vendor/transaction", headers=headers,
+                                             json={"vendor_name": vendor_name, "points": 1})
+            latencies.append(time.perf_counter() - started)
+            response.raise_for_status()
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(one(client, i) for i in range(total)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "rps": total / elapsed,
+        "p50": statistics.median(latencies) * 1000,
+        "p95": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+    }
+
+
+async def main(args):
+    app, engine, async_engine = build_app(args.sync_url, args.async_url)
+    vendor_name, tokens = seed(engine, args.users)
+
+    print(f"{'scenario':<10} {'conc':>5} {'mode':<6} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8}")
+    for scenario in args.scenarios:
+        for concurrency in args.concurrency:
+            for mode in ("sync", "async"):
+                result = await run(app, mode, scenario, tokens, vendor_name, args.requests, concurrency)
+                print(f"{scenario:<10} {concurrency:>5} {mode:<6} {result['rps']:>9.1f} {result['p50']:>8.2f} {result['p95']:>8.2f}")
+    await async_engine.dispose()
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    default_db = os.path.join(tempfile.mkdtemp(), "bench.db")
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sync-url", default=f"sqlite:///{default_db}")
+    parser.add_argument("--async-url", default=f"sqlite+aiosqlite:///{default_db}")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 100])
+    parser.add_argument("--scenarios", nargs="+", choices=["balance", "redeem"], default=["balance", "redeem"])
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,80 @@
+"""Measure worker cold start: import time of the app and time until it answers its first request.
+
+Each run starts a fresh interpreter, so module caches from earlier runs do
+not hide import cost. The first request is GET /openapi.json, which needs
+no database; use --startup-mode check against a migrated database to
+include the Alembic revision check.
+
+    python3 src/benchmarks/cold_start.py --runs 5
+"""
+import sys
+import os
+import argparse
+import socket
+import statistics
+import subprocess
+import time
+import urllib.request
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+IMPORT_PROBE = (
+    "import sys, time; started = time.perf_counter(); import main; "
+    "print(time.perf_counter() - started, ','.join(n for n in ('pandas', 'qrcode', 'PIL') if n in sys.modules))"
+)
+
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def measure_import(env):
+    output = subprocess.run([sys.executable, "-c", IMPORT_PROBE], cwd=SRC_DIR, env=env,
+                            capture_output=True, text=True, check=True).stdout.strip().splitlines()[-1]
+    seconds, _, heavy = output.partition(" ")
+    return float(seconds), heavy
+
+
+def measure_first_request(env, timeout:float) -> float:
+    port = free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen([sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+                              cwd=SRC_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - started < timeout:
+            if server.poll() is not None:
+                raise RuntimeError(f"server exited with {server.returncode}; try --startup-mode skip")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/openapi.json", timeout=1) as response:
+                    response.read()
+                    return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.01)
+        raise TimeoutError(f"no response within {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main(args):
+    env = {**os.environ, "DB_STARTUP_MODE": args.startup_mode, "SCHEDULER_ENABLED": "false"}
+    imports, first_requests = [], []
+    for _ in range(args.runs):
+        seconds, heavy = measure_import(env)
+        imports.append(seconds)
+        first_requests.append(measure_first_request(env, args.timeout))
+
+    print(f"startup mode:        {args.startup_mode}")
+    print(f"import main:         median {statistics.median(imports) * 1000:.0f} ms, max {max(imports) * 1000:.0f} ms")
+    print(f"first request:       median {statistics.median(first_requests) * 1000:.0f} ms, max {max(first_requests) * 1000:.0f} ms")
+    print(f"heavy libs imported: {heavy or 'none'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--startup-mode", choices=["check", "create", "skip"], default="skip")
+    parser.add_argument("--timeout", type=float, default=60)
+    main(parser.parse_args())
@@ -0,0 +1,131 @@
+"""Login throughput with bcrypt in the request threadpool versus the password process pool.
+
+While the logins run, a second stream of sync read requests
+(/user/credit-transactions) measures how much the login spike slows
+everything else that needs a threadpool thread.
+
+    python3 src/benchmarks/login.py --logins 200 --concurrency 50 --workers 4
+"""
+import sys
+import os
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+os.environ.setdefault("ALGORITHM", "HS256")
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import SQLModel, Session, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+import src.user.utils as user_utils
+from src.database import get_session, get_async_session
+from src.auth.utils import create_access_token
+from src.user.models import User
+from src.auth.router import router as auth_router
+from src.user.router import router as user_router
+
+
+def build_app(url, async_url):
+    engine = create_engine(url)
+    async_engine = create_async_engine(async_url)
+
+    def override_session():
+        with Session(engine) as db:
+            yield db
+            db.commit()
+
+    async def override_async_session():
+        async with AsyncSession(async_engine, expire_on_commit=False) as db:
+            yield db
+            await db.commit()
+
+    app = FastAPI()
+    app.include_router(auth_router, prefix="/api/v1/auth")
+    app.include_router(user_router, prefix="/api/v1/user")
+    app.dependency_overrides[get_session] = override_session
+    app.dependency_overrides[get_async_session] = override_async_session
+    return app, engine, async_engine
+
+
+def seed(engine, users):
+    SQLModel.metadata.create_all(engine)
+    password_hash = user_utils.hash_password("Password123")
+    with Session(engine) as db:
+        employees = [User(name=f"Bench {i}", username=f"bench{i}", password=password_hash, email=f"bench{i}@example.com",
+                          mobile_number="9876543210", emp_id=f"BENCH{i:05}", is_user=True) for i in range(users)]
+        db.add_all(employees)
+        db.commit()
+        return [employee.emp_id for employee in employees], create_access_token({"user_id": employees[0].id, "is_user": True})
+
+
+async def run(app, emp_ids, token, logins, concurrency, reads):
+    gate = asyncio.Semaphore(concurrency)
+    read_latencies = []
+
+    async def login(client, i):
+        async with gate:
+            response = await client.post("/api/v1/auth/login", json={"emp_id": emp_ids[i % len(emp_ids)], "password": "Password123"})
+            response.raise_for_status()
+
+    async def read(client, done):
+        while not done.is_set():
+            started = time.perf_counter()
+            response = await client.get("/api/v1/user/credit-transactions", headers={"Authorization": f"Bearer {token}"})
+            response.raise_for_status()
+            read_latencies.append(time.perf_counter() - started)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=None) as client:
+        done = asyncio.Event()
+        readers = [asyncio.create_task(read(client, done)) for _ in range(reads)]
+        started = time.perf_counter()
+        await asyncio.gather(*(login(client, i) for i in range(logins)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await asyncio.gather(*readers)
+
+    read_latencies.sort()
+    return {
+        "logins_per_second": logins / elapsed,
+        "read_p50": statistics.median(read_latencies) * 1000 if read_latencies else 0.0,
+        "read_p95": read_latencies[max(int(len(read_latencies) * 0.95) - 1, 0)] * 1000 if read_latencies else 0.0,
+    }
+
+
+async def main(args):
+    db_path = os.path.join(tempfile.mkdtemp(), "login.db")
+    app, engine, async_engine = build_app(f"sqlite:///{db_path}", f"sqlite+aiosqlite:///{db_path}")
+    emp_ids, token = seed(engine, args.users)
+
+    print(f"bcrypt rounds: {user_utils.BCRYPT_ROUNDS}, logins: {args.logins}, concurrency: {args.concurrency}")
+    print(f"{'mode':<22} {'logins/s':>9} {'read p50 ms':>12} {'read p95 ms':>12}")
+    for label, workers in (("threadpool", 0), (f"process pool ({args.workers})", args.workers)):
+        user_utils.shutdown_password_pool()
+        user_utils.PASSWORD_HASH_WORKERS = workers
+        # Start the worker processes before timing so their spawn cost is not counted as login time.
+        sample_hash = user_utils.hash_password("warm-up")
+        await asyncio.gather(*(user_utils.verify_password_in_pool("warm-up", sample_hash) for _ in range(max(workers, 1))))
+        result = await run(app, emp_ids, token, args.logins, args.concurrency, args.reads)
+        print(f"{label:<22} {result['logins_per_second']:>9.1f} {result['read_p50']:>12.2f} {result['read_p95']:>12.2f}")
+    user_utils.shutdown_password_pool()
+    await async_engine.dispose()
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--reads", type=int, default=4, help="concurrent read streams running during the logins")
+    parser.add_argument("--workers", type=int, default=user_utils.PASSWORD_HASH_WORKERS or 4)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,122 @@
+"""Time the attendance points upload (/transaction/user-data/upload/transaction).
+
+Seeds --employees registered employees into a throwaway SQLite file (or
+--url), uploads a CSV with --rows employee codes and downloads the
+unassigned report once the upload job has finished; the job runs inside
+the upload request here, so the timing is the job itself. --legacy also
+times the previous implementation (whole-file DataFrame, list scan per
+employee, one ORM object and balance update per grant) on the same data.
+
+    python3 src/benchmarks/points_upload.py --employees 50000 --rows 50000
+"""
+import sys
+import os
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+os.environ.setdefault("ALGORITHM", "HS256")
+
+import argparse
+import io
+import tempfile
+import time
+import uuid
+from datetime import datetime
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+from sqlmodel import SQLModel, Session, create_engine, select
+
+from src.database import get_session
+from src.auth.dependencies import validate_token
+from src.user.models import User
+from src.transaction.models import Transaction
+from src.transaction.service import record_transaction
+from src.transaction.router import router as transaction_router
+from src.jobs.router import router as jobs_router
+from src.jobs import service as jobs_service
+
+
+def seed(engine, employees):
+    SQLModel.metadata.drop_all(engine)
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.execute(insert(User), [
+            {"id": str(uuid.uuid4()), "created_at": datetime.now(), "username": f"emp{i}", "name": f"Employee {i}",
+             "password": "Password123", "email": f"emp{i}@example.com", "mobile_number": "9876543210",
+             "emp_id": f"AJA{i:06}", "is_user": True, "is_vendor": False, "is_admin": False}
+            for i in range(employees)
+        ])
+        session.commit()
+
+
+def attendance_csv(employees, rows):
+    # Every other employee attended; the rest of the rows are codes nobody has.
+    codes = [f"AJA{i:06}" for i in range(0, employees, 2)][:rows]
+    codes += [f"EXT{i:06}" for i in range(rows - len(codes))]
+    return ("E. Code\n" + "\n".join(codes) + "\n").encode()
+
+
+def legacy_upload(engine, data):
+    import pandas as pd
+    with Session(engine) as session:
+        df = pd.read_csv(io.BytesIO(data))
+        excel_emp_ids = df["E. Code"].unique().tolist()
+        unassigned_data = []
+        for user in session.exec(select(User).filter(User.is_user == True)).all():
+            if user.emp_id in excel_emp_ids:
+                record_transaction(session, Transaction(user_id=user.id, points=20))
+            else:
+                unassigned_data.append({"emp_id": user.emp_id, "details": "User not registered"})
+        session.commit()
+    return len(unassigned_data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--employees", type=int, default=50000)
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--url", help="database URL; defaults to a temporary SQLite file")
+    parser.add_argument("--legacy", action="store_true", help="also time the previous implementation")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(args.url or f"sqlite:///{tmp}/benchmark.db")
+        data = attendance_csv(args.employees, args.rows)
+
+        app = FastAPI()
+        app.include_router(transaction_router, prefix="/api/v1/transaction")
+        app.include_router(jobs_router, prefix="/api/v1/jobs")
+        jobs_service.JOB_WORKERS = 0
+
+        def override_session():
+            with Session(engine) as session:
+                yield session
+
+        app.dependency_overrides[get_session] = override_session
+        app.dependency_overrides[validate_token] = lambda: {"user_id": "benchmark", "is_admin": True}
+        client = TestClient(app)
+
+        seed(engine, args.employees)
+        started = time.perf_counter()
+        response = client.post("/api/v1/transaction/user-data/upload/transaction",
+                               files={"file": ("attendance.csv", data, "text/csv")})
+        job_id = response.json()["data"]["job_id"]
+        unassigned = len(client.get(f"/api/v1/jobs/{job_id}/result").json())
+        print(f"job:    {time.perf_counter() - started:8.2f}s  "
+              f"({args.rows} rows, {args.employees} employees, {unassigned} unassigned)")
+
+        if args.legacy:
+            seed(engine, args.employees)
+            started = time.perf_counter()
+            unassigned = legacy_upload(engine, data)
+            print(f"legacy: {time.perf_counter() - started:8.2f}s  "
+                  f"({args.rows} rows, {args.employees} employees, {unassigned} unassigned)")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
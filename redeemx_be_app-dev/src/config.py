@@ -1,28 +1,130 @@
 from apscheduler.schedulers.background import BackgroundScheduler
-import requests
+from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
+from datetime import datetime
+from sqlmodel import Session
+import os
 
-from main import app
+from src.database import engine
+from src.vendor.service import refresh_daily_reports
+from src.jobs.models import JOB_SUCCEEDED
+from src.jobs.service import resume_jobs, run_job_now
+from src.jobs.schedule import TIMEZONE, scheduled_task, add_scheduled_tasks, catch_up_missed_runs
+from src.transaction.service import ROSTER_SYNC_JOB, apply_pending_totals
+from src.idempotency import purge_expired_idempotency_keys
+from src.logging_config import logger
 
-API_URL = "http://127.0.0.1:8001/api/v1/user/process/all/transactions"
+DAILY_REPORT_INTERVAL_MINUTES = int(os.getenv("DAILY_REPORT_INTERVAL_MINUTES", "15"))
+JOB_RESUME_INTERVAL_MINUTES = int(os.getenv("JOB_RESUME_INTERVAL_MINUTES", "5"))
+SCHEDULER_CATCHUP_INTERVAL_MINUTES = int(os.getenv("SCHEDULER_CATCHUP_INTERVAL_MINUTES", "10"))
+PENDING_TOTALS_INTERVAL_SECONDS = int(os.getenv("PENDING_TOTALS_INTERVAL_SECONDS", "60"))
+IDEMPOTENCY_PURGE_INTERVAL_MINUTES = int(os.getenv("IDEMPOTENCY_PURGE_INTERVAL_MINUTES", "60"))
 
-def process_transactions():
+# Interval occurrences are counted from this instant, so every worker agrees on them.
+INTERVAL_START = datetime(2024, 1, 1, tzinfo=TIMEZONE)
+
+# Scheduled tasks raise on failure; the run history in schedulerrun records the error.
+@scheduled_task("sync_employee_roster", CronTrigger(day_of_week="mon-sat", hour=16, minute=27, timezone=TIMEZONE),
+                catch_up=True)
+def sync_employee_roster():
+    # Run here, under the task's lease, so a failed sync fails the run and is caught up later.
+    with Session(engine, expire_on_commit=False) as session:
+        job = run_job_now(session, ROSTER_SYNC_JOB)
+    if job.status != JOB_SUCCEEDED:
+        raise RuntimeError(f"Roster sync job {job.id} {job.status}: {job.error}")
+    logger.info(f"Roster sync finished as job {job.id}: {job.summary}")
+    return f"Job {job.id}: {job.summary}"
+
+@scheduled_task("generate_daily_reports",
+                IntervalTrigger(minutes=DAILY_REPORT_INTERVAL_MINUTES, start_date=INTERVAL_START, timezone=TIMEZONE))
+def generate_daily_reports():
+    with Session(engine) as session:
+        reports = refresh_daily_reports(session)
+        session.commit()
+    logger.info(f"Daily reports refreshed for {[str(report.report_date) for report in reports]}")
+    return f"Refreshed {', '.join(str(report.report_date) for report in reports)}"
+
+def resume_background_jobs():
+    try:
+        resume_jobs(engine)
+    except Exception as e:
+        logger.error(f"Resuming background jobs failed: {e}")
+
+def apply_pending_redemption_totals():
     try:
-        response = requests.post(API_URL)
-        print("Scheduled Task Executed:", response.status_code, response.json())
+        with Session(engine) as session:
+            applied = apply_pending_totals(session)
+        if applied:
+            logger.info(f"Applied {applied} pending redemption totals left by failed or interrupted requests")
     except Exception as e:
-        print("Error in Scheduled Task:", e)
+        logger.error(f"Applying pending redemption totals failed: {e}")
 
-scheduler = BackgroundScheduler()
+def purge_idempotency_keys():
+    try:
+        with Session(engine) as session:
+            purged = purge_expired_idempotency_keys(session)
+        if purged:
+            logger.info(f"Purged {purged} expired idempotency keys")
+    except Exception as e:
+        logger.error(f"Purging expired idempotency keys failed: {e}")
+
+def catch_up_scheduled_tasks():
+    try:
+        catch_up_missed_runs(engine)
+    except Exception as e:
+        logger.error(f"Catching up scheduled tasks failed: {e}")
+
+scheduler = BackgroundScheduler(timezone="Asia/Kolkata")
+# Every worker fires these; a lease row per task lets exactly one of them run each occurrence.
+add_scheduled_tasks(scheduler, engine)
+# Picks up uploads left queued or stalled by a worker process that stopped. Runs in every
+# process: each job is claimed with a guarded update, and resumed jobs run in this process's pool.
 scheduler.add_job(
-    process_transactions,
-    "cron",
-    day_of_week="mon-sat",
-    hour=16,
-    minute=27 
+    resume_background_jobs,
+    "interval",
+    minutes=JOB_RESUME_INTERVAL_MINUTES,
+    id="resume_background_jobs",
+    coalesce=True,
+    max_instances=1
 )
-scheduler.start()
+# Redemptions apply their vendor totals right after committing; this picks up any a request could not.
+# Runs in every process: each pending row is applied by whichever process deletes it first.
+scheduler.add_job(
+    apply_pending_redemption_totals,
+    "interval",
+    seconds=PENDING_TOTALS_INTERVAL_SECONDS,
+    id="apply_pending_redemption_totals",
+    coalesce=True,
+    max_instances=1
+)
+# Keeps the idempotencykey table to the keys still inside their TTL. Runs in every process;
+# a key deleted by one is simply not found by the others.
+scheduler.add_job(
+    purge_idempotency_keys,
+    "interval",
+    minutes=IDEMPOTENCY_PURGE_INTERVAL_MINUTES,
+    id="purge_idempotency_keys",
+    coalesce=True,
+    max_instances=1
+)
+# Runs on startup, then periodically, for occurrences missed while no worker was up or that failed.
+scheduler.add_job(
+    catch_up_scheduled_tasks,
+    "interval",
+    minutes=SCHEDULER_CATCHUP_INTERVAL_MINUTES,
+    id="catch_up_scheduled_tasks",
+    next_run_time=datetime.now(TIMEZONE),
+    coalesce=True,
+    max_instances=1
+)
+
+def start_scheduler():
+    if os.getenv("SCHEDULER_ENABLED", "true").lower() != "true":
+        logger.info("Scheduler disabled by SCHEDULER_ENABLED")
+        return
+    scheduler.start()
 
-@app.on_event("shutdown")
-def shutdown_event():
-    print("Shutting down scheduler...")
-    scheduler.shutdown()
+def shutdown_scheduler():
+    if scheduler.running:
+        print("Shutting down scheduler...")
+        scheduler.shutdown()
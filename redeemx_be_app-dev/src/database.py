@@ -1,8 +1,20 @@
 from sqlmodel import SQLModel, create_engine, Session
-from fastapi import Depends
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.exc import OperationalError
+from sqlalchemy import event
+from fastapi import Depends, Request
+from contextlib import contextmanager, asynccontextmanager
+from threading import Lock
+import inspect
+import time
 import os
 from dotenv import load_dotenv
 
+from src.logging_config import logger
+
 load_dotenv()
 
 DATABASE_URL = (
@@ -10,16 +22,164 @@ DATABASE_URL = (
     f"@{os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}/{os.getenv('DB_NAME')}"
 )
 
-engine = create_engine(DATABASE_URL, echo=True)
+# Async routes talk to the same database through an asyncio driver
+# (asyncmy for MySQL, aiosqlite for a local sqlite+aiosqlite:/// file).
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or DATABASE_URL.replace("mysql+pymysql://", "mysql+asyncmy://", 1)
+
+# Optional read replica for GET routes. Reads fall back to the primary while it is unreachable,
+# and a request sending "X-Read-Your-Writes: true" always reads the primary.
+REPLICA_DATABASE_URL = os.getenv("REPLICA_DATABASE_URL")
+ASYNC_REPLICA_DATABASE_URL = os.getenv("ASYNC_REPLICA_DATABASE_URL") or (
+    REPLICA_DATABASE_URL.replace("mysql+pymysql://", "mysql+asyncmy://", 1) if REPLICA_DATABASE_URL else None)
+REPLICA_RETRY_SECONDS = float(os.getenv("REPLICA_RETRY_SECONDS", "30"))
+READ_YOUR_WRITES_HEADER = "X-Read-Your-Writes"
+
+def _env_flag(name:str, default:str) -> bool:
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
+
+# Pool sizing is per process: size + overflow times the worker count must stay under MySQL's max_connections.
+# Recycling below MySQL's wait_timeout (8h by default) and pre-ping keep idle connections from going stale.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_PRE_PING = _env_flag("DB_POOL_PRE_PING", "true")
+DB_ECHO = _env_flag("DB_ECHO", "false")
+# Times a write transaction is run again after InnoDB picks it as a deadlock victim.
+DB_DEADLOCK_RETRIES = int(os.getenv("DB_DEADLOCK_RETRIES", "3"))
+# Deadlock (1213) and lock wait timeout (1205): the work can simply be run again from the start.
+RETRYABLE_MYSQL_ERRORS = {1213, 1205}
+
+
+class PoolMetrics:
+    """Checkout wait times for one engine's pool."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record_wait(self, seconds:float):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.timeouts,
+                "checkout_wait_avg_ms": round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "checkout_wait_max_ms": round(self.max_wait * 1000, 3),
+            }
+
+
+class _InstrumentedPool:
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record_timeout()
+            raise
+        self.metrics.record_wait(time.perf_counter() - started)
+        return connection
+
+
+pool_metrics = {"primary": PoolMetrics(), "async": PoolMetrics(), "replica": PoolMetrics(), "async_replica": PoolMetrics()}
+
+
+def engine_options(url:str, name:str) -> dict:
+    """create_engine keyword arguments for url, with an instrumented pool recording into pool_metrics[name]."""
+    if url.startswith("sqlite"):
+        return {"echo": DB_ECHO}
+    base = AsyncAdaptedQueuePool if name.startswith("async") else QueuePool
+    return {
+        "echo": DB_ECHO,
+        "poolclass": type(f"Instrumented{base.__name__}", (_InstrumentedPool, base), {"metrics": pool_metrics[name]}),
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL, "primary"))
+async_engine = None
+replica_engine = create_engine(REPLICA_DATABASE_URL, **engine_options(REPLICA_DATABASE_URL, "replica")) if REPLICA_DATABASE_URL else None
+async_replica_engine = None
+_replica_down_until = 0.0
+
+# How a worker prepares the schema on startup: "check" only compares the Alembic revision with head,
+# "create" runs metadata.create_all (slow: it inspects every table), "skip" does nothing.
+DB_STARTUP_MODE = os.getenv("DB_STARTUP_MODE", "check").lower()
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic")
 
 def create_db_and_tables():
     SQLModel.metadata.create_all(bind=engine)
 
+def check_schema_revision():
+    """Raise unless the database is at the newest Alembic revision."""
+    from alembic.script import ScriptDirectory
+    from alembic.runtime.migration import MigrationContext
+
+    expected = set(ScriptDirectory(MIGRATIONS_DIR).get_heads())
+    with engine.connect() as connection:
+        current = set(MigrationContext.configure(connection).get_current_heads())
+    if current != expected:
+        raise RuntimeError(f"Database schema is at revision {sorted(current) or 'none'}, expected {sorted(expected)}. "
+                           "Run `alembic upgrade head` (after `alembic stamp 5b0e7d2c4a91` for a database created before migrations).")
+
+def prepare_database(mode:str=None):
+    mode = mode or DB_STARTUP_MODE
+    if mode == "create":
+        create_db_and_tables()
+    elif mode == "check":
+        check_schema_revision()
+    elif mode != "skip":
+        raise ValueError(f"Unknown DB_STARTUP_MODE {mode!r}; expected check, create or skip")
+
+def mark_read_only(session) -> None:
+    """Run the session's transactions as READ ONLY and skip the commit at the end of the request."""
+    session.info["read_only"] = True
+
+def is_read_only(session) -> bool:
+    return session.info.get("read_only") is True
+
+def mark_read_source(session, source:str, read_your_writes:bool = False) -> None:
+    """Record which database a read session reads ("primary" or "replica") and whether the request must see its own writes."""
+    session.info["read_source"] = source
+    session.info["read_your_writes"] = read_your_writes
+
+def read_source(session) -> str:
+    return session.info.get("read_source", "primary")
+
+def reads_your_writes(session) -> bool:
+    return session.info.get("read_your_writes") is True
+
+@event.listens_for(Session, "after_begin")
+def _begin_read_only(session, transaction, connection):
+    # MySQL applies SET TRANSACTION to the transaction that the next statement starts.
+    if is_read_only(session) and connection.dialect.name == "mysql":
+        connection.exec_driver_sql("SET TRANSACTION READ ONLY")
+
 def get_session():
-    session = Session(engine)
+    # Ids and timestamps are generated in Python, so nothing needs reloading after a commit.
+    session = Session(engine, expire_on_commit=False)
     try:
         yield session 
-        session.commit()  
+        if not is_read_only(session):
+            session.commit()  
     except Exception as e:
         session.rollback() 
         raise 
@@ -27,6 +187,174 @@ def get_session():
         session.close()  
        
 
+def is_retryable(error:OperationalError) -> bool:
+    args = getattr(error.orig, "args", ())
+    return bool(args) and args[0] in RETRYABLE_MYSQL_ERRORS
+
+def commit_with_retry(session, work):
+    """Run work() and commit, starting over when InnoDB aborts the transaction as a deadlock victim.
+
+    work must only write through session, so a rolled back attempt leaves nothing behind.
+    """
+    for attempt in range(1, DB_DEADLOCK_RETRIES + 1):
+        try:
+            result = work()
+            session.commit()
+            return result
+        except OperationalError as e:
+            session.rollback()
+            if not is_retryable(e) or attempt == DB_DEADLOCK_RETRIES:
+                raise
+            logger.warning(f"Retrying transaction after {e.orig.args[0]} (attempt {attempt}): {e.orig}")
+
+
+def get_async_engine():
+    """The async engine, created on first use so the asyncio driver is only needed by processes that serve async routes."""
+    global async_engine
+    if async_engine is None:
+        async_engine = create_async_engine(ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL, "async"))
+    return async_engine
+
+
+def pool_status() -> dict:
+    """In-use and checkout-wait gauges for every engine this process has opened."""
+    engines = {"primary": engine}
+    if async_engine is not None:
+        engines["async"] = async_engine.sync_engine
+    if replica_engine is not None:
+        engines["replica"] = replica_engine
+    if async_replica_engine is not None:
+        engines["async_replica"] = async_replica_engine.sync_engine
+    status = {}
+    for name, current in engines.items():
+        pool = current.pool
+        status[name] = {
+            "pool_size": pool.size() if hasattr(pool, "size") else None,
+            "in_use": pool.checkedout() if hasattr(pool, "checkedout") else None,
+            "idle": pool.checkedin() if hasattr(pool, "checkedin") else None,
+            "overflow": pool.overflow() if hasattr(pool, "overflow") else None,
+            **pool_metrics[name].snapshot(),
+        }
+    return status
+
+def get_async_replica_engine():
+    global async_replica_engine
+    if async_replica_engine is None and ASYNC_REPLICA_DATABASE_URL:
+        async_replica_engine = create_async_engine(ASYNC_REPLICA_DATABASE_URL,
+                                                   **engine_options(ASYNC_REPLICA_DATABASE_URL, "async_replica"))
+    return async_replica_engine
+
+async def dispose_async_engine():
+    for current in (async_engine, async_replica_engine):
+        if current is not None:
+            await current.dispose()
+
+async def get_async_session():
+    session = AsyncSession(get_async_engine(), expire_on_commit=False)
+    try:
+        yield session
+        if not is_read_only(session.sync_session):
+            await session.commit()
+    except Exception as e:
+        await session.rollback()
+        raise
+    finally:
+        await session.close()
+
+
+def _read_your_writes(request:Request) -> bool:
+    return request.headers.get(READ_YOUR_WRITES_HEADER, "").lower() in ("1", "true", "yes")
+
+def _replica_wanted(request:Request) -> bool:
+    if _read_your_writes(request):
+        return False
+    return time.monotonic() >= _replica_down_until
+
+def _replica_failed(error:Exception):
+    global _replica_down_until
+    _replica_down_until = time.monotonic() + REPLICA_RETRY_SECONDS
+    logger.error(f"Read replica unavailable, reading from the primary for {REPLICA_RETRY_SECONDS}s: {error}")
+
+@contextmanager
+def _primary_read_session(request:Request):
+    """The primary session a read falls back to, opened only on that path.
+
+    It comes from get_session, or whatever the app overrides it with, so
+    reads and writes share one source of primary sessions.
+    """
+    sessions = request.app.dependency_overrides.get(get_session, get_session)()
+    if not inspect.isgenerator(sessions):
+        yield sessions
+        return
+    try:
+        yield next(sessions)
+    finally:
+        sessions.close()
+
+@asynccontextmanager
+async def _async_primary_read_session(request:Request):
+    """Async counterpart of _primary_read_session."""
+    sessions = request.app.dependency_overrides.get(get_async_session, get_async_session)()
+    if not inspect.isasyncgen(sessions):
+        yield sessions
+        return
+    try:
+        yield await anext(sessions)
+    finally:
+        await sessions.aclose()
+
+def get_read_session(request:Request):
+    """Read-only session for GET routes: the replica when one is configured and reachable, otherwise the primary.
+
+    A primary session is only created when the replica cannot be used, so a
+    replica read does not also open one. Neither is committed.
+    """
+    if replica_engine is not None and _replica_wanted(request):
+        replica_session = Session(replica_engine)
+        mark_read_only(replica_session)
+        mark_read_source(replica_session, "replica")
+        try:
+            replica_session.connection()
+        except OperationalError as e:
+            replica_session.close()
+            _replica_failed(e)
+        else:
+            try:
+                yield replica_session
+            finally:
+                replica_session.close()
+            return
+    with _primary_read_session(request) as session:
+        mark_read_only(session)
+        mark_read_source(session, "primary", _read_your_writes(request))
+        yield session
+
+async def get_async_read_session(request:Request):
+    """Async counterpart of get_read_session."""
+    if get_async_replica_engine() is not None and _replica_wanted(request):
+        replica_session = AsyncSession(async_replica_engine, expire_on_commit=False)
+        mark_read_only(replica_session.sync_session)
+        mark_read_source(replica_session.sync_session, "replica")
+        try:
+            await replica_session.connection()
+        except OperationalError as e:
+            await replica_session.close()
+            _replica_failed(e)
+        else:
+            try:
+                yield replica_session
+            finally:
+                await replica_session.close()
+            return
+    async with _async_primary_read_session(request) as session:
+        mark_read_only(session.sync_session)
+        mark_read_source(session.sync_session, "primary", _read_your_writes(request))
+        yield session
+
+
 session:Session=Depends(get_session)
+async_session:AsyncSession=Depends(get_async_session)
+read_session:Session=Depends(get_read_session)
+async_read_session:AsyncSession=Depends(get_async_read_session)
 
 
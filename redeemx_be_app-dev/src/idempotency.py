@@ -0,0 +1,103 @@
+import os
+import json
+import hashlib
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlmodel import select, delete
+from sqlalchemy.exc import IntegrityError
+
+from src.models import IdempotencyKey
+from src.database import commit_with_retry
+from src.logging_config import logger
+
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", 24 * 60 * 60))
+# Expired keys deleted per statement by the purge, so it never holds many row locks at once.
+IDEMPOTENCY_PURGE_BATCH_SIZE = int(os.getenv("IDEMPOTENCY_PURGE_BATCH_SIZE", "1000"))
+
+
+def _now():
+    return datetime.now(ZoneInfo("Asia/Kolkata"))
+
+
+def _digest(value:str) -> str:
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()
+
+
+def _reserve(session, record_id:str, request_hash:str):
+    """Claim the key inside the caller's DB transaction.
+
+    Returns None when this request owns the key, otherwise the live record
+    left by the first request. On InnoDB a concurrent retry blocks on the
+    primary key until the first request commits or rolls back.
+    """
+    existing = session.exec(
+        select(IdempotencyKey).where(IdempotencyKey.id == record_id, IdempotencyKey.expires_at > _now())
+    ).first()
+    if existing is not None:
+        return existing
+
+    session.exec(delete(IdempotencyKey).where(IdempotencyKey.id == record_id))
+    try:
+        with session.begin_nested():
+            session.add(IdempotencyKey(id=record_id, request_hash=request_hash,
+                                       expires_at=_now() + timedelta(seconds=IDEMPOTENCY_TTL_SECONDS)))
+    except IntegrityError:
+        return session.exec(select(IdempotencyKey).where(IdempotencyKey.id == record_id)).one()
+    return None
+
+
+def run_idempotent(session, response, idempotency_key:str, user_id:str, scope:str, payload, handler):
+    """Run handler once per (user, scope, Idempotency-Key) and replay its response for retries.
+
+    Handlers do not commit: the ledger writes and the stored response are
+    committed together here, so a crash can never leave one without the other.
+    A transaction lost to a deadlock is run again from the start.
+    """
+    return commit_with_retry(session, lambda: _run_idempotent(session, response, idempotency_key, user_id, scope,
+                                                              payload, handler))
+
+
+def _run_idempotent(session, response, idempotency_key:str, user_id:str, scope:str, payload, handler):
+    if not idempotency_key:
+        return handler()
+
+    record_id = _digest(f"{user_id}:{scope}:{idempotency_key}")
+    request_hash = _digest(json.dumps(jsonable_encoder(payload), sort_keys=True))
+    existing = _reserve(session, record_id, request_hash)
+
+    if existing is not None:
+        if existing.request_hash != request_hash:
+            logger.error(f"Idempotency key reused with a different request - Scope:{scope}, User:{user_id}")
+            return JSONResponse(status_code=422, content={
+                "data": None, "message": "", "error": "Idempotency-Key was already used for a different request"})
+        if existing.status_code is None:
+            return JSONResponse(status_code=409, content={
+                "data": None, "message": "", "error": "A request with this Idempotency-Key is still being processed"})
+        logger.info(f"Replaying idempotent response - Scope:{scope}, User:{user_id}")
+        return JSONResponse(status_code=existing.status_code, content=json.loads(existing.response_body),
+                            headers={"Idempotent-Replayed": "true"})
+
+    result = handler()
+    record = session.get(IdempotencyKey, record_id)
+    if record is not None:
+        record.status_code = response.status_code or 200
+        record.response_body = json.dumps(jsonable_encoder(result))
+        session.add(record)
+    return result
+
+
+def purge_expired_idempotency_keys(session) -> int:
+    """Delete the keys whose TTL has passed, IDEMPOTENCY_PURGE_BATCH_SIZE per committed batch. Returns the number deleted."""
+    now = _now()
+    purged = 0
+    while True:
+        expired = session.exec(
+            select(IdempotencyKey.id).where(IdempotencyKey.expires_at <= now).limit(IDEMPOTENCY_PURGE_BATCH_SIZE)
+        ).all()
+        if not expired:
+            return purged
+        purged += session.exec(delete(IdempotencyKey).where(IdempotencyKey.id.in_(expired),
+                                                            IdempotencyKey.expires_at <= now)).rowcount
+        session.commit()
@@ -0,0 +1,5 @@
+class JobSupersededError(Exception):
+    def __init__(self, job_id:str, attempt:int):
+        super().__init__(f"Job {job_id} attempt {attempt} was superseded by a later attempt")
+        self.job_id = job_id
+        self.attempt = attempt
@@ -0,0 +1,69 @@
+from sqlmodel import SQLModel, Field, Column, TEXT
+from sqlalchemy import Index
+from sqlalchemy.dialects import mysql
+from typing import Optional
+from datetime import datetime
+
+from src.models import BaseModel
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+# MySQL TEXT stops at 64 KB; a report can be megabytes.
+LONG_TEXT = TEXT().with_variant(mysql.LONGTEXT(), "mysql")
+
+
+class Job(BaseModel, table=True):
+    """A unit of background work (an upload or bulk operation) and, once finished, its report."""
+    __table_args__ = (
+        # Queued and stalled jobs picked up at startup.
+        Index("ix_job_status_updated_at", "status", "updated_at"),
+    )
+
+    kind:str = Field(max_length=64)
+    status:str = Field(default=JOB_QUEUED, max_length=16)
+    created_by:Optional[str] = Field(default=None, max_length=255)
+    filename:Optional[str] = Field(default=None, max_length=255)
+    processed:int = Field(default=0)
+    total:Optional[int] = Field(default=None)
+    message:Optional[str] = Field(default=None, max_length=255)
+    error:Optional[str] = Field(default=None, sa_column=Column(TEXT))
+    attempts:int = Field(default=0)
+    # Where the uploaded file waits under JOB_UPLOAD_DIR; cleared, and the file removed, once the job has finished.
+    payload_path:Optional[str] = Field(default=None, max_length=1024)
+    # JSON: where a handler that commits in batches resumes, saved with each batch (see commit_checkpoint).
+    checkpoint:Optional[str] = Field(default=None, sa_column=Column(LONG_TEXT))
+    # JSON: counts for the finished job, and the per-row report (unassigned employees, row errors).
+    summary:Optional[str] = Field(default=None, sa_column=Column(TEXT))
+    result:Optional[str] = Field(default=None, sa_column=Column(LONG_TEXT))
+    started_at:Optional[datetime] = Field(default=None)
+    finished_at:Optional[datetime] = Field(default=None)
+    updated_at:Optional[datetime] = Field(default=None)
+
+
+class SchedulerLease(SQLModel, table=True):
+    """One row per scheduled task: the worker currently running it, and the last occurrence it completed."""
+    name:str = Field(primary_key=True, max_length=64)
+    owner:Optional[str] = Field(default=None, max_length=255)
+    lease_until:Optional[datetime] = Field(default=None)
+    last_scheduled_for:Optional[datetime] = Field(default=None)
+
+
+class SchedulerRun(BaseModel, table=True):
+    """A scheduled task run by one worker, kept as history with its duration and outcome."""
+    __table_args__ = (
+        Index("ix_schedulerrun_name_scheduled_for", "name", "scheduled_for"),
+    )
+
+    name:str = Field(max_length=64)
+    scheduled_for:datetime
+    owner:str = Field(max_length=255)
+    status:str = Field(default=JOB_RUNNING, max_length=16)
+    catch_up:bool = Field(default=False)
+    message:Optional[str] = Field(default=None, max_length=255)
+    error:Optional[str] = Field(default=None, sa_column=Column(TEXT))
+    started_at:datetime
+    finished_at:Optional[datetime] = Field(default=None)
+    duration_ms:Optional[int] = Field(default=None)
@@ -0,0 +1,73 @@
+from fastapi import APIRouter, Request, Response, Query
+from fastapi.responses import StreamingResponse
+import csv
+import io
+import json
+
+from src.database import session, mark_read_only
+from src.auth.dependencies import auth_user
+from src.jobs.models import Job, JOB_SUCCEEDED
+from src.jobs.service import job_status
+from src.response import RestResponse
+from src.logging_config import logger
+
+router = APIRouter()
+
+
+def _get_job(request:Request, response:Response, job_id:str, session, auth_user):
+    """The job if it exists and the caller may see it; otherwise (None, error response)."""
+    request_info = f"{request.method}:{request.url.path} user:{auth_user.get('user_id')}"
+    job = session.get(Job, job_id)
+    if job is None:
+        response.status_code = 404
+        return None, RestResponse(error="Job not found")
+    if not auth_user.get("is_admin") and job.created_by != auth_user.get("user_id"):
+        logger.error(f"Unauthorized access - Request: {request_info}, Reason: You are not authorized")
+        response.status_code = 401
+        return None, RestResponse(error="You are not authorized")
+    return job, None
+
+
+# Job rows change under the poller, so these read the primary rather than a replica.
+@router.get("/{job_id}")
+def get_job(request:Request, response:Response, job_id:str, session=session, auth_user=auth_user):
+    mark_read_only(session)
+    job, error = _get_job(request, response, job_id, session, auth_user)
+    if error:
+        return error
+    return RestResponse(data=job_status(job))
+
+
+@router.get("/{job_id}/result")
+def download_job_result(request:Request, response:Response, job_id:str, session=session, auth_user=auth_user,
+                        format:str = Query("json", pattern="^(json|csv)$", description="json or csv")):
+    mark_read_only(session)
+    job, error = _get_job(request, response, job_id, session, auth_user)
+    if error:
+        return error
+    if job.status != JOB_SUCCEEDED:
+        response.status_code = 409
+        return RestResponse(error=f"Job is {job.status}; the result is available once it has succeeded")
+
+    filename = f"{job.kind}-{job.id}.{format}"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    if format == "json":
+        return Response(content=job.result, media_type="application/json", headers=headers)
+
+    rows = json.loads(job.result)
+    columns = list(dict.fromkeys(column for row in rows for column in row))
+
+    def generate():
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=columns)
+        writer.writeheader()
+        for row in rows:
+            # List cells (a row's validation errors) become one "; "-separated cell.
+            writer.writerow({column: "; ".join(map(str, value)) if isinstance(value, list) else value
+                             for column, value in row.items()})
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue()
+
+    return StreamingResponse(generate(), media_type="text/csv", headers=headers)
@@ -0,0 +1,234 @@
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select, update
+import os
+import socket
+import threading
+import time
+
+from src.jobs.models import SchedulerLease, SchedulerRun, JOB_SUCCEEDED, JOB_FAILED
+from src.logging_config import logger
+
+TIMEZONE = ZoneInfo("Asia/Kolkata")
+
+# "lease": each run is claimed through the schedulerlease table, so however many workers start the
+# scheduler a task runs on one of them. "local": every process runs every task itself (a single worker).
+SCHEDULER_MODE = os.getenv("SCHEDULER_MODE", "lease").lower()
+# How long a claim holds before another worker may take the task over from a worker that died mid-run.
+SCHEDULER_LEASE_SECONDS = int(os.getenv("SCHEDULER_LEASE_SECONDS", "900"))
+# How often a worker running a task pushes its lease out again, so a long run is never taken over.
+SCHEDULER_HEARTBEAT_SECONDS = int(os.getenv("SCHEDULER_HEARTBEAT_SECONDS", "60"))
+# How far back a missed run of a catch-up task is still made up.
+SCHEDULER_CATCHUP_HOURS = int(os.getenv("SCHEDULER_CATCHUP_HOURS", "24"))
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+# name -> (function, trigger, catch_up)
+scheduled_tasks = {}
+
+
+def scheduled_task(name:str, trigger, catch_up:bool = False):
+    """Register a function to run on an APScheduler trigger, on one worker per occurrence.
+
+    With catch_up, an occurrence missed while no worker was up (or that failed)
+    is run once when a worker next checks, if it is under SCHEDULER_CATCHUP_HOURS old.
+    Interval triggers need a fixed start_date so every worker computes the same occurrences.
+    """
+    def register(function):
+        scheduled_tasks[name] = (function, trigger, catch_up)
+        return function
+    return register
+
+
+def _now() -> datetime:
+    # Stored as naive India time, like the rest of the schema.
+    return datetime.now(TIMEZONE).replace(tzinfo=None)
+
+
+def latest_occurrence(trigger, now:datetime = None, within:timedelta = None):
+    """The last time the trigger fired at or before now, looking back within (SCHEDULER_CATCHUP_HOURS); None if it did not."""
+    now = (now or _now()).replace(tzinfo=TIMEZONE)
+    within = within or timedelta(hours=SCHEDULER_CATCHUP_HOURS)
+    fire_time = trigger.get_next_fire_time(None, now - within)
+    latest = None
+    while fire_time is not None and fire_time <= now:
+        latest = fire_time
+        fire_time = trigger.get_next_fire_time(fire_time, fire_time)
+    return latest.astimezone(TIMEZONE).replace(tzinfo=None) if latest else None
+
+
+def _claim(bind, name:str, scheduled_for:datetime) -> bool:
+    """Take the task's lease for this occurrence. False if another worker holds it or already ran it."""
+    now = _now()
+    with Session(bind) as session:
+        if session.get(SchedulerLease, name) is None:
+            try:
+                session.add(SchedulerLease(name=name))
+                session.commit()
+            except IntegrityError:
+                session.rollback()
+        result = session.exec(
+            update(SchedulerLease)
+            .where(
+                SchedulerLease.name == name,
+                or_(SchedulerLease.lease_until.is_(None), SchedulerLease.lease_until < now),
+                or_(SchedulerLease.last_scheduled_for.is_(None), SchedulerLease.last_scheduled_for < scheduled_for),
+            )
+            .values(owner=WORKER_ID, lease_until=now + timedelta(seconds=SCHEDULER_LEASE_SECONDS))
+            .execution_options(synchronize_session=False)
+        )
+        session.commit()
+        return bool(result.rowcount)
+
+
+def _renew(bind, name:str) -> bool:
+    """Push this worker's lease out by SCHEDULER_LEASE_SECONDS. False if it no longer holds the lease."""
+    with Session(bind) as session:
+        result = session.exec(
+            update(SchedulerLease)
+            .where(SchedulerLease.name == name, SchedulerLease.owner == WORKER_ID,
+                   SchedulerLease.lease_until.is_not(None))
+            .values(lease_until=_now() + timedelta(seconds=SCHEDULER_LEASE_SECONDS))
+            .execution_options(synchronize_session=False)
+        )
+        session.commit()
+        return bool(result.rowcount)
+
+
+@contextmanager
+def _heartbeat(bind, name:str):
+    """Keep renewing the task's lease while this worker runs it."""
+    stop = threading.Event()
+
+    def beat():
+        while not stop.wait(SCHEDULER_HEARTBEAT_SECONDS):
+            try:
+                if not _renew(bind, name):
+                    logger.warning(f"Scheduled task {name} lost its lease on {WORKER_ID}")
+                    return
+            except Exception as e:
+                logger.warning(f"Scheduled task {name} lease renewal failed: {e}")
+
+    thread = threading.Thread(target=beat, name=f"scheduler-heartbeat-{name}", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def _release(bind, name:str, scheduled_for:datetime = None):
+    values = {"lease_until": None}
+    if scheduled_for is not None:
+        values["last_scheduled_for"] = scheduled_for
+    with Session(bind) as session:
+        session.exec(
+            update(SchedulerLease).where(SchedulerLease.name == name, SchedulerLease.owner == WORKER_ID)
+            .values(**values).execution_options(synchronize_session=False)
+        )
+        session.commit()
+
+
+def run_scheduled_task(bind, name:str, scheduled_for:datetime = None, catch_up:bool = False) -> bool:
+    """Run the task for its latest occurrence if this worker wins the lease. Returns whether it ran.
+
+    The lease is a guarded UPDATE on the task's row: it succeeds only while no
+    other worker holds an unexpired lease and the occurrence is newer than the
+    last one completed, so every worker can fire the same trigger and exactly
+    one of them runs it. The lease is renewed every SCHEDULER_HEARTBEAT_SECONDS
+    while the task runs, so only a worker that died loses it. The run is
+    recorded in schedulerrun either way it ends;
+    only a successful run moves last_scheduled_for on, so a failed one is retried.
+    """
+    function, trigger, _ = scheduled_tasks[name]
+    if SCHEDULER_MODE == "local":
+        function()
+        return True
+
+    # APScheduler runs a job at most misfire_grace_time (the lease length) after its fire time.
+    scheduled_for = (scheduled_for or latest_occurrence(trigger, within=timedelta(seconds=SCHEDULER_LEASE_SECONDS))
+                     or _now())
+    if not _claim(bind, name, scheduled_for):
+        logger.debug(f"Scheduled task {name} for {scheduled_for} is running or ran on another worker")
+        return False
+
+    with Session(bind, expire_on_commit=False) as session:
+        run = SchedulerRun(name=name, scheduled_for=scheduled_for, owner=WORKER_ID, catch_up=catch_up,
+                           started_at=_now())
+        session.add(run)
+        session.commit()
+
+    started = time.perf_counter()
+    try:
+        with _heartbeat(bind, name):
+            message = function()
+        status, error = JOB_SUCCEEDED, None
+    except Exception as e:
+        logger.error(f"Scheduled task {name} for {scheduled_for} failed: {e}")
+        message, status, error = None, JOB_FAILED, str(e)
+    duration_ms = int((time.perf_counter() - started) * 1000)
+
+    with Session(bind) as session:
+        session.exec(
+            update(SchedulerRun).where(SchedulerRun.id == run.id)
+            .values(status=status, error=error, message=str(message)[:255] if message is not None else None,
+                    finished_at=_now(), duration_ms=duration_ms)
+            .execution_options(synchronize_session=False)
+        )
+        session.commit()
+    _release(bind, name, scheduled_for if status == JOB_SUCCEEDED else None)
+    logger.info(f"Scheduled task {name} for {scheduled_for} {status} in {duration_ms} ms on {WORKER_ID}")
+    return True
+
+
+def catch_up_missed_runs(bind) -> list:
+    """Run each catch-up task whose latest occurrence has not completed. Returns the names run here."""
+    if SCHEDULER_MODE == "local":
+        return []
+    with Session(bind) as session:
+        completed = dict(session.exec(select(SchedulerLease.name, SchedulerLease.last_scheduled_for)).all())
+    ran = []
+    for name, (_, trigger, catch_up) in scheduled_tasks.items():
+        scheduled_for = latest_occurrence(trigger) if catch_up else None
+        if scheduled_for is None or (completed.get(name) and completed[name] >= scheduled_for):
+            continue
+        logger.info(f"Catching up {name}, missed at {scheduled_for}")
+        if run_scheduled_task(bind, name, scheduled_for, catch_up=True):
+            ran.append(name)
+    return ran
+
+
+def add_scheduled_tasks(scheduler, bind):
+    """Add every registered task to an APScheduler scheduler, each firing run_scheduled_task."""
+    for name, (_, trigger, _) in scheduled_tasks.items():
+        # A worker busy at the fire time still runs the occurrence; the lease keeps it to one run.
+        scheduler.add_job(run_scheduled_task, trigger, args=[bind, name], id=name,
+                          coalesce=True, max_instances=1, misfire_grace_time=SCHEDULER_LEASE_SECONDS)
+
+
+def scheduler_status(session) -> list:
+    """Each task's lease and its most recent runs, newest first."""
+    leases = {lease.name: lease for lease in session.exec(select(SchedulerLease)).all()}
+    status = []
+    for name in sorted(set(scheduled_tasks) | set(leases)):
+        lease = leases.get(name)
+        runs = session.exec(
+            select(SchedulerRun).where(SchedulerRun.name == name)
+            .order_by(SchedulerRun.scheduled_for.desc(), SchedulerRun.started_at.desc()).limit(10)
+        ).all()
+        status.append({
+            "name": name,
+            "owner": lease.owner if lease and lease.lease_until else None,
+            "lease_until": lease.lease_until if lease else None,
+            "last_scheduled_for": lease.last_scheduled_for if lease else None,
+            "runs": [{
+                "scheduled_for": run.scheduled_for, "owner": run.owner, "status": run.status,
+                "catch_up": run.catch_up, "message": run.message, "error": run.error,
+                "started_at": run.started_at, "finished_at": run.finished_at, "duration_ms": run.duration_ms,
+            } for run in runs],
+        })
+    return status
@@ -0,0 +1,267 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+from sqlmodel import Session, select, update
+import json
+import os
+import shutil
+import tempfile
+import threading
+
+from src.jobs.models import Job, JOB_QUEUED, JOB_RUNNING, JOB_SUCCEEDED, JOB_FAILED
+from src.jobs.exceptions import JobSupersededError
+from src.logging_config import logger
+
+# Threads running background jobs in this process; 0 runs each job in the request that submits it.
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+# A running job whose worker has not checked in for this long belonged to a process that died; it is run again.
+JOB_STALE_SECONDS = int(os.getenv("JOB_STALE_SECONDS", "600"))
+# How often a worker marks its running job as alive; well under JOB_STALE_SECONDS.
+JOB_HEARTBEAT_SECONDS = int(os.getenv("JOB_HEARTBEAT_SECONDS", "60"))
+# Uploaded files wait here until their job finishes. Every process that runs jobs must see the same directory.
+JOB_UPLOAD_DIR = os.getenv("JOB_UPLOAD_DIR", os.path.join(tempfile.gettempdir(), "redeemx-jobs"))
+
+# kind -> handler(session, job, progress) returning (summary dict, report rows).
+job_handlers = {}
+_job_pool = None
+
+
+def job_handler(kind:str):
+    """Register the function that runs jobs of this kind."""
+    def register(handler):
+        job_handlers[kind] = handler
+        return handler
+    return register
+
+
+def _now() -> datetime:
+    return datetime.now(ZoneInfo("Asia/Kolkata"))
+
+
+def job_pool() -> ThreadPoolExecutor:
+    global _job_pool
+    if _job_pool is None:
+        _job_pool = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="job")
+    return _job_pool
+
+
+def shutdown_job_pool():
+    """Stop taking jobs. Queued ones stay queued in the table and run after the next startup."""
+    global _job_pool
+    if _job_pool is not None:
+        _job_pool.shutdown(wait=False, cancel_futures=True)
+        _job_pool = None
+
+
+def _create_job(session, kind:str, payload=None, filename:str = None, created_by:str = None) -> Job:
+    if kind not in job_handlers:
+        raise ValueError(f"Unknown job kind {kind!r}")
+    job = Job(kind=kind, filename=filename, created_by=created_by, message="Queued", updated_at=_now())
+    if payload is not None:
+        os.makedirs(JOB_UPLOAD_DIR, exist_ok=True)
+        job.payload_path = os.path.join(JOB_UPLOAD_DIR, job.id)
+        with open(job.payload_path, "wb") as file:
+            shutil.copyfileobj(payload, file)
+    session.add(job)
+    try:
+        session.commit()
+    except Exception:
+        remove_payload(job.payload_path)
+        raise
+    return job
+
+
+def submit_job(session, kind:str, payload=None, filename:str = None, created_by:str = None) -> Job:
+    """Persist a job and hand it to the worker pool. The job row is committed before any work starts.
+
+    payload is a binary file object (an upload); it is copied in chunks to
+    JOB_UPLOAD_DIR and the job keeps the path, so the upload is never held in memory.
+    """
+    job = _create_job(session, kind, payload, filename, created_by)
+    dispatch_job(session.get_bind(), job.id)
+    return job
+
+
+def run_job_now(session, kind:str, created_by:str = None) -> Job:
+    """Persist a job and run it in the calling thread. Returns the job in its final state."""
+    job = _create_job(session, kind, created_by=created_by)
+    run_job(session.get_bind(), job.id)
+    session.refresh(job)
+    return job
+
+
+def open_payload(job:Job):
+    """The job's uploaded file, opened for binary reading."""
+    if job.payload_path is None:
+        raise ValueError("The uploaded file is no longer available")
+    return open(job.payload_path, "rb")
+
+
+def remove_payload(path:str):
+    if path is None:
+        return
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def dispatch_job(bind, job_id:str):
+    if JOB_WORKERS <= 0:
+        run_job(bind, job_id)
+    else:
+        job_pool().submit(run_job, bind, job_id)
+
+
+def _set_job(bind, job_id:str, *conditions, **values) -> bool:
+    with Session(bind) as session:
+        result = session.exec(
+            update(Job).where(Job.id == job_id, *conditions).values(updated_at=_now(), **values)
+            .execution_options(synchronize_session=False)
+        )
+        session.commit()
+        return bool(result.rowcount)
+
+
+def load_checkpoint(job:Job) -> dict:
+    """The state saved by the job's last commit_checkpoint, empty when it has none."""
+    return json.loads(job.checkpoint) if job.checkpoint else {}
+
+
+def commit_checkpoint(session, job:Job, state:dict):
+    """Commit the handler's work so far together with the state a later attempt resumes from.
+
+    For handlers that commit in batches. The commit is fenced on the attempt
+    like the final one in run_job: if the job has been claimed again since,
+    the batch is rolled back and JobSupersededError raised.
+    """
+    result = session.exec(
+        update(Job).where(Job.id == job.id, Job.status == JOB_RUNNING, Job.attempts == job.attempts)
+        .values(checkpoint=json.dumps(state, default=str), updated_at=_now())
+        .execution_options(synchronize_session=False)
+    )
+    if not result.rowcount:
+        session.rollback()
+        raise JobSupersededError(job.id, job.attempts)
+    session.commit()
+    job.checkpoint = json.dumps(state, default=str)
+
+
+@contextmanager
+def _heartbeat(bind, job_id:str, attempt:int):
+    """Keep the job's updated_at fresh while this attempt runs, so resume_jobs only requeues dead workers."""
+    stop = threading.Event()
+
+    def beat():
+        while not stop.wait(JOB_HEARTBEAT_SECONDS):
+            try:
+                if not _set_job(bind, job_id, Job.status == JOB_RUNNING, Job.attempts == attempt):
+                    return
+            except Exception as e:
+                logger.warning(f"Job {job_id} heartbeat failed: {e}")
+
+    thread = threading.Thread(target=beat, name=f"job-heartbeat-{job_id}", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def run_job(bind, job_id:str) -> bool:
+    """Claim a queued job and run it to completion. Returns False if another worker claimed it first.
+
+    The claim is a guarded UPDATE from queued to running, so when several
+    processes resume the same queue exactly one of them runs each job. The
+    attempt number taken with the claim fences the job's own writes: the
+    handler's work commits together with the UPDATE that marks this attempt
+    finished, so an attempt that was requeued and run again elsewhere rolls
+    its work back instead of applying it a second time. Handlers that commit
+    in batches fence each batch the same way through commit_checkpoint, and a
+    later attempt resumes from the state saved with the last batch.
+    """
+    if not _set_job(bind, job_id, Job.status == JOB_QUEUED,
+                    status=JOB_RUNNING, started_at=_now(), attempts=Job.attempts + 1, message="Running"):
+        return False
+
+    with Session(bind, expire_on_commit=False) as session:
+        job = session.get(Job, job_id)
+        attempt = job.attempts
+        owned = (Job.id == job_id, Job.status == JOB_RUNNING, Job.attempts == attempt)
+
+        def progress(processed:int, total:int = None, message:str = None):
+            values = {"processed": processed}
+            if total is not None:
+                values["total"] = total
+            if message is not None:
+                values["message"] = message
+            _set_job(bind, job_id, *owned[1:], **values)
+
+        logger.info(f"Job {job_id} ({job.kind}) started, attempt {attempt}")
+        with _heartbeat(bind, job_id, attempt):
+            try:
+                summary, rows = job_handlers[job.kind](session, job, progress)
+                finished = session.exec(
+                    update(Job).where(*owned)
+                    .values(status=JOB_SUCCEEDED, message="Finished", payload_path=None, finished_at=_now(),
+                            updated_at=_now(), summary=json.dumps(summary, default=str),
+                            result=json.dumps(rows, default=str))
+                    .execution_options(synchronize_session=False)
+                ).rowcount
+                if not finished:
+                    raise JobSupersededError(job_id, attempt)
+                session.commit()
+            except JobSupersededError:
+                session.rollback()
+                logger.warning(f"Job {job_id} attempt {attempt} was superseded; its uncommitted work was rolled back")
+                return True
+            except Exception as e:
+                session.rollback()
+                logger.error(f"Job {job_id} ({job.kind}) failed: {e}")
+                if _set_job(bind, job_id, *owned[1:], status=JOB_FAILED, error=str(e), message="Failed",
+                            payload_path=None, finished_at=_now()):
+                    remove_payload(job.payload_path)
+                return True
+
+    remove_payload(job.payload_path)
+    logger.info(f"Job {job_id} ({job.kind}) finished: {summary}")
+    return True
+
+
+def resume_jobs(bind) -> int:
+    """Requeue running jobs whose worker stopped sending heartbeats and dispatch everything queued. Returns the number dispatched."""
+    with Session(bind) as session:
+        session.exec(
+            update(Job)
+            .where(Job.status == JOB_RUNNING, Job.updated_at < _now() - timedelta(seconds=JOB_STALE_SECONDS))
+            .values(status=JOB_QUEUED, message="Requeued after the worker stopped", updated_at=_now())
+            .execution_options(synchronize_session=False)
+        )
+        session.commit()
+        queued = session.exec(
+            select(Job.id).where(Job.status == JOB_QUEUED).order_by(Job.created_at)
+        ).all()
+    for job_id in queued:
+        dispatch_job(bind, job_id)
+    if queued:
+        logger.info(f"Resumed {len(queued)} queued jobs")
+    return len(queued)
+
+
+def job_status(job:Job) -> dict:
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "filename": job.filename,
+        "processed": job.processed,
+        "total": job.total,
+        "message": job.message,
+        "error": job.error,
+        "summary": json.loads(job.summary) if job.summary else None,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
@@ -0,0 +1,199 @@
+import io
+import os
+import time
+import pytest
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlmodel import SQLModel, Session, create_engine, select
+
+from src.database import get_session
+from src.auth.dependencies import validate_token
+from src.jobs.models import Job
+from src.jobs.router import router as jobs_router
+from src.jobs import service as jobs_service
+from src.jobs.service import job_handler, submit_job, run_job, resume_jobs, open_payload
+
+
+@job_handler("test.echo")
+def echo_job(session, job, progress):
+    with open_payload(job) as file:
+        lines = file.read().decode().splitlines()
+    for index, line in enumerate(lines, start=1):
+        progress(index, len(lines))
+    if "boom" in lines:
+        raise ValueError("boom in the file")
+    return {"lines": len(lines)}, [{"line": line, "errors": ["a", "b"]} for line in lines]
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'redeemx.db'}", connect_args={"check_same_thread": False})
+    SQLModel.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(autouse=True)
+def inline_jobs(monkeypatch, tmp_path):
+    monkeypatch.setattr(jobs_service, "JOB_WORKERS", 0)
+    monkeypatch.setattr(jobs_service, "JOB_UPLOAD_DIR", str(tmp_path / "uploads"))
+
+
+def make_client(engine, auth_user):
+    app = FastAPI()
+    app.include_router(jobs_router, prefix="/api/v1/jobs")
+
+    def override_session():
+        with Session(engine) as session:
+            yield session
+
+    app.dependency_overrides[get_session] = override_session
+    app.dependency_overrides[validate_token] = lambda: auth_user
+    return TestClient(app)
+
+
+def submit(engine, payload, created_by="owner"):
+    with Session(engine, expire_on_commit=False) as session:
+        return submit_job(session, "test.echo", payload=io.BytesIO(payload), filename="lines.txt",
+                          created_by=created_by)
+
+
+def queued_job(tmp_path, payload, **values):
+    """A job row whose upload was stored by an earlier process."""
+    job = Job(kind="test.echo", **values)
+    job.payload_path = str(tmp_path / job.id)
+    (tmp_path / job.id).write_bytes(payload)
+    return job
+
+
+def test_finished_job_reports_progress_and_result(engine):
+    job = submit(engine, b"x\ny\nz")
+    client = make_client(engine, {"user_id": "owner"})
+
+    status = client.get(f"/api/v1/jobs/{job.id}").json()["data"]
+    assert (status["status"], status["processed"], status["total"]) == ("succeeded", 3, 3)
+    assert status["summary"] == {"lines": 3}
+    assert status["finished_at"] is not None
+
+    response = client.get(f"/api/v1/jobs/{job.id}/result")
+    assert response.json()[0] == {"line": "x", "errors": ["a", "b"]}
+    assert "attachment" in response.headers["content-disposition"]
+
+    response = client.get(f"/api/v1/jobs/{job.id}/result?format=csv")
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.text.splitlines() == ["line,errors", "x,a; b", "y,a; b", "z,a; b"]
+
+    with Session(engine) as session:
+        assert session.get(Job, job.id).payload_path is None
+    assert not os.path.exists(job.payload_path)
+
+
+def test_failed_job_keeps_the_error(engine):
+    job = submit(engine, b"x\nboom")
+    client = make_client(engine, {"user_id": "owner"})
+
+    status = client.get(f"/api/v1/jobs/{job.id}").json()["data"]
+    assert status["status"] == "failed"
+    assert status["error"] == "boom in the file"
+    assert client.get(f"/api/v1/jobs/{job.id}/result").status_code == 409
+    assert not os.path.exists(job.payload_path)
+
+
+def test_superseded_attempt_rolls_its_work_back(engine, tmp_path):
+    written = []
+
+    @job_handler("test.grant")
+    def grant(session, job, progress):
+        session.add(Job(kind="test.marker"))
+        # The worker looked dead meanwhile: the job was requeued and claimed again.
+        with Session(engine) as other:
+            other.get(Job, job.id).attempts += 1
+            other.commit()
+        written.append(job.id)
+        return {}, []
+
+    with Session(engine) as session:
+        job = Job(kind="test.grant")
+        session.add(job)
+        session.commit()
+        job_id = job.id
+
+    assert run_job(engine, job_id) is True
+    assert written == [job_id]
+    with Session(engine) as session:
+        job = session.get(Job, job_id)
+        assert (job.status, job.finished_at) == ("running", None)
+        assert session.exec(select(Job).where(Job.kind == "test.marker")).all() == []
+
+
+def test_running_job_sends_heartbeats(engine, monkeypatch):
+    monkeypatch.setattr(jobs_service, "JOB_HEARTBEAT_SECONDS", 0.05)
+    seen = []
+
+    @job_handler("test.slow")
+    def slow(session, job, progress):
+        with Session(engine) as other:
+            first = other.get(Job, job.id).updated_at
+        time.sleep(0.3)
+        with Session(engine) as other:
+            seen.append((first, other.get(Job, job.id).updated_at))
+        return {}, []
+
+    with Session(engine) as session:
+        job = Job(kind="test.slow")
+        session.add(job)
+        session.commit()
+        job_id = job.id
+
+    run_job(engine, job_id)
+    first, later = seen[0]
+    assert later > first
+
+
+def test_jobs_are_visible_to_their_creator_and_admins(engine):
+    job = submit(engine, b"x")
+    assert make_client(engine, {"user_id": "someone-else"}).get(f"/api/v1/jobs/{job.id}").status_code == 401
+    assert make_client(engine, {"user_id": "admin", "is_admin": True}).get(f"/api/v1/jobs/{job.id}").status_code == 200
+    assert make_client(engine, {"user_id": "owner"}).get("/api/v1/jobs/missing").status_code == 404
+
+
+def test_worker_pool_runs_jobs_in_the_background(engine, monkeypatch):
+    monkeypatch.setattr(jobs_service, "JOB_WORKERS", 1)
+    try:
+        job = submit(engine, b"x\ny")
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            with Session(engine) as session:
+                if session.get(Job, job.id).status == "succeeded":
+                    break
+            time.sleep(0.05)
+        else:
+            pytest.fail("job did not finish")
+    finally:
+        jobs_service.shutdown_job_pool()
+
+
+def test_a_job_runs_once_however_often_it_is_dispatched(engine):
+    job = submit(engine, b"x")
+    assert run_job(engine, job.id) is False
+    with Session(engine) as session:
+        assert session.get(Job, job.id).attempts == 1
+
+
+def test_resume_runs_queued_and_stalled_jobs(engine, tmp_path):
+    stale = datetime.now(ZoneInfo("Asia/Kolkata")) - timedelta(seconds=jobs_service.JOB_STALE_SECONDS + 60)
+    with Session(engine) as session:
+        queued = queued_job(tmp_path, b"x")
+        stalled = queued_job(tmp_path, b"x\ny", status="running", attempts=1, updated_at=stale)
+        busy = queued_job(tmp_path, b"x", status="running", attempts=1,
+                          updated_at=datetime.now(ZoneInfo("Asia/Kolkata")))
+        session.add_all([queued, stalled, busy])
+        session.commit()
+        ids = queued.id, stalled.id, busy.id
+
+    assert resume_jobs(engine) == 2
+    with Session(engine) as session:
+        assert [session.get(Job, job_id).status for job_id in ids] == ["succeeded", "succeeded", "running"]
+        assert session.get(Job, ids[1]).attempts == 2
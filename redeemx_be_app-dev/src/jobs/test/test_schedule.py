@@ -0,0 +1,191 @@
+import threading
+import time
+import pytest
+from datetime import datetime, timedelta
+from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlmodel import SQLModel, Session, create_engine, select
+
+from src.database import get_session
+from src.auth.dependencies import validate_token
+from src.jobs.models import SchedulerLease, SchedulerRun
+from src.jobs import schedule
+from src.jobs.schedule import TIMEZONE, run_scheduled_task, catch_up_missed_runs, latest_occurrence
+from src.metrics import router as metrics_router
+
+DAILY = CronTrigger(hour=16, minute=27, timezone=TIMEZONE)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'redeemx.db'}",
+                           connect_args={"check_same_thread": False, "timeout": 30})
+    SQLModel.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def task(monkeypatch):
+    """A registered task that counts its runs and fails while calls["fail"] is set."""
+    calls = {"runs": 0, "fail": False}
+
+    def grant():
+        calls["runs"] += 1
+        if calls["fail"]:
+            raise ConnectionError("roster API down")
+        return "granted"
+
+    # Only this task, whether or not the app's own tasks were registered by an earlier import.
+    monkeypatch.setattr(schedule, "scheduled_tasks", {"daily_grant": (grant, DAILY, True)})
+    return calls
+
+
+def as_worker(monkeypatch, worker):
+    monkeypatch.setattr(schedule, "WORKER_ID", worker)
+
+
+def runs(engine):
+    with Session(engine) as session:
+        return session.exec(select(SchedulerRun).order_by(SchedulerRun.started_at)).all()
+
+
+def test_latest_occurrence_looks_back_over_days_without_one():
+    weekdays = CronTrigger(day_of_week="mon-sat", hour=16, minute=27, timezone=TIMEZONE)
+    # 2026-10-18 is a Sunday: Saturday's run is 24h36m back, outside the default catch-up window.
+    assert latest_occurrence(weekdays, datetime(2026, 10, 18, 17, 3)) is None
+    assert latest_occurrence(weekdays, datetime(2026, 10, 18, 17, 3), within=timedelta(hours=48)) == \
+        datetime(2026, 10, 17, 16, 27)
+    assert latest_occurrence(weekdays, datetime(2026, 10, 19, 16, 27)) == datetime(2026, 10, 19, 16, 27)
+    every_15 = IntervalTrigger(minutes=15, start_date=datetime(2024, 1, 1, tzinfo=TIMEZONE), timezone=TIMEZONE)
+    assert latest_occurrence(every_15, datetime(2026, 10, 18, 17, 14, 59)) == datetime(2026, 10, 18, 17, 0)
+
+
+def test_each_occurrence_runs_on_one_worker(engine, task, monkeypatch):
+    occurrence = datetime(2026, 10, 17, 16, 27)
+    as_worker(monkeypatch, "node-a:1")
+    assert run_scheduled_task(engine, "daily_grant", occurrence) is True
+    # A second worker whose scheduler fired a moment later finds the occurrence done.
+    as_worker(monkeypatch, "node-b:1")
+    assert run_scheduled_task(engine, "daily_grant", occurrence) is False
+    assert task["runs"] == 1
+
+    [run] = runs(engine)
+    assert (run.owner, run.status, run.message, run.catch_up) == ("node-a:1", "succeeded", "granted", False)
+    assert run.duration_ms is not None and run.finished_at >= run.started_at
+    with Session(engine) as session:
+        lease = session.get(SchedulerLease, "daily_grant")
+        assert (lease.lease_until, lease.last_scheduled_for) == (None, occurrence)
+
+    # The next day's occurrence runs again, on whichever worker gets there first.
+    assert run_scheduled_task(engine, "daily_grant", occurrence + timedelta(days=1)) is True
+    assert task["runs"] == 2
+
+
+def test_concurrent_workers_run_an_occurrence_once(engine, task):
+    occurrence = datetime(2026, 10, 17, 16, 27)
+    barrier = threading.Barrier(8)
+    results = []
+
+    def worker():
+        barrier.wait()
+        results.append(run_scheduled_task(engine, "daily_grant", occurrence))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(results) == [False] * 7 + [True]
+    assert task["runs"] == 1
+    assert len(runs(engine)) == 1
+
+
+def test_a_held_lease_blocks_until_it_expires(engine, task, monkeypatch):
+    occurrence = datetime(2026, 10, 17, 16, 27)
+    with Session(engine) as session:
+        session.add(SchedulerLease(name="daily_grant", owner="node-a:1",
+                                   lease_until=schedule._now() + timedelta(minutes=5)))
+        session.commit()
+    assert run_scheduled_task(engine, "daily_grant", occurrence) is False
+
+    # node-a died mid-run; once its lease lapses another worker takes the occurrence over.
+    with Session(engine) as session:
+        session.get(SchedulerLease, "daily_grant").lease_until = schedule._now() - timedelta(seconds=1)
+        session.commit()
+    assert run_scheduled_task(engine, "daily_grant", occurrence) is True
+    assert task["runs"] == 1
+
+
+def test_a_run_longer_than_the_lease_keeps_it(engine, monkeypatch):
+    monkeypatch.setattr(schedule, "SCHEDULER_LEASE_SECONDS", 1)
+    monkeypatch.setattr(schedule, "SCHEDULER_HEARTBEAT_SECONDS", 0.2)
+    occurrence = datetime(2026, 10, 17, 16, 27)
+    taken_over = []
+
+    def slow_grant():
+        time.sleep(1.5)
+        # Past the original lease, the heartbeat has kept it from lapsing.
+        taken_over.append(schedule._claim(engine, "daily_grant", occurrence))
+
+    monkeypatch.setattr(schedule, "scheduled_tasks", {"daily_grant": (slow_grant, DAILY, True)})
+    assert run_scheduled_task(engine, "daily_grant", occurrence) is True
+    assert taken_over == [False]
+    with Session(engine) as session:
+        assert session.get(SchedulerLease, "daily_grant").last_scheduled_for == occurrence
+
+
+def test_missed_and_failed_runs_are_caught_up_once(engine, task, monkeypatch):
+    task["fail"] = True
+    yesterday = latest_occurrence(DAILY) - timedelta(days=1)
+    assert run_scheduled_task(engine, "daily_grant", yesterday) is True
+    [failed] = runs(engine)
+    assert (failed.status, failed.error) == ("failed", "roster API down")
+
+    # The latest occurrence was missed altogether: catch-up runs it once, on one worker.
+    task["fail"] = False
+    assert catch_up_missed_runs(engine) == ["daily_grant"]
+    assert catch_up_missed_runs(engine) == []
+    assert task["runs"] == 2
+    caught_up = runs(engine)[-1]
+    assert (caught_up.status, caught_up.catch_up) == ("succeeded", True)
+    assert caught_up.scheduled_for == latest_occurrence(DAILY)
+
+
+def test_tasks_without_catch_up_are_left_to_their_trigger(engine, task, monkeypatch):
+    monkeypatch.setitem(schedule.scheduled_tasks, "daily_grant", (lambda: None, DAILY, False))
+    assert catch_up_missed_runs(engine) == []
+    assert runs(engine) == []
+
+
+def test_local_mode_runs_without_a_lease(engine, task, monkeypatch):
+    monkeypatch.setattr(schedule, "SCHEDULER_MODE", "local")
+    assert run_scheduled_task(engine, "daily_grant") is True
+    assert run_scheduled_task(engine, "daily_grant") is True
+    assert task["runs"] == 2
+    assert runs(engine) == []
+
+
+def test_scheduler_metrics_show_leases_and_history(engine, task):
+    run_scheduled_task(engine, "daily_grant", datetime(2026, 10, 17, 16, 27))
+    app = FastAPI()
+    app.include_router(metrics_router, prefix="/api/v1/metrics")
+
+    def override_session():
+        with Session(engine) as session:
+            yield session
+
+    app.dependency_overrides[get_session] = override_session
+    app.dependency_overrides[validate_token] = lambda: {"user_id": "admin", "is_admin": True}
+    client = TestClient(app)
+
+    data = client.get("/api/v1/metrics/scheduler").json()["data"]
+    [grant] = [entry for entry in data["tasks"] if entry["name"] == "daily_grant"]
+    assert grant["last_scheduled_for"] == "2026-10-17T16:27:00"
+    assert [run["status"] for run in grant["runs"]] == ["succeeded"]
+
+    app.dependency_overrides[validate_token] = lambda: {"user_id": "employee", "is_user": True}
+    assert client.get("/api/v1/metrics/scheduler").status_code == 401
@@ -15,12 +15,17 @@ from fastapi.exceptions import RequestValidationError
 from pydantic import ValidationError
 
 
-from src.database import create_db_and_tables
+from src.database import prepare_database, dispose_async_engine
 from src.user.router import router as user_router
 from src.auth.router import router as auth_router
 from src.vendor.router import router as vendor_router
 from src.transaction.router import router as transaction_router
 from src.utils import router as user_upload_router
+from src.metrics import router as metrics_router
+from src.jobs.router import router as jobs_router
+from src.config import start_scheduler, shutdown_scheduler, resume_background_jobs
+from src.jobs.service import shutdown_job_pool
+from src.user.utils import shutdown_password_pool
 from src.exceptions import (
     request_exception_handler,
     global_exception_handler,
@@ -41,7 +46,6 @@ from src.exceptions import (
 
 
 load_dotenv()
-create_db_and_tables()
 
 app = FastAPI()
 
@@ -82,12 +86,32 @@ app.add_exception_handler(MemoryError, memory_error_handler)
 app.add_exception_handler(RecursionError, recursion_error_handler)
 
 
+#Schema check, then queued uploads and scheduled jobs
+@app.on_event("startup")
+def check_database():
+    prepare_database()
+
+@app.on_event("startup")
+def start_background_jobs():
+    resume_background_jobs()
+    start_scheduler()
+
+@app.on_event("shutdown")
+async def stop_background_jobs():
+    shutdown_scheduler()
+    shutdown_job_pool()
+    shutdown_password_pool()
+    await dispose_async_engine()
+
+
 #Routers
 app.include_router(auth_router, prefix='/api/v1/auth', tags=["Authentication"])
 app.include_router(user_router, prefix='/api/v1/user', tags=["Users"])
 app.include_router(vendor_router, prefix='/api/v1/vendor', tags=["Vendors"])
 app.include_router(transaction_router, prefix='/api/v1/transaction', tags=["Transactions"])
 app.include_router(user_upload_router, prefix='/api/v1/user-upload', tags=["User Data Dumping"])
+app.include_router(metrics_router, prefix='/api/v1/metrics', tags=["Metrics"])
+app.include_router(jobs_router, prefix='/api/v1/jobs', tags=["Jobs"])
 
 
 if __name__ == "__main__":
@@ -0,0 +1,84 @@
+import sys
+import os
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+import argparse
+from sqlmodel import Session
+
+from src.database import engine
+# Importing the vendor models registers every table (user, vendor, transaction) with the metadata.
+from src.vendor.models import Vendor
+from src.transaction.service import rebuild_user_balances, verify_user_balances, rebuild_daily_rollups, verify_daily_rollups
+from src.vendor.service import rebuild_vendor_balances, verify_vendor_balances
+from src.idempotency import purge_expired_idempotency_keys
+
+
+def rebuild_balances(args):
+    with Session(engine) as session:
+        user_rows = rebuild_user_balances(session)
+        vendor_rows = rebuild_vendor_balances(session)
+        session.commit()
+    print(f"Rebuilt {user_rows} user balances and {vendor_rows} vendor balances from the ledger.")
+    return 0
+
+
+def verify_balances(args):
+    with Session(engine) as session:
+        user_mismatches = verify_user_balances(session)
+        vendor_mismatches = verify_vendor_balances(session)
+    for mismatch in user_mismatches:
+        print(f"User {mismatch['user_id']}: ledger={mismatch['ledger']} stored={mismatch['stored']}")
+    for mismatch in vendor_mismatches:
+        print(f"Vendor {mismatch['vendor_id']}: ledger={mismatch['ledger']} stored={mismatch['stored']}")
+    print(f"{len(user_mismatches)} user and {len(vendor_mismatches)} vendor balance mismatches found.")
+    return 1 if user_mismatches or vendor_mismatches else 0
+
+
+def rebuild_rollups(args):
+    with Session(engine) as session:
+        rollup_rows = rebuild_daily_rollups(session)
+        session.commit()
+    print(f"Rebuilt {rollup_rows} daily rollup rows from the ledger.")
+    return 0
+
+
+def verify_rollups(args):
+    with Session(engine) as session:
+        mismatches = verify_daily_rollups(session)
+    for mismatch in mismatches:
+        print(f"Day {mismatch['day']} vendor={mismatch['vendor_id'] or '-'} has_user={mismatch['has_user']}: "
+              f"ledger={mismatch['ledger']} stored={mismatch['stored']}")
+    print(f"{len(mismatches)} daily rollup mismatches found.")
+    return 1 if mismatches else 0
+
+
+def purge_idempotency_keys(args):
+    with Session(engine) as session:
+        purged = purge_expired_idempotency_keys(session)
+        session.commit()
+    print(f"Purged {purged} expired idempotency keys.")
+    return 0
+
+
+COMMANDS = {
+    "rebuild-balances": (rebuild_balances, "Recompute the materialized user and vendor balances from the ledger."),
+    "verify-balances": (verify_balances, "Report users and vendors whose materialized balance differs from the ledger."),
+    "rebuild-rollups": (rebuild_rollups, "Recompute the per-day transaction rollup from the ledger."),
+    "verify-rollups": (verify_rollups, "Report days whose rollup differs from the ledger."),
+    "purge-idempotency-keys": (purge_idempotency_keys, "Delete stored Idempotency-Key responses whose TTL has passed."),
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="RedeemX maintenance commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for name, (handler, help_text) in COMMANDS.items():
+        subparsers.add_parser(name, help=help_text).set_defaults(handler=handler)
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,54 @@
+from fastapi import APIRouter, Request, Response
+
+from src.database import session, pool_status, mark_read_only
+from src.auth.dependencies import auth_user
+from src.auth.service import token_cache
+from src.jobs.schedule import SCHEDULER_MODE, WORKER_ID, scheduler_status
+from src.report_cache import report_cache
+from src.single_flight import single_flight
+from src.response import RestResponse
+from src.logging_config import logger
+
+router = APIRouter()
+
+
+@router.get("/pool")
+def get_pool_metrics(request:Request, response:Response, auth_user=auth_user):
+    request_info = f"{request.method}:{request.url.path} user:{auth_user.get('user_id')}"
+    if not auth_user.get("is_admin"):
+        logger.error(f"Unauthorized access - Request: {request_info}, Reason: You are not authorized")
+        response.status_code = 401
+        return RestResponse(error="You are not authorized")
+    return RestResponse(data=pool_status())
+
+
+@router.get("/auth")
+def get_auth_metrics(request:Request, response:Response, auth_user=auth_user):
+    request_info = f"{request.method}:{request.url.path} user:{auth_user.get('user_id')}"
+    if not auth_user.get("is_admin"):
+        logger.error(f"Unauthorized access - Request: {request_info}, Reason: You are not authorized")
+        response.status_code = 401
+        return RestResponse(error="You are not authorized")
+    return RestResponse(data={"token_cache": token_cache.stats()})
+
+
+@router.get("/reports")
+def get_report_cache_metrics(request:Request, response:Response, auth_user=auth_user):
+    request_info = f"{request.method}:{request.url.path} user:{auth_user.get('user_id')}"
+    if not auth_user.get("is_admin"):
+        logger.error(f"Unauthorized access - Request: {request_info}, Reason: You are not authorized")
+        response.status_code = 401
+        return RestResponse(error="You are not authorized")
+    return RestResponse(data={"report_cache": report_cache.stats(), "single_flight": single_flight.stats()})
+
+
+@router.get("/scheduler")
+def get_scheduler_metrics(request:Request, response:Response, session=session, auth_user=auth_user):
+    request_info = f"{request.method}:{request.url.path} user:{auth_user.get('user_id')}"
+    if not auth_user.get("is_admin"):
+        logger.error(f"Unauthorized access - Request: {request_info}, Reason: You are not authorized")
+        response.status_code = 401
+        return RestResponse(error="You are not authorized")
+    # Leases change under the caller, so read the primary.
+    mark_read_only(session)
+    return RestResponse(data={"mode": SCHEDULER_MODE, "worker": WORKER_ID, "tasks": scheduler_status(session)})
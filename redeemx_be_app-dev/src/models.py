@@ -4,8 +4,66 @@ from datetime import datetime,timezone
 from zoneinfo import ZoneInfo
 from typing import Optional
 from pydantic import EmailStr
+from sqlalchemy import String, Date
+from sqlalchemy.sql.expression import FunctionElement
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.visitors import InternalTraversal
 
 class BaseModel(SQLModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()), primary_key=True)
     created_at: datetime = Field(default_factory=lambda: datetime.now(ZoneInfo("Asia/Kolkata")))
 
+
+
+class new_id(FunctionElement):
+    """A fresh random id generated by the database, for rows written with INSERT ... SELECT."""
+    type = String()
+    inherit_cache = True
+
+@compiles(new_id, "mysql")
+def _new_id_mysql(element, compiler, **kw):
+    return "UUID()"
+
+@compiles(new_id)
+def _new_id_sqlite(element, compiler, **kw):
+    return "lower(hex(randomblob(16)))"
+
+
+class period_start(FunctionElement):
+    """The first day of the day, week (Monday) or month containing a DATE column, for GROUP BY buckets."""
+    type = Date()
+    inherit_cache = True
+    # The interval changes the SQL, so it is part of the statement cache key.
+    _traverse_internals = FunctionElement._traverse_internals + [("interval", InternalTraversal.dp_string)]
+
+    def __init__(self, column, interval:str):
+        if interval not in ("day", "week", "month"):
+            raise ValueError(f"Unknown interval {interval!r}")
+        self.interval = interval
+        super().__init__(column)
+
+@compiles(period_start, "mysql")
+def _period_start_mysql(element, compiler, **kw):
+    column = compiler.process(element.clauses, **kw)
+    if element.interval == "week":
+        return f"DATE_SUB({column}, INTERVAL WEEKDAY({column}) DAY)"
+    if element.interval == "month":
+        return f"DATE_SUB({column}, INTERVAL DAYOFMONTH({column}) - 1 DAY)"
+    return column
+
+@compiles(period_start)
+def _period_start_sqlite(element, compiler, **kw):
+    column = compiler.process(element.clauses, **kw)
+    if element.interval == "week":
+        return f"date({column}, 'weekday 0', '-6 days')"
+    if element.interval == "month":
+        return f"date({column}, 'start of month')"
+    return f"date({column})"
+
+
+class IdempotencyKey(SQLModel, table=True):
+    id: str = Field(primary_key=True, max_length=64)
+    request_hash: str = Field(max_length=64)
+    status_code: Optional[int] = Field(default=None)
+    response_body: Optional[str] = Field(default=None, sa_column=Column(TEXT))
+    expires_at: datetime = Field(index=True)
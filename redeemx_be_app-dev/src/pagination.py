@@ -1,7 +1,135 @@
-from fastapi import Query
+from fastapi import Query, HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Row, inspect
+from sqlmodel import Session, select, func, or_, and_
+from datetime import datetime
+from typing import Optional
+import base64
+import json
+
+from src.database import mark_read_only
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+STREAM_BATCH_SIZE = 500
 
 def get_pagination_params(
-    limit: int = Query(6, ge=1, description="Number of records per page"),
+    limit: int = Query(6, ge=1, description=f"Number of records per page, at most {MAX_PAGE_SIZE}"),
     offset: int = Query(0, ge=0, description="Number of records to skip"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; takes precedence over offset"),
+    include_total: Optional[bool] = Query(None, description="Also count every matching record; by default on every offset page, never on cursor pages"),
+):
+    # Larger pages are served at the cap rather than rejected, as they were before it existed.
+    return {"limit": min(limit, MAX_PAGE_SIZE), "offset": offset, "cursor": cursor, "include_total": include_total}
+
+def get_cursor_params(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, description=f"Number of records per page, at most {MAX_PAGE_SIZE}"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    include_total: bool = Query(False, description="Also count every matching record"),
 ):
-    return {"limit": limit, "offset": offset}
+    return {"limit": min(limit, MAX_PAGE_SIZE), "cursor": cursor, "include_total": include_total}
+
+
+def encode_cursor(created_at: datetime, id: str) -> str:
+    payload = json.dumps([created_at.isoformat(), id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str):
+    try:
+        created_at, id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return datetime.fromisoformat(created_at), str(id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+
+def paginate(session, query, model, pagination: dict):
+    """Run query newest first, one page at a time, keyed on (created_at, id).
+
+    A cursor page seeks straight to the rows after the previous page's last
+    row, so page N costs the same as page 1. Plain offsets are still honoured
+    for clients that have not moved to cursors, and their metadata keeps the
+    total and offset those clients read; cursor pages only count on request.
+    Returns (rows, metadata).
+    """
+    limit = pagination.get("limit")
+    cursor = pagination.get("cursor")
+    offset = pagination.get("offset") or 0
+
+    metadata = {"limit": limit}
+    include_total = pagination.get("include_total")
+    if include_total is None:
+        # Offset clients page with the total; cursor clients follow next_cursor instead.
+        include_total = not cursor
+    if include_total:
+        metadata["total"] = session.exec(
+            select(func.count()).select_from(query.order_by(None).subquery())
+        ).first()
+
+    query = query.order_by(model.created_at.desc(), model.id.desc())
+    if cursor:
+        created_at, id = decode_cursor(cursor)
+        query = query.where(or_(model.created_at < created_at,
+                                and_(model.created_at == created_at, model.id < id)))
+    elif "offset" in pagination:
+        query = query.offset(offset)
+        metadata["offset"] = offset
+    if limit is not None:
+        query = query.limit(limit + 1)
+
+    rows = session.exec(query).all()
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        if not isinstance(last, model) and not hasattr(last, "created_at"):
+            # (model, extra columns) rows rather than a column projection.
+            last = last[0]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    metadata["next_cursor"] = next_cursor
+    return rows, metadata
+
+
+def _page_instances(rows):
+    for row in rows:
+        for item in (row if isinstance(row, Row) else (row,)):
+            state = inspect(item, raiseerr=False)
+            if state is not None:
+                yield item, state
+
+
+def iter_pages(session, query, model, batch_size: int = None):
+    """Yield every row of query, newest first, reading one keyset page at a time.
+
+    Objects a page loaded are expunged once it has been yielded, so a long
+    walk does not fill the identity map; anything the caller already held in
+    the session, or added to it meanwhile, is left alone.
+    """
+    batch_size = batch_size or STREAM_BATCH_SIZE
+    cursor = None
+    while True:
+        held = set(session.identity_map.keys())
+        rows, metadata = paginate(session, query, model, {"limit": batch_size, "cursor": cursor})
+        yield from rows
+        for item, state in _page_instances(rows):
+            if state.session is session and state.key not in held and not state.modified:
+                session.expunge(item)
+        cursor = metadata["next_cursor"]
+        if cursor is None:
+            return
+
+def stream_ndjson(session, query, model, serialize, batch_size: int = None):
+    """Stream every row of query as newline-delimited JSON without loading the full result.
+
+    The request's session is closed before the body is sent, so the rows are
+    read through a session of their own on the same engine.
+    """
+    bind = session.get_bind()
+
+    def generate():
+        with Session(bind) as stream_session:
+            mark_read_only(stream_session)
+            for row in iter_pages(stream_session, query, model, batch_size):
+                yield json.dumps(jsonable_encoder(serialize(row))) + "\n"
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
@@ -0,0 +1,236 @@
+from collections import OrderedDict
+from datetime import date, datetime, time as day_time
+from threading import Lock
+from sqlalchemy import event
+from sqlmodel import Session
+import os
+import time
+
+from src.database import read_source, reads_your_writes
+from src.single_flight import single_flight
+from src.transaction.models import Transaction
+from src.vendor.models import Claim, DailyReports
+
+# Report results kept per worker; 0 disables the cache.
+REPORT_CACHE_SIZE = int(os.getenv("REPORT_CACHE_SIZE", "1000"))
+# Writes made by this worker drop the entries they touch straight away; this bounds how long
+# an entry can miss a write made by another worker.
+REPORT_CACHE_TTL_SECONDS = float(os.getenv("REPORT_CACHE_TTL_SECONDS", "60"))
+
+# The tables a cached report reads; writes to any other table leave it alone.
+CACHED_TABLES = {Transaction: "transaction", Claim: "claim", DailyReports: "dailyreports"}
+
+# A write whose vendor or time is not known (a bulk statement), matching every entry on its table.
+ANY = object()
+
+
+def _as_datetime(value, end:bool = False):
+    if value is None or value is ANY:
+        return value
+    if not isinstance(value, datetime):
+        value = datetime.combine(value, day_time.max if end else day_time.min)
+    # Stored as naive India time; new rows still carry the zone they were created with.
+    return value.replace(tzinfo=None)
+
+
+class _Computation:
+    """A result being computed for the cache; a write touching its scope meanwhile keeps it from being stored."""
+    __slots__ = ("scope", "stale")
+
+    def __init__(self, scope:tuple):
+        self.scope = scope
+        self.stale = False
+
+
+class ReportCache:
+    """Bounded LRU of report results with a TTL, dropped early by the writes that touch them.
+
+    Each entry records its scope: the tables it reads, the vendor it belongs to
+    (None for admin-wide reports) and the date range it covers (open-ended when
+    a bound is None). A Transaction, Claim or DailyReports write only drops the
+    entries whose scope contains its vendor and timestamp, so a payment today
+    leaves last month's totals cached. Computations still running are matched
+    the same way, so a write only discards the results it could have changed.
+    """
+
+    def __init__(self, max_size:int, ttl_seconds:float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = Lock()
+        self._computing = set()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(endpoint:str, **params) -> tuple:
+        """endpoint plus its parameters, with dates resolved to datetimes and None-valued parameters dropped."""
+        return (endpoint, *sorted((name, _as_datetime(value) if isinstance(value, date) else value)
+                                  for name, value in params.items() if value is not None))
+
+    def get(self, key:tuple):
+        """(True, value) for a live entry, otherwise (False, None)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[0]
+
+    def put(self, key:tuple, value, scope:tuple, computation:_Computation = None):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            if computation is not None:
+                self._computing.discard(computation)
+                if computation.stale:
+                    return
+            self._entries[key] = (value, time.monotonic() + self.ttl_seconds, scope)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def cached(self, endpoint:str, compute, tables:tuple, session=None, vendor_id:str = None, start=None, end=None,
+               **params):
+        """compute()'s result for this endpoint and these parameters, from the cache when a live entry exists.
+
+        On a miss, concurrent requests for the same key share one compute() call.
+        Results read from the replica and from the primary are kept apart, and a
+        request that must read its own writes always computes afresh.
+        """
+        if session is not None and reads_your_writes(session):
+            return compute()
+        key = self.key(endpoint, source=read_source(session) if session is not None else None,
+                       vendor_id=vendor_id, start=start, end=end, **params)
+        if self.max_size <= 0:
+            return single_flight.do(key, compute)
+        found, value = self.get(key)
+        if found:
+            return value
+
+        def compute_and_store():
+            computation = _Computation((frozenset(tables), vendor_id, _as_datetime(start), _as_datetime(end, end=True)))
+            with self._lock:
+                self._computing.add(computation)
+            try:
+                value = compute()
+            except BaseException:
+                with self._lock:
+                    self._computing.discard(computation)
+                raise
+            self.put(key, value, computation.scope, computation)
+            return value
+
+        return single_flight.do(key, compute_and_store)
+
+    def invalidate(self, writes) -> int:
+        """Drop every entry touched by one of writes, each (table, vendor_id, timestamp). Returns the number dropped."""
+        writes = [(table, vendor_id, _as_datetime(at)) for table, vendor_id, at in writes]
+        with self._lock:
+            for computation in self._computing:
+                if any(_touches(computation.scope, write) for write in writes):
+                    computation.stale = True
+            stale = [key for key, (_, _, scope) in self._entries.items()
+                     if any(_touches(scope, write) for write in writes)]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+            return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            for computation in self._computing:
+                computation.stale = True
+            self.hits = self.misses = self.invalidations = self.evictions = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "invalidations": self.invalidations,
+                "evictions": self.evictions,
+            }
+
+
+def _touches(scope:tuple, write:tuple) -> bool:
+    tables, vendor_id, start, end = scope
+    table, write_vendor_id, at = write
+    if table not in tables:
+        return False
+    if vendor_id is not None and write_vendor_id is not ANY and write_vendor_id != vendor_id:
+        return False
+    if at is ANY:
+        return True
+    return (start is None or at >= start) and (end is None or at <= end)
+
+
+report_cache = ReportCache(REPORT_CACHE_SIZE, REPORT_CACHE_TTL_SECONDS)
+
+
+#Write tracking: collect what a session writes, invalidate once it commits
+def _pending_writes(session) -> list:
+    return session.info.setdefault("report_cache_writes", [])
+
+
+def record_write(session, table:str, vendor_id, at):
+    """Note a write the flush tracking cannot see, such as totals moved by a Core UPDATE; it invalidates on commit."""
+    _pending_writes(session).append((table, vendor_id, at))
+
+
+def _write_of(instance):
+    table = CACHED_TABLES.get(type(instance))
+    if table is None:
+        return None
+    if isinstance(instance, DailyReports):
+        return table, ANY, instance.report_date or ANY
+    return table, instance.vendor_id, instance.created_at or ANY
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_flushed_writes(session, flush_context):
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        write = _write_of(instance)
+        if write is not None:
+            _pending_writes(session).append(write)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_writes(orm_execute_state):
+    # INSERT ... SELECT, executemany inserts and bulk updates: which rows they touch is not known here.
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    table = CACHED_TABLES.get(mapper.class_) if mapper is not None else None
+    if table is not None:
+        _pending_writes(orm_execute_state.session).append((table, ANY, ANY))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_writes(session):
+    # Releasing a savepoint fires this too; the writes are not visible to other sessions until the outer commit.
+    if session.in_nested_transaction():
+        return
+    writes = session.info.pop("report_cache_writes", None)
+    if writes:
+        report_cache.invalidate(writes)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_rolled_back_writes(session, previous_transaction):
+    # A savepoint rolling back leaves the writes made before it; only the outermost rollback discards them.
+    if previous_transaction.parent is None:
+        session.info.pop("report_cache_writes", None)
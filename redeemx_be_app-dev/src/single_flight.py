@@ -0,0 +1,115 @@
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from threading import Lock
+import asyncio
+import os
+
+# Longest a caller waits on another caller's computation before running its own.
+SINGLE_FLIGHT_WAIT_SECONDS = float(os.getenv("SINGLE_FLIGHT_WAIT_SECONDS", "30"))
+
+
+class _Abandoned(Exception):
+    """Set on a computation whose leader was cancelled or interrupted; its followers compute again."""
+
+
+class SingleFlight:
+    """Run one computation per key at a time and hand its result to every caller that asked meanwhile.
+
+    The first caller for a key (the leader) computes; callers arriving while it
+    runs wait for the same result, or the same exception, instead of running an
+    identical query. Nothing is kept once the leader finishes, so a later
+    caller computes afresh. Sync callers (route threads) and async callers
+    (the event loop) share the in-flight computations, keyed the same way.
+
+    A leader that is cancelled (a client disconnecting) does not pass the
+    cancellation on: one of its followers takes over the computation. A
+    follower waits at most SINGLE_FLIGHT_WAIT_SECONDS and then computes itself.
+    """
+
+    def __init__(self, wait_seconds:float = None):
+        self.wait_seconds = SINGLE_FLIGHT_WAIT_SECONDS if wait_seconds is None else wait_seconds
+        self._calls = {}
+        self._lock = Lock()
+        self.leaders = 0
+        self.coalesced = 0
+
+    def _join(self, key):
+        """(future, True) when this caller leads the computation for key, else the leader's (future, False)."""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = self._calls[key] = Future()
+            # A follower giving up must not cancel the result the others are waiting for.
+            future.set_running_or_notify_cancel()
+            self.leaders += 1
+            return future, True
+
+    def _finish(self, key, future:Future, result=None, error:BaseException = None):
+        with self._lock:
+            del self._calls[key]
+        if error is None:
+            future.set_result(result)
+        elif isinstance(error, Exception):
+            future.set_exception(error)
+        else:
+            # CancelledError, KeyboardInterrupt: the leader's own interruption, not the computation's outcome.
+            future.set_exception(_Abandoned())
+
+    def do(self, key, compute):
+        """compute()'s result, shared with every concurrent call for the same key."""
+        while True:
+            future, leader = self._join(key)
+            if leader:
+                break
+            try:
+                return future.result(timeout=self.wait_seconds)
+            except FutureTimeoutError:
+                return compute()
+            except _Abandoned:
+                continue
+        try:
+            result = compute()
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result)
+        return result
+
+    async def do_async(self, key, compute):
+        """await compute()'s result, shared with every concurrent call for the same key."""
+        while True:
+            future, leader = self._join(key)
+            if leader:
+                break
+            try:
+                return await asyncio.wait_for(asyncio.wrap_future(future), self.wait_seconds)
+            except asyncio.TimeoutError:
+                return await compute()
+            except _Abandoned:
+                continue
+        try:
+            result = await compute()
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result)
+        return result
+
+    def reset(self):
+        with self._lock:
+            self.leaders = self.coalesced = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            calls = self.leaders + self.coalesced
+            return {
+                "in_flight": len(self._calls),
+                "calls": calls,
+                "executions": self.leaders,
+                "coalesced": self.coalesced,
+                "coalesced_ratio": round(self.coalesced / calls, 4) if calls else 0.0,
+            }
+
+
+single_flight = SingleFlight()
@@ -0,0 +1,107 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.pool import NullPool
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import SQLModel, Session, create_engine, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.database import get_async_session
+from src.auth.dependencies import validate_token
+from src.user.models import User
+from src.user.utils import hash_password
+from src.vendor.models import Vendor
+from src.transaction.models import Transaction, UserBalance
+from src.transaction.service import record_transaction
+from src.auth.router import router as auth_router
+from src.transaction.router import router as transaction_router
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'redeemx.db'}", connect_args={"check_same_thread": False})
+    SQLModel.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def accounts(engine):
+    with Session(engine) as session:
+        employee = User(name="Employee One", username="employee", password=hash_password("Password123"),
+                        email="employee@example.com", mobile_number="9876543210", emp_id="AJA001", is_user=True)
+        owner = User(name="Canteen Owner", username="canteen", password=hash_password("Password123"),
+                     email="canteen@example.com", mobile_number="9876543210", is_vendor=True)
+        vendor = Vendor(vendor_name="Canteen", qr_code="qr-code", user_id=owner.id, bank_name="Bank",
+                        account_holder_name="Owner", account_number="12345678", ifsc_code="ABCD0123456",
+                        branch_name="Main", aadhar_card="123456789012", pan_card="ABCDE1234F")
+        session.add_all([employee, owner, vendor])
+        session.commit()
+        record_transaction(session, Transaction(user_id=employee.id, points=100))
+        session.commit()
+        return {"employee": employee.id, "owner": owner.id}
+
+
+def make_client(engine, auth_user=None):
+    app = FastAPI()
+    app.include_router(auth_router, prefix="/api/v1/auth")
+    app.include_router(transaction_router, prefix="/api/v1/transaction")
+
+    async_engine = create_async_engine(engine.url.set(drivername="sqlite+aiosqlite"), poolclass=NullPool)
+
+    async def override_async_session():
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            yield session
+            await session.commit()
+
+    app.dependency_overrides[get_async_session] = override_async_session
+    app.dependency_overrides[validate_token] = lambda: auth_user
+    return TestClient(app)
+
+
+def test_login_reads_through_async_session(engine, accounts):
+    client = make_client(engine)
+
+    response = client.post("/api/v1/auth/login", json={"emp_id": "AJA001", "password": "Password123"})
+    assert response.status_code == 200
+    assert response.json()["data"]["user_type"] == "user"
+
+    response = client.post("/api/v1/auth/login", json={"email": "canteen@example.com", "password": "wrong"})
+    assert response.status_code == 400
+    assert response.json()["error"] == "Invalid Password"
+
+
+def test_redemption_and_balances_through_async_session(engine, accounts):
+    employee = make_client(engine, {"user_id": accounts["employee"], "is_user": True})
+    owner = make_client(engine, {"user_id": accounts["owner"], "is_vendor": True})
+
+    response = employee.post("/api/v1/transaction/user/vendor/transaction", json={"vendor_name": "Canteen", "points": 30})
+    assert response.status_code == 201
+    response = employee.post("/api/v1/transaction/user/vendor/transaction", json={"vendor_name": "Canteen", "points": 500})
+    assert response.status_code == 400
+
+    assert employee.get("/api/v1/transaction/user/points").json()["data"]["points"] == 70
+    assert owner.get("/api/v1/transaction/vendor/points").json()["data"]["points"] == 30
+    with Session(engine) as session:
+        assert session.exec(select(UserBalance.points).where(UserBalance.user_id == accounts["employee"])).one() == 70
+
+
+def test_login_rehashes_passwords_stored_with_another_cost(engine, accounts, monkeypatch):
+    import src.user.utils as user_utils
+    from passlib.context import CryptContext
+    monkeypatch.setattr(user_utils, "PASSWORD_HASH_WORKERS", 0)
+    monkeypatch.setattr(user_utils, "pwd_context", CryptContext(
+        schemes=["bcrypt"], bcrypt__default_rounds=5, bcrypt__min_rounds=5, bcrypt__max_rounds=5))
+    client = make_client(engine)
+
+    def stored_hash():
+        with Session(engine) as session:
+            return session.exec(select(User.password).where(User.id == accounts["employee"])).one()
+
+    assert not stored_hash().startswith("$2b$05$")
+    assert client.post("/api/v1/auth/login", json={"emp_id": "AJA001", "password": "Password123"}).status_code == 200
+    rehashed = stored_hash()
+    assert rehashed.startswith("$2b$05$")
+
+    assert client.post("/api/v1/auth/login", json={"emp_id": "AJA001", "password": "Password123"}).status_code == 200
+    assert stored_hash() == rehashed
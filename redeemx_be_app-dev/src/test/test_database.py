@@ -71,3 +71,82 @@ def test_get_session_commit_exception():
         mock_session_instance.close.assert_called_once()
         
 
+
+
+def test_pool_settings_come_from_the_environment():
+    from src.database import engine_options, pool_metrics
+    with patch("src.database.DB_POOL_SIZE", 3), patch("src.database.DB_MAX_OVERFLOW", 1), \
+         patch("src.database.DB_POOL_TIMEOUT", 0.2):
+        options = engine_options("mysql+pymysql://u:p@db/x", "primary")
+    assert options["pool_size"] == 3 and options["max_overflow"] == 1
+    assert options["pool_pre_ping"] is True and options["echo"] is False
+    assert options["poolclass"].metrics is pool_metrics["primary"]
+    assert engine_options("sqlite://", "async") == {"echo": False}
+
+
+def test_pool_records_in_use_and_checkout_waits(tmp_path):
+    from src.database import PoolMetrics, _InstrumentedPool
+    from sqlalchemy.pool import QueuePool
+    from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+    metrics = PoolMetrics()
+    poolclass = type("InstrumentedQueuePool", (_InstrumentedPool, QueuePool), {"metrics": metrics})
+    test_engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=poolclass,
+                                pool_size=1, max_overflow=0, pool_timeout=0.05)
+
+    connection = test_engine.connect()
+    assert test_engine.pool.checkedout() == 1
+    with pytest.raises(PoolTimeoutError):
+        test_engine.connect()
+    connection.close()
+    test_engine.connect().close()
+
+    snapshot = metrics.snapshot()
+    assert snapshot["checkouts"] == 2
+    assert snapshot["checkout_timeouts"] == 1
+    assert snapshot["checkout_wait_max_ms"] >= 0
+    test_engine.dispose()
+
+
+def test_pool_metrics_route_is_admin_only():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from src.auth.dependencies import validate_token
+    from src.metrics import router as metrics_router
+
+    app = FastAPI()
+    app.include_router(metrics_router, prefix="/api/v1/metrics")
+    client = TestClient(app)
+
+    app.dependency_overrides[validate_token] = lambda: {"user_id": "admin", "is_admin": True}
+    primary = client.get("/api/v1/metrics/pool").json()["data"]["primary"]
+    assert {"pool_size", "in_use", "checkout_wait_avg_ms", "checkout_timeouts"} <= primary.keys()
+
+    app.dependency_overrides[validate_token] = lambda: {"user_id": "employee", "is_user": True}
+    assert client.get("/api/v1/metrics/pool").status_code == 401
+
+
+def test_read_only_session_is_not_committed():
+    from src.database import mark_read_only
+    with patch("src.database.Session") as mock_session_cls:
+        mock_session_instance = MagicMock(name="MockSession")
+        mock_session_instance.info = {}
+        mock_session_cls.return_value = mock_session_instance
+        gen = get_session()
+        session = next(gen)
+        mark_read_only(session)
+        with pytest.raises(StopIteration):
+            next(gen)
+        mock_session_instance.commit.assert_not_called()
+        mock_session_instance.close.assert_called_once()
+
+
+def test_read_only_transactions_on_mysql():
+    from src.database import _begin_read_only
+    connection = MagicMock()
+    connection.dialect.name = "mysql"
+    _begin_read_only(MagicMock(info={"read_only": True}), None, connection)
+    connection.exec_driver_sql.assert_called_once_with("SET TRANSACTION READ ONLY")
+
+    connection.reset_mock()
+    _begin_read_only(MagicMock(info={}), None, connection)
+    connection.exec_driver_sql.assert_not_called()
@@ -0,0 +1,177 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlmodel import SQLModel, Session, create_engine, select, func
+from sqlalchemy import event
+from sqlalchemy.pool import NullPool
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+from datetime import timedelta
+
+from src.database import get_session, get_async_session, is_read_only
+from src.auth.dependencies import validate_token
+from src.models import IdempotencyKey
+from src.user.models import User
+from src.vendor.models import Vendor, Claim
+from src.transaction.models import Transaction
+from src.transaction.service import record_transaction
+from src.transaction.router import router as transaction_router
+from src.vendor.router import router as vendor_router
+from src.idempotency import purge_expired_idempotency_keys, _now
+from src import idempotency, config
+
+
+@pytest.fixture
+def engine(tmp_path):
+    # A file database, so the async routes' aiosqlite connections see the same rows.
+    engine = create_engine(f"sqlite:///{tmp_path / 'redeemx.db'}", connect_args={"check_same_thread": False})
+    SQLModel.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def accounts(engine):
+    with Session(engine) as session:
+        employee = User(name="Employee One", username="employee", password="Password123",
+                        email="employee@example.com", mobile_number="9876543210", emp_id="AJA001", is_user=True)
+        owner = User(name="Canteen Owner", username="canteen", password="Password123",
+                     email="canteen@example.com", mobile_number="9876543210", is_vendor=True)
+        vendor = Vendor(vendor_name="Canteen", qr_code="qr-code", user_id=owner.id, bank_name="Bank",
+                        account_holder_name="Owner", account_number="12345678", ifsc_code="ABCD0123456",
+                        branch_name="Main", aadhar_card="123456789012", pan_card="ABCDE1234F")
+        session.add_all([employee, owner, vendor])
+        session.commit()
+        record_transaction(session, Transaction(user_id=employee.id, points=100))
+        record_transaction(session, Transaction(user_id=employee.id, vendor_id=vendor.id, points=-60))
+        session.commit()
+        return {"employee": employee.id, "owner": owner.id, "vendor": vendor.id}
+
+
+def make_client(engine, auth_user):
+    app = FastAPI()
+    app.include_router(transaction_router, prefix="/api/v1/transaction")
+    app.include_router(vendor_router, prefix="/api/v1/vendor")
+
+    def override_session():
+        with Session(engine, expire_on_commit=False) as session:
+            yield session
+            if not is_read_only(session):
+                session.commit()
+
+    async_engine = create_async_engine(engine.url.set(drivername="sqlite+aiosqlite"), poolclass=NullPool)
+
+    async def override_async_session():
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            yield session
+            await session.commit()
+
+    app.dependency_overrides[get_session] = override_session
+    app.dependency_overrides[get_async_session] = override_async_session
+    app.dependency_overrides[validate_token] = lambda: auth_user
+    return TestClient(app)
+
+
+def count(engine, model):
+    with Session(engine) as session:
+        return session.exec(select(func.count()).select_from(model)).one()
+
+
+def test_retried_redemption_is_applied_once(engine, accounts):
+    client = make_client(engine, {"user_id": accounts["employee"], "is_user": True})
+    payload = {"vendor_name": "Canteen", "points": 10}
+    headers = {"Idempotency-Key": "scan-1"}
+
+    first = client.post("/api/v1/transaction/user/vendor/transaction", json=payload, headers=headers)
+    retry = client.post("/api/v1/transaction/user/vendor/transaction", json=payload, headers=headers)
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.json() == first.json()
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert count(engine, Transaction) == 3
+    assert client.get("/api/v1/transaction/user/points").json()["data"]["points"] == 30
+
+
+def test_key_reused_with_different_payload_is_rejected(engine, accounts):
+    client = make_client(engine, {"user_id": accounts["employee"], "is_user": True})
+    headers = {"Idempotency-Key": "scan-2"}
+
+    client.post("/api/v1/transaction/user/vendor/transaction", json={"vendor_name": "Canteen", "points": 10}, headers=headers)
+    response = client.post("/api/v1/transaction/user/vendor/transaction", json={"vendor_name": "Canteen", "points": 20}, headers=headers)
+
+    assert response.status_code == 422
+    assert count(engine, Transaction) == 3
+
+
+def test_requests_without_key_are_not_deduplicated(engine, accounts):
+    client = make_client(engine, {"user_id": accounts["employee"], "is_user": True})
+    for _ in range(2):
+        client.post("/api/v1/transaction/user/vendor/transaction", json={"vendor_name": "Canteen", "points": 10})
+    assert count(engine, Transaction) == 4
+    assert count(engine, IdempotencyKey) == 0
+
+
+def test_retried_claim_request_creates_one_claim(engine, accounts):
+    client = make_client(engine, {"user_id": accounts["owner"], "is_vendor": True})
+    headers = {"Idempotency-Key": "claim-1"}
+
+    first = client.post("/api/v1/vendor/claim/request", json={"points": 50}, headers=headers)
+    retry = client.post("/api/v1/vendor/claim/request", json={"points": 50}, headers=headers)
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.json() == first.json()
+    assert count(engine, Claim) == 1
+
+
+def test_claim_and_stored_response_commit_together(engine, accounts):
+    commits = []
+    event.listen(engine, "commit", lambda connection: commits.append(connection))
+    client = make_client(engine, {"user_id": accounts["owner"], "is_vendor": True})
+
+    response = client.post("/api/v1/vendor/claim/request", json={"points": 50}, headers={"Idempotency-Key": "claim-2"})
+    assert response.status_code == 201
+    assert len(commits) == 1
+
+    commits.clear()
+    assert client.get("/api/v1/vendor/claim/points").status_code == 200
+    assert commits == []
+
+
+def test_expired_keys_are_purged_and_reusable(engine, accounts):
+    client = make_client(engine, {"user_id": accounts["employee"], "is_user": True})
+    payload = {"vendor_name": "Canteen", "points": 10}
+    client.post("/api/v1/transaction/user/vendor/transaction", json=payload, headers={"Idempotency-Key": "scan-3"})
+
+    with Session(engine) as session:
+        record = session.exec(select(IdempotencyKey)).one()
+        record.expires_at = _now() - timedelta(seconds=1)
+        session.add(record)
+        session.commit()
+
+    response = client.post("/api/v1/transaction/user/vendor/transaction", json=payload, headers={"Idempotency-Key": "scan-3"})
+    assert "Idempotent-Replayed" not in response.headers
+    assert count(engine, Transaction) == 4
+
+    with Session(engine) as session:
+        record = session.exec(select(IdempotencyKey)).one()
+        record.expires_at = _now() - timedelta(seconds=1)
+        session.add(record)
+        session.commit()
+        assert purge_expired_idempotency_keys(session) == 1
+        session.commit()
+    assert count(engine, IdempotencyKey) == 0
+
+
+def test_expired_keys_are_purged_on_a_schedule_in_batches(engine, monkeypatch):
+    monkeypatch.setattr(idempotency, "IDEMPOTENCY_PURGE_BATCH_SIZE", 2)
+    monkeypatch.setattr(config, "engine", engine)
+    with Session(engine) as session:
+        session.add_all([IdempotencyKey(id=f"expired-{i}", request_hash="h", expires_at=_now() - timedelta(seconds=1))
+                         for i in range(5)])
+        session.add(IdempotencyKey(id="live", request_hash="h", expires_at=_now() + timedelta(hours=1)))
+        session.commit()
+
+    assert config.scheduler.get_job("purge_idempotency_keys") is not None
+    config.purge_idempotency_keys()
+    with Session(engine) as session:
+        assert session.exec(select(IdempotencyKey.id)).all() == ["live"]
@@ -7,6 +7,7 @@ from fastapi import HTTPException
 import os
 import sys
 import runpy
+import subprocess
 import uvicorn
 
 client = TestClient(app)
@@ -48,3 +49,14 @@ def test_main_if_main(monkeypatch):
     runpy.run_path("main.py", run_name="__main__")
     assert run_calls == [("0.0.0.0", 8000)]
 
+
+
+def test_import_does_not_load_heavy_libraries_or_touch_the_database():
+    # A fresh interpreter: this test session may already have imported pandas elsewhere.
+    code = ("import sys, main; "
+            "print(sorted(name for name in ('pandas', 'qrcode', 'PIL') if name in sys.modules))")
+    src_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = {**os.environ, "DB_HOST": "unreachable.invalid"}
+    result = subprocess.run([sys.executable, "-c", code], cwd=src_dir, env=env, capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().splitlines()[-1] == "[]"
@@ -0,0 +1,137 @@
+import os
+import pytest
+from datetime import datetime
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, inspect
+from sqlmodel import SQLModel, Session
+
+# Importing the vendor models registers the user, vendor and transaction tables.
+from src.vendor.models import Vendor, Claim, VendorBalance
+from src.models import IdempotencyKey
+from src.jobs.models import Job, SchedulerLease, SchedulerRun
+from src.user.models import User
+from src.transaction.models import Transaction, UserBalance, RosterGrant
+from src.transaction.service import verify_daily_rollups, verify_user_balances, summarize_points
+from src.vendor.service import verify_vendor_balances
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+
+@pytest.fixture
+def alembic_config(tmp_path):
+    config = Config(os.path.join(PROJECT_ROOT, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(PROJECT_ROOT, "alembic"))
+    config.set_main_option("sqlalchemy.url", f"sqlite:///{tmp_path / 'migrations.db'}")
+    return config
+
+
+def test_migrations_match_models(alembic_config):
+    command.upgrade(alembic_config, "head")
+
+    engine = create_engine(alembic_config.get_main_option("sqlalchemy.url"))
+    with engine.connect() as connection:
+        assert compare_metadata(MigrationContext.configure(connection), SQLModel.metadata) == []
+    engine.dispose()
+
+
+
+def test_first_revision_is_the_pre_migration_schema(alembic_config):
+    # An existing database is stamped at this revision, so it must create nothing the app did not create before.
+    command.upgrade(alembic_config, "5b0e7d2c4a91")
+    engine = create_engine(alembic_config.get_main_option("sqlalchemy.url"))
+    assert set(inspect(engine).get_table_names()) == {"alembic_version", "user", "vendor", "claim", "transaction",
+                                                      "dailyreports"}
+    engine.dispose()
+
+
+def test_balances_are_backfilled_from_ledger(alembic_config):
+    command.upgrade(alembic_config, "5b0e7d2c4a91")
+    engine = create_engine(alembic_config.get_main_option("sqlalchemy.url"))
+    with Session(engine) as session:
+        user = User(name="Employee One", username="employee", password="Password123",
+                    email="employee@example.com", mobile_number="9876543210", is_user=True)
+        owner = User(name="Canteen Owner", username="canteen", password="Password123",
+                     email="canteen@example.com", mobile_number="9876543210", is_vendor=True)
+        vendors = [Vendor(vendor_name=name, qr_code="qr-code", user_id=user_id, bank_name="Bank",
+                          account_holder_name="Owner", account_number="12345678", ifsc_code="ABCD0123456",
+                          branch_name="Main", aadhar_card="123456789012", pan_card="ABCDE1234F")
+                   for name, user_id in (("Canteen", owner.id), ("Kiosk", None))]
+        session.add_all([user, owner, *vendors])
+        session.commit()
+        user_id, canteen_id = user.id, vendors[0].id
+        session.add_all([Transaction(user_id=user_id, points=100),
+                         Transaction(user_id=user_id, vendor_id=canteen_id, points=-30),
+                         Transaction(vendor_id=canteen_id, points=10),
+                         Claim(vendor_id=canteen_id, points=10, status="APPROVED"),
+                         Claim(vendor_id=canteen_id, points=15)])
+        session.commit()
+
+    command.upgrade(alembic_config, "head")
+    with Session(engine) as session:
+        assert verify_user_balances(session) == []
+        assert verify_vendor_balances(session) == []
+        assert session.get(UserBalance, user_id).points == 70
+        canteen = session.get(VendorBalance, canteen_id)
+        assert (canteen.received_points, canteen.claimed_points, canteen.pending_claim_points) == (30, 10, 15)
+    engine.dispose()
+
+def test_ledger_indexes_are_created_and_dropped(alembic_config):
+    command.upgrade(alembic_config, "head")
+    engine = create_engine(alembic_config.get_main_option("sqlalchemy.url"))
+    index_names = {index["name"] for index in inspect(engine).get_indexes("transaction")}
+    assert {"ix_transaction_user_id_created_at", "ix_transaction_vendor_id_created_at",
+            "ix_transaction_created_at"} <= index_names
+
+    command.downgrade(alembic_config, "base")
+    assert inspect(engine).get_table_names() == ["alembic_version"]
+    engine.dispose()
+
+
+def test_index_migration_skips_indexes_created_by_create_all(alembic_config):
+    engine = create_engine(alembic_config.get_main_option("sqlalchemy.url"))
+    SQLModel.metadata.create_all(engine)
+    command.stamp(alembic_config, "5b0e7d2c4a91")
+
+    command.upgrade(alembic_config, "9c4f1e8a2d37")
+    engine.dispose()
+
+
+def test_daily_rollup_is_backfilled_from_ledger(alembic_config):
+    command.upgrade(alembic_config, "9c4f1e8a2d37")
+    engine = create_engine(alembic_config.get_main_option("sqlalchemy.url"))
+    with Session(engine) as session:
+        user = User(name="Employee One", username="employee", password="Password123",
+                    email="employee@example.com", mobile_number="9876543210", is_user=True)
+        session.add(user)
+        session.add_all([Transaction(user_id=user.id, points=20, created_at=datetime(2024, 1, day, 10))
+                         for day in (1, 1, 2)])
+        session.commit()
+
+    command.upgrade(alembic_config, "head")
+    with Session(engine) as session:
+        assert verify_daily_rollups(session) == []
+        assert summarize_points(session)["points_assigned_to_employee"] == 60
+    engine.dispose()
+
+
+def test_startup_check_requires_head_revision(alembic_config, monkeypatch):
+    from src import database
+    engine = create_engine(alembic_config.get_main_option("sqlalchemy.url"))
+    monkeypatch.setattr(database, "engine", engine)
+
+    with pytest.raises(RuntimeError, match="alembic upgrade head"):
+        database.prepare_database("check")
+
+    command.upgrade(alembic_config, "9c4f1e8a2d37")
+    with pytest.raises(RuntimeError, match="9c4f1e8a2d37"):
+        database.prepare_database("check")
+
+    command.upgrade(alembic_config, "head")
+    database.prepare_database("check")
+    database.prepare_database("skip")
+    with pytest.raises(ValueError):
+        database.prepare_database("migrate")
+    engine.dispose()
@@ -0,0 +1,180 @@
+import pytest
+from datetime import datetime, timedelta
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel, Session, create_engine, select
+
+from src.database import get_session
+from src.auth.dependencies import validate_token
+from src.user.models import User
+from src.vendor.models import Vendor
+from src.transaction.models import Transaction
+from src.transaction.service import record_transaction
+from src.vendor.service import create_claim
+from src.pagination import encode_cursor, decode_cursor, iter_pages, MAX_PAGE_SIZE
+from src.user.router import router as user_router
+from src.vendor.router import router as vendor_router
+
+NOW = datetime.now().replace(microsecond=0)
+DATE_RANGE = {"start_date": str((NOW - timedelta(days=2)).date()), "end_date": str(NOW.date())}
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def accounts(engine):
+    with Session(engine) as session:
+        employee = User(name="Employee One", username="employee", password="Password123",
+                        email="employee@example.com", mobile_number="9876543210", emp_id="AJA001", is_user=True)
+        owner = User(name="Canteen Owner", username="canteen", password="Password123",
+                     email="canteen@example.com", mobile_number="9876543210", is_vendor=True)
+        vendor = Vendor(vendor_name="Canteen", qr_code="qr-code", user_id=owner.id, bank_name="Bank",
+                        account_holder_name="Owner", account_number="12345678", ifsc_code="ABCD0123456",
+                        branch_name="Main", aadhar_card="123456789012", pan_card="ABCDE1234F")
+        session.add_all([employee, owner, vendor])
+        session.commit()
+
+        # 25 redemptions in groups of five sharing a timestamp, so pages split ties on created_at.
+        for i in range(25):
+            record_transaction(session, Transaction(user_id=employee.id, vendor_id=vendor.id, points=-(i + 1),
+                                                    created_at=NOW - timedelta(minutes=i // 5)))
+        for points in range(1, 8):
+            create_claim(session, vendor.id, points)
+        session.commit()
+        return {"employee": employee.id, "owner": owner.id}
+
+
+def make_client(engine, auth_user):
+    app = FastAPI()
+    app.include_router(user_router, prefix="/api/v1/user")
+    app.include_router(vendor_router, prefix="/api/v1/vendor")
+
+    def override_session():
+        with Session(engine) as session:
+            yield session
+            session.commit()
+
+    app.dependency_overrides[get_session] = override_session
+    app.dependency_overrides[validate_token] = lambda: auth_user
+    return TestClient(app)
+
+
+def walk(client, path, params):
+    pages, cursor = [], None
+    while True:
+        body = client.get(path, params={**params, **({"cursor": cursor} if cursor else {})}).json()
+        pages.append(body)
+        cursor = body["metadata"]["next_cursor"]
+        if not cursor:
+            return pages
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2024, 5, 1, 10, 30, 15, 123456)
+    assert decode_cursor(encode_cursor(created_at, "abc")) == (created_at, "abc")
+    with pytest.raises(HTTPException):
+        decode_cursor("not-a-cursor")
+
+
+def test_cursor_pages_cover_every_row_once(engine, accounts):
+    client = make_client(engine, {"user_id": accounts["owner"], "is_vendor": True})
+    everything = client.get("/api/v1/vendor/all/transactions", params={**DATE_RANGE, "limit": 100}).json()
+
+    pages = walk(client, "/api/v1/vendor/all/transactions", {**DATE_RANGE, "limit": 4, "include_total": False})
+
+    assert [len(page["data"]) for page in pages] == [4, 4, 4, 4, 4, 4, 1]
+    assert [row for page in pages for row in page["data"]] == everything["data"]
+    assert everything["metadata"]["total"] == 25
+    assert all("total" not in page["metadata"] for page in pages)
+
+
+def test_offset_pages_still_work(engine, accounts):
+    client = make_client(engine, {"user_id": accounts["owner"], "is_vendor": True})
+    first = client.get("/api/v1/vendor/user/transactions", params={**DATE_RANGE, "limit": 10}).json()
+    second = client.get("/api/v1/vendor/user/transactions", params={**DATE_RANGE, "limit": 10, "offset": 10}).json()
+    by_cursor = client.get("/api/v1/vendor/user/transactions",
+                           params={**DATE_RANGE, "limit": 10, "cursor": first["metadata"]["next_cursor"]}).json()
+
+    assert second["data"] == by_cursor["data"]
+    # Offset pages keep the total and offset they always returned; cursor pages skip the COUNT.
+    assert first["metadata"]["total"] == 25
+    assert second["metadata"] == {"limit": 10, "total": 25, "offset": 10,
+                                  "next_cursor": by_cursor["metadata"]["next_cursor"]}
+    assert by_cursor["metadata"] == {"limit": 10, "next_cursor": by_cursor["metadata"]["next_cursor"]}
+
+
+def test_iter_pages_leaves_the_callers_objects_in_the_session(engine, accounts):
+    with Session(engine) as session:
+        employee = session.get(User, accounts["employee"])
+        employee.name = "Renamed"
+        added = User(name="Added", username="added", password="Password123",
+                     email="added@example.com", mobile_number="9876543210", is_user=True)
+        session.add(added)
+        session.flush()
+
+        walked = list(iter_pages(session, select(User), User, batch_size=1))
+
+        assert {user.id for user in walked} == {accounts["employee"], accounts["owner"], added.id}
+        owner = next(user for user in walked if user.id == accounts["owner"])
+        assert owner not in session
+        assert employee in session and added in session
+        session.commit()
+    with Session(engine) as session:
+        assert session.get(User, accounts["employee"]).name == "Renamed"
+
+
+def test_oversized_pages_are_clamped_not_rejected(engine, accounts):
+    client = make_client(engine, {"user_id": accounts["owner"], "is_vendor": True})
+    response = client.get("/api/v1/vendor/user/transactions", params={**DATE_RANGE, "limit": MAX_PAGE_SIZE * 2})
+
+    assert response.status_code == 200
+    assert response.json()["metadata"]["limit"] == MAX_PAGE_SIZE
+    assert len(response.json()["data"]) == 25
+
+
+def test_unpaged_listings_accept_a_cursor(engine, accounts):
+    employee = make_client(engine, {"user_id": accounts["employee"], "is_user": True})
+    assert len(employee.get("/api/v1/user/debit-transactions", params=DATE_RANGE).json()["data"]) == 25
+    pages = walk(employee, "/api/v1/user/debit-transactions", {**DATE_RANGE, "limit": 10})
+    assert [len(page["data"]) for page in pages] == [10, 10, 5]
+
+    vendor = make_client(engine, {"user_id": accounts["owner"], "is_vendor": True})
+    pages = walk(vendor, "/api/v1/vendor/claim/requests", {"limit": 3})
+    assert [claim["points"] for page in pages for claim in page["data"]] == [7, 6, 5, 4, 3, 2, 1]
+
+
+def test_invalid_cursor_is_rejected(engine, accounts):
+    client = make_client(engine, {"user_id": accounts["owner"], "is_vendor": True})
+    response = client.get("/api/v1/vendor/all/transactions", params={**DATE_RANGE, "cursor": "garbage"})
+    assert response.status_code == 400
+
+
+def test_cursor_page_is_read_in_index_order(engine, accounts):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if "ORDER BY" in statement and "LIMIT" in statement:
+            statements.append((statement, parameters))
+
+    client = make_client(engine, {"user_id": accounts["owner"], "is_vendor": True})
+    first = client.get("/api/v1/vendor/all/transactions", params={**DATE_RANGE, "limit": 4}).json()
+    event.listen(engine, "before_cursor_execute", record)
+    client.get("/api/v1/vendor/all/transactions",
+               params={**DATE_RANGE, "limit": 4, "cursor": first["metadata"]["next_cursor"]})
+    event.remove(engine, "before_cursor_execute", record)
+
+    (statement, parameters), = statements
+    with engine.connect() as connection:
+        cursor = connection.connection.cursor()
+        cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        plan = [row[-1] for row in cursor.fetchall()]
+    assert any("ix_transaction_vendor_id_created_at" in detail for detail in plan)
+    assert not any("TEMP B-TREE" in detail for detail in plan), plan
@@ -0,0 +1,116 @@
+import pytest
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel, Session, create_engine
+
+from src.database import get_session
+from src.auth.dependencies import validate_token
+from src.user.models import User
+from src.vendor.models import Vendor
+from src.transaction.models import Transaction
+from src.transaction.service import record_transaction
+from src.user.router import router as user_router
+from src.vendor.router import router as vendor_router
+
+NOW = datetime.now().replace(microsecond=0)
+DATE_RANGE = {"start_date": str((NOW - timedelta(days=1)).date()), "end_date": str(NOW.date())}
+
+# Statements each listing may run per request, whatever the page size.
+QUERY_BUDGETS = {
+    "/api/v1/vendor/user/transactions": 4,
+    "/api/v1/vendor/all/transactions": 4,
+    "/api/v1/user/debit-transactions": 1,
+}
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def accounts(engine):
+    with Session(engine) as session:
+        employees = [User(name=f"Employee {i}", username=f"employee{i}", password="Password123",
+                          email=f"employee{i}@example.com", mobile_number="9876543210",
+                          emp_id=f"AJA{i:03}", is_user=True) for i in range(5)]
+        owner = User(name="Canteen Owner", username="canteen", password="Password123",
+                     email="canteen@example.com", mobile_number="9876543210", is_vendor=True)
+        vendor = Vendor(vendor_name="Canteen", qr_code="qr-code", user_id=owner.id, bank_name="Bank",
+                        account_holder_name="Owner", account_number="12345678", ifsc_code="ABCD0123456",
+                        branch_name="Main", aadhar_card="123456789012", pan_card="ABCDE1234F")
+        session.add_all([*employees, owner, vendor])
+        session.commit()
+
+        for i in range(30):
+            record_transaction(session, Transaction(user_id=employees[i % 5].id, vendor_id=vendor.id, points=-(i + 1),
+                                                    created_at=NOW - timedelta(minutes=i)))
+        for i in range(3):
+            record_transaction(session, Transaction(vendor_id=vendor.id, points=-10, created_at=NOW - timedelta(minutes=i)))
+        session.commit()
+        return {"employee": employees[0].id, "owner": owner.id}
+
+
+def make_client(engine, auth_user):
+    app = FastAPI()
+    app.include_router(user_router, prefix="/api/v1/user")
+    app.include_router(vendor_router, prefix="/api/v1/vendor")
+
+    def override_session():
+        with Session(engine) as session:
+            yield session
+            session.commit()
+
+    app.dependency_overrides[get_session] = override_session
+    app.dependency_overrides[validate_token] = lambda: auth_user
+    return TestClient(app)
+
+
+@contextmanager
+def count_queries(engine):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+@pytest.mark.parametrize("path", QUERY_BUDGETS)
+def test_listing_stays_within_query_budget(engine, accounts, path):
+    auth_user = ({"user_id": accounts["employee"], "is_user": True} if path.startswith("/api/v1/user")
+                 else {"user_id": accounts["owner"], "is_vendor": True})
+    client = make_client(engine, auth_user)
+
+    counts = []
+    for limit in (2, 30):
+        with count_queries(engine) as statements:
+            body = client.get(path, params={**DATE_RANGE, "limit": limit}).json()
+        assert body["data"]
+        counts.append(len(statements))
+
+    assert counts[0] == counts[1], "query count grows with the page size"
+    assert counts[1] <= QUERY_BUDGETS[path], counts
+
+
+def test_joined_listings_keep_names(engine, accounts):
+    vendor = make_client(engine, {"user_id": accounts["owner"], "is_vendor": True})
+    users = {row["user"] for row in vendor.get("/api/v1/vendor/all/transactions", params={**DATE_RANGE, "limit": 40}).json()["data"]}
+    assert users == {"admin", *(f"Employee {i}" for i in range(5))}
+    users = {row["user"] for row in vendor.get("/api/v1/vendor/user/transactions", params={**DATE_RANGE, "limit": 40}).json()["data"]}
+    assert users == {f"Employee {i}" for i in range(5)}
+
+    employee = make_client(engine, {"user_id": accounts["employee"], "is_user": True})
+    debits = employee.get("/api/v1/user/debit-transactions", params=DATE_RANGE).json()["data"]
+    assert len(debits) == 6 and {row["name"] for row in debits} == {"Canteen"}
@@ -0,0 +1,159 @@
+import re
+import pytest
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import NullPool
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlmodel import SQLModel, Session, create_engine
+
+from src.database import get_session, get_async_session
+from src.auth.dependencies import validate_token
+from src.models import IdempotencyKey
+from src.user.models import User
+from src.vendor.models import Vendor, Claim
+from src.transaction.models import Transaction
+from src.transaction.service import record_transaction
+from src.vendor.service import create_claim
+from src.user.router import router as user_router
+from src.vendor.router import router as vendor_router
+from src.transaction.router import router as transaction_router
+
+# Tables that grow with every redemption; a plain scan of one of them is a regression.
+LEDGER_TABLES = ("transaction", "claim")
+FULL_SCAN = re.compile(rf"^SCAN ({'|'.join(LEDGER_TABLES)})$")
+
+TODAY = datetime.now(ZoneInfo("Asia/Kolkata")).date()
+DATE_RANGE = {"start_date": str(TODAY - timedelta(days=30)), "end_date": str(TODAY)}
+
+USER_QUERIES = [
+    ("/api/v1/user/recent-transactions", DATE_RANGE),
+    ("/api/v1/user/credit-transactions", DATE_RANGE),
+    ("/api/v1/user/debit-transactions", DATE_RANGE),
+    ("/api/v1/user/all/points", DATE_RANGE),
+    ("/api/v1/transaction/user/points", {}),
+]
+VENDOR_QUERIES = [
+    ("/api/v1/vendor/user/transactions", DATE_RANGE),
+    ("/api/v1/vendor/admin/transactions", DATE_RANGE),
+    ("/api/v1/vendor/all/transactions", DATE_RANGE),
+    ("/api/v1/vendor/credited/points", DATE_RANGE),
+    ("/api/v1/vendor/debited/points/", DATE_RANGE),
+    ("/api/v1/vendor/all/points/", DATE_RANGE),
+    ("/api/v1/vendor/claim/requests", {}),
+    ("/api/v1/vendor/claim/requests", {"status": "PENDING"}),
+    ("/api/v1/vendor/claim/points", {}),
+    ("/api/v1/transaction/vendor/points", {}),
+]
+ADMIN_QUERIES = [
+    ("/api/v1/transaction/overallpoints", DATE_RANGE),
+    ("/api/v1/transaction/monthlypoints", {"month": TODAY.month, "year": TODAY.year}),
+    ("/api/v1/vendor/claims/by/admin", {"status": "PENDING"}),
+]
+
+
+@pytest.fixture(scope="module")
+def engine(tmp_path_factory):
+    # A file database, so the async routes' aiosqlite connections see the same rows.
+    engine = create_engine(f"sqlite:///{tmp_path_factory.mktemp('plans') / 'redeemx.db'}",
+                           connect_args={"check_same_thread": False})
+    SQLModel.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(scope="module")
+def accounts(engine):
+    with Session(engine) as session:
+        admin = User(name="Admin User", username="admin", password="Password123",
+                     email="admin@example.com", mobile_number="9876543210", is_admin=True)
+        owner = User(name="Canteen Owner", username="canteen", password="Password123",
+                     email="canteen@example.com", mobile_number="9876543210", is_vendor=True)
+        vendor = Vendor(vendor_name="Canteen", qr_code="qr-code", user_id=owner.id, bank_name="Bank",
+                        account_holder_name="Owner", account_number="12345678", ifsc_code="ABCD0123456",
+                        branch_name="Main", aadhar_card="123456789012", pan_card="ABCDE1234F")
+        employees = [User(name=f"Employee {i}", username=f"employee{i}", password="Password123",
+                          email=f"employee{i}@example.com", mobile_number="9876543210",
+                          emp_id=f"AJA{i:03}", is_user=True) for i in range(5)]
+        session.add_all([admin, owner, vendor, *employees])
+        session.commit()
+
+        for day in range(10):
+            created_at = datetime.now(ZoneInfo("Asia/Kolkata")) - timedelta(days=day)
+            for employee in employees:
+                record_transaction(session, Transaction(user_id=employee.id, points=20, created_at=created_at))
+                record_transaction(session, Transaction(user_id=employee.id, vendor_id=vendor.id, points=-10,
+                                                        created_at=created_at))
+        record_transaction(session, Transaction(vendor_id=vendor.id, points=50))
+        create_claim(session, vendor.id, 40)
+        session.commit()
+        return {"admin": admin.id, "owner": owner.id, "employee": employees[0].id}
+
+
+@pytest.fixture(scope="module")
+def plans(engine):
+    """Record every statement the routes run so its query plan can be inspected afterwards."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    # Listen on every engine: the async routes run on their own aiosqlite engine.
+    event.listen(Engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(Engine, "before_cursor_execute", record)
+
+
+def make_client(engine, auth_user):
+    app = FastAPI()
+    app.include_router(user_router, prefix="/api/v1/user")
+    app.include_router(vendor_router, prefix="/api/v1/vendor")
+    app.include_router(transaction_router, prefix="/api/v1/transaction")
+
+    def override_session():
+        with Session(engine) as session:
+            yield session
+            session.commit()
+
+    async_engine = create_async_engine(engine.url.set(drivername="sqlite+aiosqlite"), poolclass=NullPool)
+
+    async def override_async_session():
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            yield session
+            await session.commit()
+
+    app.dependency_overrides[get_session] = override_session
+    app.dependency_overrides[get_async_session] = override_async_session
+    app.dependency_overrides[validate_token] = lambda: auth_user
+    return TestClient(app)
+
+
+def explain(engine, statement, parameters):
+    with engine.connect() as connection:
+        cursor = connection.connection.cursor()
+        cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+@pytest.mark.parametrize("auth_key, flags, queries", [
+    ("employee", {"is_user": True}, USER_QUERIES),
+    ("owner", {"is_vendor": True}, VENDOR_QUERIES),
+    ("admin", {"is_admin": True}, ADMIN_QUERIES),
+])
+def test_router_queries_do_not_scan_ledger_tables(engine, accounts, plans, auth_key, flags, queries):
+    client = make_client(engine, {"user_id": accounts[auth_key], "email": f"{auth_key}@example.com", **flags})
+
+    for path, params in queries:
+        plans.clear()
+        response = client.get(path, params=params)
+        assert response.status_code == 200, (path, response.json())
+        assert plans, f"{path} ran no queries"
+
+        for statement, parameters in plans:
+            full_scans = [detail for detail in explain(engine, statement, parameters) if FULL_SCAN.match(detail)]
+            assert not full_scans, f"{path} scans {full_scans}:\n{statement}"
@@ -0,0 +1,113 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.pool import NullPool
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import SQLModel, Session, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+import src.database as database
+from src.database import get_session, get_async_session
+from src.auth.dependencies import validate_token
+from src.user.models import User
+from src.vendor.models import Vendor
+from src.transaction.models import Transaction
+from src.transaction.service import record_transaction
+from src.transaction.router import router as transaction_router
+from src.user.router import router as user_router
+
+
+def seed(engine, points):
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        employee = User(id="employee", name="Employee One", username="employee", password="Password123",
+                        email="employee@example.com", mobile_number="9876543210", emp_id="AJA001", is_user=True)
+        session.add(employee)
+        session.commit()
+        record_transaction(session, Transaction(user_id=employee.id, points=points))
+        session.commit()
+
+
+@pytest.fixture
+def databases(tmp_path, monkeypatch):
+    """A primary holding 100 points and a lagging replica that has only seen 60."""
+    primary = create_engine(f"sqlite:///{tmp_path / 'primary.db'}", connect_args={"check_same_thread": False})
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica.db'}", connect_args={"check_same_thread": False})
+    seed(primary, 100)
+    seed(replica, 60)
+    async_primary = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}", poolclass=NullPool)
+    async_replica = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}", poolclass=NullPool)
+
+    monkeypatch.setattr(database, "replica_engine", replica)
+    monkeypatch.setattr(database, "async_replica_engine", async_replica)
+    monkeypatch.setattr(database, "_replica_down_until", 0.0)
+    yield {"primary": primary, "async_primary": async_primary, "primary_sessions": []}
+    primary.dispose()
+    replica.dispose()
+
+
+def make_client(databases):
+    app = FastAPI()
+    app.include_router(user_router, prefix="/api/v1/user")
+    app.include_router(transaction_router, prefix="/api/v1/transaction")
+
+    def override_session():
+        databases["primary_sessions"].append("sync")
+        with Session(databases["primary"]) as session:
+            yield session
+            session.commit()
+
+    async def override_async_session():
+        databases["primary_sessions"].append("async")
+        async with AsyncSession(databases["async_primary"], expire_on_commit=False) as session:
+            yield session
+            await session.commit()
+
+    app.dependency_overrides[get_session] = override_session
+    app.dependency_overrides[get_async_session] = override_async_session
+    app.dependency_overrides[validate_token] = lambda: {"user_id": "employee", "is_user": True}
+    return TestClient(app)
+
+
+def points(client, **headers):
+    return client.get("/api/v1/transaction/user/points", headers=headers).json()["data"]["points"]
+
+
+def test_get_routes_read_the_replica(databases):
+    client = make_client(databases)
+    assert points(client) == 60
+    credits = client.get("/api/v1/user/credit-transactions").json()["data"]
+    assert [credit["points"] for credit in credits] == [60]
+
+
+def test_replica_reads_do_not_open_a_primary_session(databases):
+    client = make_client(databases)
+    points(client)
+    client.get("/api/v1/user/credit-transactions")
+    assert databases["primary_sessions"] == []
+
+    points(client, **{"X-Read-Your-Writes": "true"})
+    client.get("/api/v1/user/credit-transactions", headers={"X-Read-Your-Writes": "true"})
+    assert databases["primary_sessions"] == ["async", "sync"]
+
+
+def test_read_your_writes_header_reads_the_primary(databases):
+    client = make_client(databases)
+    assert points(client, **{"X-Read-Your-Writes": "true"}) == 100
+    credits = client.get("/api/v1/user/credit-transactions", headers={"X-Read-Your-Writes": "true"}).json()["data"]
+    assert [credit["points"] for credit in credits] == [100]
+
+
+def test_unreachable_replica_falls_back_to_the_primary(databases, tmp_path, monkeypatch):
+    missing = tmp_path / "missing" / "replica.db"
+    monkeypatch.setattr(database, "replica_engine", create_engine(f"sqlite:///{missing}"))
+    monkeypatch.setattr(database, "async_replica_engine", create_async_engine(f"sqlite+aiosqlite:///{missing}", poolclass=NullPool))
+    client = make_client(databases)
+
+    credits = client.get("/api/v1/user/credit-transactions").json()["data"]
+    assert [credit["points"] for credit in credits] == [100]
+    assert database._replica_down_until > 0
+
+    monkeypatch.setattr(database, "_replica_down_until", 0.0)
+    assert points(client) == 100
+    assert database._replica_down_until > 0
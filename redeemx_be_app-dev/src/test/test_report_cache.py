@@ -0,0 +1,241 @@
+import pytest
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel, Session, create_engine
+
+from src.database import get_session, mark_read_source
+from src.auth.dependencies import validate_token
+from src.user.models import User
+from src.vendor.models import Vendor, Claim
+from src.transaction.models import Transaction
+from src.transaction.service import record_transaction
+from src.transaction.router import router as transaction_router
+from src.vendor.router import router as vendor_router
+from src.metrics import router as metrics_router
+from src import report_cache as report_cache_module
+from src.report_cache import ReportCache, report_cache
+
+TODAY = date.today()
+LAST_MONTH = (TODAY.replace(day=1) - timedelta(days=1)).replace(day=1)
+# Ledger rows are stamped in India time, which can be ahead of the server clock's today().
+UNTIL_TOMORROW = {"end_date": str(TODAY + timedelta(days=1))}
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    report_cache.clear()
+    yield
+    report_cache.clear()
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def accounts(engine):
+    with Session(engine) as session:
+        employee = User(name="Employee", username="employee", password="Password123", email="employee@example.com",
+                        mobile_number="9876543210", emp_id="AJA001", is_user=True)
+        owners = [User(name=f"Owner {i}", username=f"owner{i}", password="Password123",
+                       email=f"owner{i}@example.com", mobile_number="9876543210", is_vendor=True) for i in range(2)]
+        vendors = [Vendor(vendor_name=f"Vendor {i}", qr_code="qr-code", user_id=owner.id, bank_name="Bank",
+                          account_holder_name="Owner", account_number="12345678", ifsc_code="ABCD0123456",
+                          branch_name="Main", aadhar_card="123456789012", pan_card="ABCDE1234F")
+                   for i, owner in enumerate(owners)]
+        session.add_all([employee, *owners, *vendors])
+        session.commit()
+        record_transaction(session, Transaction(user_id=employee.id, points=500,
+                                                created_at=datetime.combine(LAST_MONTH, datetime.min.time())))
+        for vendor in vendors:
+            record_transaction(session, Transaction(user_id=employee.id, vendor_id=vendor.id, points=-10))
+        session.commit()
+        return {"employee": employee.id, "owners": [owner.id for owner in owners],
+                "vendors": [vendor.id for vendor in vendors]}
+
+
+def make_client(engine, auth_user):
+    app = FastAPI()
+    app.include_router(transaction_router, prefix="/api/v1/transaction")
+    app.include_router(vendor_router, prefix="/api/v1/vendor")
+    app.include_router(metrics_router, prefix="/api/v1/metrics")
+
+    def override_session():
+        with Session(engine) as session:
+            yield session
+            session.commit()
+
+    app.dependency_overrides[get_session] = override_session
+    app.dependency_overrides[validate_token] = lambda: auth_user
+    return TestClient(app)
+
+
+@contextmanager
+def count_queries(engine):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+def pay(engine, accounts, vendor, points=-5):
+    with Session(engine) as session:
+        record_transaction(session, Transaction(user_id=accounts["employee"], vendor_id=accounts["vendors"][vendor],
+                                                points=points))
+        session.commit()
+
+
+def test_lru_ttl_and_key_normalisation(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(report_cache_module.time, "monotonic", lambda: clock[0])
+    cache = ReportCache(max_size=2, ttl_seconds=60)
+    scope = (frozenset({"transaction"}), None, None, None)
+
+    # A date and the midnight datetime it resolves to are the same parameter; None parameters are dropped.
+    assert cache.key("monthlypoints", start=date(2024, 1, 1), vendor_id=None) == \
+        cache.key("monthlypoints", start=datetime(2024, 1, 1))
+    cache.put(cache.key("a"), 1, scope)
+    cache.put(cache.key("b"), 2, scope)
+    assert cache.get(cache.key("a")) == (True, 1)
+    cache.put(cache.key("c"), 3, scope)
+    # "b" was the least recently used.
+    assert cache.get(cache.key("b")) == (False, None)
+    clock[0] += 61
+    assert cache.get(cache.key("a")) == (False, None)
+    assert cache.stats() == {"size": 1, "max_size": 2, "ttl_seconds": 60, "hits": 1, "misses": 2,
+                             "hit_ratio": 0.3333, "invalidations": 0, "evictions": 1}
+
+
+def test_writes_only_drop_the_entries_in_their_scope():
+    cache = ReportCache(max_size=10, ttl_seconds=60)
+    january = (datetime(2024, 1, 1), datetime(2024, 1, 31, 23, 59, 59))
+    cache.cached("vendor", lambda: 1, ("transaction",), vendor_id="v1", start=january[0], end=january[1])
+    cache.cached("vendor", lambda: 2, ("transaction",), vendor_id="v2", start=january[0], end=january[1])
+    cache.cached("overall", lambda: 3, ("transaction",), start=january[0])
+    cache.cached("claims", lambda: 4, ("claim",))
+
+    assert cache.invalidate([("transaction", "v1", datetime(2024, 2, 3))]) == 1
+    assert cache.get(cache.key("overall", start=january[0]))[0] is False
+    assert cache.invalidate([("transaction", "v1", datetime(2024, 1, 10, 12))]) == 1
+    assert cache.get(cache.key("vendor", vendor_id="v2", start=january[0], end=january[1])) == (True, 2)
+    assert cache.invalidate([("transaction", report_cache_module.ANY, report_cache_module.ANY)]) == 1
+    assert cache.get(cache.key("claims")) == (True, 4)
+
+
+def test_a_write_during_a_computation_discards_it_only_if_in_scope():
+    cache = ReportCache(max_size=10, ttl_seconds=60)
+
+    def compute_across(write, value):
+        def compute():
+            cache.invalidate([write])
+            return value
+        return compute
+
+    cache.cached("vendor", compute_across(("transaction", "v2", datetime(2024, 1, 5)), 1), ("transaction",),
+                 vendor_id="v1")
+    assert cache.get(cache.key("vendor", vendor_id="v1")) == (True, 1)
+    cache.cached("claims", compute_across(("transaction", "v2", datetime(2024, 1, 5)), 2), ("claim",))
+    assert cache.get(cache.key("claims")) == (True, 2)
+
+    cache.cached("overall", compute_across(("transaction", "v1", datetime(2024, 1, 5)), 3), ("transaction",))
+    assert cache.get(cache.key("overall"))[0] is False
+
+
+def test_replica_and_primary_results_are_kept_apart_and_read_your_writes_skips_the_cache():
+    cache = ReportCache(max_size=10, ttl_seconds=60)
+    replica, primary, own_writes = Session(), Session(), Session()
+    mark_read_source(replica, "replica")
+    mark_read_source(primary, "primary")
+    mark_read_source(own_writes, "primary", read_your_writes=True)
+
+    assert cache.cached("overall", lambda: "stale", ("transaction",), session=replica) == "stale"
+    assert cache.cached("overall", lambda: "fresh", ("transaction",), session=primary) == "fresh"
+    assert cache.cached("overall", lambda: "own", ("transaction",), session=own_writes) == "own"
+    assert cache.cached("overall", lambda: "again", ("transaction",), session=replica) == "stale"
+    assert cache.stats()["size"] == 2
+
+
+def test_admin_reports_are_served_from_the_cache_until_a_transaction_commits(engine, accounts):
+    admin = make_client(engine, {"user_id": "admin", "is_admin": True})
+    first = admin.get("/api/v1/transaction/overallpoints", params=UNTIL_TOMORROW).json()["data"]
+    with count_queries(engine) as statements:
+        assert admin.get("/api/v1/transaction/overallpoints", params=UNTIL_TOMORROW).json()["data"] == first
+    assert statements == []
+
+    last_month = {"month": LAST_MONTH.month, "year": LAST_MONTH.year}
+    assert admin.get("/api/v1/transaction/monthlypoints", params=last_month).json()["data"][
+        "points_assigned_to_employee"] == 500
+    pay(engine, accounts, 0)
+
+    # Today's payment changes the totals up to tomorrow but not last month's.
+    assert admin.get("/api/v1/transaction/overallpoints", params=UNTIL_TOMORROW).json()["data"][
+        "total_points_user_sends_to_vendor"] == first["total_points_user_sends_to_vendor"] + 5
+    with count_queries(engine) as statements:
+        admin.get("/api/v1/transaction/monthlypoints", params=last_month)
+    assert statements == []
+
+    stats = admin.get("/api/v1/metrics/reports").json()["data"]["report_cache"]
+    assert (stats["hits"], stats["misses"], stats["invalidations"]) == (2, 3, 1)
+
+
+def test_vendor_points_are_dropped_only_by_that_vendors_writes(engine, accounts):
+    vendors = [make_client(engine, {"user_id": owner, "is_vendor": True}) for owner in accounts["owners"]]
+    for client in vendors:
+        assert client.get("/api/v1/vendor/all/points/").json()["data"][0]["credited"] == 10
+        assert client.get("/api/v1/vendor/credited/points").json()["data"][0]["credited"] == 10
+
+    pay(engine, accounts, 1, points=-7)
+    with count_queries(engine) as statements:
+        assert vendors[0].get("/api/v1/vendor/credited/points").json()["data"][0]["credited"] == 10
+    # Only the vendor id lookup reaches the database.
+    assert len(statements) == 1
+    assert vendors[1].get("/api/v1/vendor/credited/points").json()["data"][0]["credited"] == 17
+    assert vendors[1].get("/api/v1/vendor/all/points/").json()["data"][0]["balance"] == 17
+
+
+def test_claims_listing_sees_new_and_resolved_claims(engine, accounts):
+    admin = make_client(engine, {"user_id": "admin", "is_admin": True})
+    assert admin.get("/api/v1/vendor/claims/by/admin").json()["data"] == []
+
+    with Session(engine) as session:
+        claim = Claim(vendor_id=accounts["vendors"][0], points=5)
+        session.add(claim)
+        session.commit()
+    [listed] = admin.get("/api/v1/vendor/claims/by/admin").json()["data"]
+    assert listed["status"] == "PENDING"
+
+    with Session(engine) as session:
+        session.get(Claim, listed["id"]).status = "REJECTED"
+        session.commit()
+    assert admin.get("/api/v1/vendor/claims/by/admin").json()["data"][0]["status"] == "REJECTED"
+
+
+def test_rolled_back_writes_leave_the_cache_alone(engine, accounts):
+    admin = make_client(engine, {"user_id": "admin", "is_admin": True})
+    admin.get("/api/v1/transaction/overallpoints", params=UNTIL_TOMORROW)
+    with Session(engine) as session:
+        record_transaction(session, Transaction(user_id=accounts["employee"], points=20))
+        session.flush()
+        session.rollback()
+        session.commit()
+    assert report_cache.stats()["invalidations"] == 0
+    assert report_cache.stats()["size"] == 1
+
+
+def test_report_cache_metrics_need_an_admin(engine):
+    client = make_client(engine, {"user_id": "employee", "is_user": True})
+    assert client.get("/api/v1/metrics/reports").status_code == 401
@@ -0,0 +1,176 @@
+import asyncio
+import threading
+import time
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel, Session, create_engine
+
+from src.database import get_session
+from src.auth.dependencies import validate_token
+from src.transaction import router as transaction_router_module
+from src.transaction.router import router as transaction_router
+from src.metrics import router as metrics_router
+from src.report_cache import report_cache
+from src.single_flight import SingleFlight, single_flight
+
+CALLERS = 8
+
+
+@pytest.fixture(autouse=True)
+def fresh_counters():
+    report_cache.clear()
+    single_flight.reset()
+    yield
+    report_cache.clear()
+    single_flight.reset()
+
+
+def wait_for_followers(flight, followers):
+    """Hold the leader until the other callers have joined its computation."""
+    deadline = time.monotonic() + 5
+    while flight.stats()["coalesced"] < followers and time.monotonic() < deadline:
+        time.sleep(0.005)
+
+
+def test_concurrent_calls_share_one_computation():
+    flight = SingleFlight()
+    runs = []
+
+    def compute():
+        runs.append(threading.get_ident())
+        wait_for_followers(flight, CALLERS - 1)
+        return {"total": 42}
+
+    with ThreadPoolExecutor(CALLERS) as pool:
+        results = list(pool.map(lambda _: flight.do(("overallpoints",), compute), range(CALLERS)))
+
+    assert len(runs) == 1
+    assert results == [{"total": 42}] * CALLERS
+    assert flight.stats() == {"in_flight": 0, "calls": CALLERS, "executions": 1, "coalesced": CALLERS - 1,
+                              "coalesced_ratio": 0.875}
+    # Nothing outlives the computation: the next call runs again.
+    assert flight.do(("overallpoints",), lambda: {"total": 43}) == {"total": 43}
+
+
+def test_followers_get_the_leaders_error_and_different_keys_do_not_wait():
+    flight = SingleFlight()
+
+    def fail():
+        wait_for_followers(flight, CALLERS - 1)
+        raise ConnectionError("MySQL went away")
+
+    def call(i):
+        try:
+            return flight.do(("vendor/all/points", "v1"), fail)
+        except ConnectionError as e:
+            return str(e)
+
+    with ThreadPoolExecutor(CALLERS) as pool:
+        assert list(pool.map(call, range(CALLERS))) == ["MySQL went away"] * CALLERS
+    assert flight.do(("vendor/all/points", "v2"), lambda: 7) == 7
+    assert flight.stats()["executions"] == 2
+
+
+def test_async_callers_share_one_computation():
+    flight = SingleFlight()
+    runs = []
+
+    async def compute():
+        runs.append(1)
+        while flight.stats()["coalesced"] < CALLERS - 1:
+            await asyncio.sleep(0.005)
+        return 120
+
+    async def dashboards():
+        return await asyncio.gather(*(flight.do_async(("vendor/points", "v1"), compute) for _ in range(CALLERS)))
+
+    assert asyncio.run(dashboards()) == [120] * CALLERS
+    assert len(runs) == 1
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_a_cancelled_leader_hands_the_computation_to_a_follower():
+    flight = SingleFlight()
+    runs = []
+
+    async def compute():
+        runs.append(1)
+        if len(runs) == 1:
+            # The first leader's client goes away while the followers wait.
+            while flight.stats()["coalesced"] < 2:
+                await asyncio.sleep(0.005)
+            await asyncio.sleep(10)
+        await asyncio.sleep(0.05)
+        return 120
+
+    async def dashboards():
+        leader = asyncio.create_task(flight.do_async(("vendor/points", "v1"), compute))
+        followers = [asyncio.create_task(flight.do_async(("vendor/points", "v1"), compute)) for _ in range(2)]
+        while flight.stats()["coalesced"] < 2:
+            await asyncio.sleep(0.005)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await asyncio.gather(*followers)
+
+    assert asyncio.run(dashboards()) == [120, 120]
+    assert len(runs) == 2
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_followers_stop_waiting_after_the_timeout():
+    flight = SingleFlight(wait_seconds=0.05)
+    release = threading.Event()
+
+    def slow():
+        release.wait(5)
+        return "leader"
+
+    with ThreadPoolExecutor(1) as pool:
+        leader = pool.submit(flight.do, ("overallpoints",), slow)
+        while flight.stats()["in_flight"] == 0:
+            time.sleep(0.005)
+        assert flight.do(("overallpoints",), lambda: "follower") == "follower"
+        release.set()
+        assert leader.result() == "leader"
+
+
+def test_concurrent_overallpoints_requests_run_one_query(monkeypatch):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+    summaries = []
+    summarize_points = transaction_router_module.summarize_points
+
+    def slow_summary(*args):
+        summaries.append(args)
+        wait_for_followers(single_flight, CALLERS - 1)
+        return summarize_points(*args)
+
+    monkeypatch.setattr(transaction_router_module, "summarize_points", slow_summary)
+    app = FastAPI()
+    app.include_router(transaction_router, prefix="/api/v1/transaction")
+    app.include_router(metrics_router, prefix="/api/v1/metrics")
+
+    def override_session():
+        with Session(engine) as session:
+            yield session
+
+    app.dependency_overrides[get_session] = override_session
+    app.dependency_overrides[validate_token] = lambda: {"user_id": "admin", "is_admin": True}
+    client = TestClient(app)
+
+    params = {"start_date": "2024-01-01", "end_date": str(date.today() + timedelta(days=1))}
+    with ThreadPoolExecutor(CALLERS) as pool:
+        responses = list(pool.map(lambda _: client.get("/api/v1/transaction/overallpoints", params=params),
+                                  range(CALLERS)))
+    assert [response.status_code for response in responses] == [200] * CALLERS
+    assert len({str(response.json()["data"]) for response in responses}) == 1
+    assert len(summaries) == 1
+
+    stats = client.get("/api/v1/metrics/reports").json()["data"]["single_flight"]
+    assert (stats["executions"], stats["coalesced"]) == (1, CALLERS - 1)
+    engine.dispose()
@@ -0,0 +1,132 @@
+import json
+import pytest
+from datetime import date, timedelta
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel, Session, create_engine
+
+from src.database import get_session
+from src.auth.dependencies import validate_token
+from src.user.models import User
+from src.vendor.models import Vendor, DailyReports
+from src.vendor.service import create_claim, resolve_claim
+from src.pagination import MAX_PAGE_SIZE
+from src.user.router import router as user_router
+from src.vendor.router import router as vendor_router
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def admin(engine):
+    with Session(engine) as session:
+        admin = User(name="Admin User", username="admin", password="Password123",
+                     email="admin@example.com", mobile_number="9876543210", is_admin=True)
+        employees = [User(name=f"Employee {i:02}", username=f"employee{i:02}", password="Password123",
+                          email=f"employee{i:02}@example.com", mobile_number="9876543210",
+                          emp_id=f"AJA{i:03}", is_user=True) for i in range(60)]
+        owner = User(name="Canteen Owner", username="canteen", password="Password123",
+                     email="canteen@example.com", mobile_number="9876543210", is_vendor=True)
+        vendor = Vendor(vendor_name="Canteen", qr_code="qr-code", user_id=owner.id, bank_name="Bank",
+                        account_holder_name="Owner", account_number="12345678", ifsc_code="ABCD0123456",
+                        branch_name="Main", aadhar_card="123456789012", pan_card="ABCDE1234F")
+        session.add_all([admin, *employees, owner, vendor])
+        session.commit()
+
+        claims = [create_claim(session, vendor.id, points) for points in range(1, 11)]
+        for claim in claims[:4]:
+            resolve_claim(session, claim, "REJECTED")
+        for day in range(12):
+            session.add(DailyReports(report_date=date(2024, 1, 1) + timedelta(days=day),
+                                     points_redeemed_by_employees=day))
+        session.commit()
+        return admin.id
+
+
+def make_client(engine, auth_user):
+    app = FastAPI()
+    app.include_router(user_router, prefix="/api/v1/user")
+    app.include_router(vendor_router, prefix="/api/v1/vendor")
+
+    def override_session():
+        with Session(engine) as session:
+            yield session
+            session.commit()
+
+    app.dependency_overrides[get_session] = override_session
+    app.dependency_overrides[validate_token] = lambda: auth_user
+    return TestClient(app)
+
+
+def ndjson(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_user_listing_is_bounded_and_filterable(engine, admin):
+    client = make_client(engine, {"user_id": admin, "is_admin": True})
+
+    first = client.get("/api/v1/user/get_all/users").json()
+    assert len(first["data"]) == 50
+    assert first["metadata"]["next_cursor"]
+    rest = client.get("/api/v1/user/get_all/users", params={"cursor": first["metadata"]["next_cursor"]}).json()
+    assert len(rest["data"]) == 10 and rest["metadata"]["next_cursor"] is None
+
+    matches = client.get("/api/v1/user/get_all/users", params={"search": "employee0", "include_total": True}).json()
+    assert matches["metadata"]["total"] == 10
+    capped = client.get("/api/v1/user/get_all/users", params={"limit": 10000}).json()
+    assert capped["metadata"]["limit"] == MAX_PAGE_SIZE and len(capped["data"]) == 60
+
+
+
+def test_user_search_is_a_literal_case_insensitive_prefix(engine, admin):
+    client = make_client(engine, {"user_id": admin, "is_admin": True})
+
+    def search(text):
+        return len(client.get("/api/v1/user/get_all/users", params={"search": text, "limit": 100}).json()["data"])
+
+    assert search("EMPLOYEE0") == 10
+    assert search("aja05") == 10
+    # LIKE wildcards in the search text match only themselves.
+    assert search("employee_0") == 0
+    assert search("%") == 0
+
+def test_streams_return_every_row_in_batches(engine, admin, monkeypatch):
+    monkeypatch.setattr("src.pagination.STREAM_BATCH_SIZE", 7)
+    client = make_client(engine, {"user_id": admin, "is_admin": True})
+
+    response = client.get("/api/v1/user/get_all/users/stream")
+    assert response.headers["content-type"] == "application/x-ndjson"
+    users = ndjson(response)
+    assert len(users) == len({user["id"] for user in users}) == 60
+
+    assert [vendor["username"] for vendor in ndjson(client.get("/api/v1/vendor/get_all/vendors/stream"))] == ["canteen"]
+
+    claims = ndjson(client.get("/api/v1/vendor/claims/by/admin/stream", params={"status": "PENDING"}))
+    assert sorted(claim["points"] for claim in claims) == [5, 6, 7, 8, 9, 10]
+
+    reports = ndjson(client.get("/api/v1/vendor/reports/stream", params={"start_date": "2024-01-03"}))
+    assert len(reports) == 10
+
+
+def test_report_and_claim_listings_filter_by_date(engine, admin):
+    client = make_client(engine, {"user_id": admin, "is_admin": True})
+
+    reports = client.get("/api/v1/vendor/reports", params={"start_date": "2024-01-05", "end_date": "2024-01-06"}).json()
+    assert sorted(report["date"] for report in reports["data"]) == ["2024-01-05", "2024-01-06"]
+
+    tomorrow = str(date.today() + timedelta(days=1))
+    assert client.get("/api/v1/vendor/claims/by/admin", params={"start_date": tomorrow}).json()["data"] == []
+    assert len(client.get("/api/v1/vendor/claims/by/admin", params={"limit": 4}).json()["data"]) == 4
+
+
+def test_streams_are_admin_only(engine, admin):
+    client = make_client(engine, {"user_id": admin, "is_user": True})
+    assert client.get("/api/v1/user/get_all/users/stream").status_code == 401
+    assert client.get("/api/v1/vendor/claims/by/admin/stream").status_code == 403
@@ -2,26 +2,51 @@ import pytest
 from fastapi.testclient import TestClient
 from fastapi import UploadFile
 from unittest.mock import Mock, patch
+from sqlmodel import SQLModel, Session, create_engine, select
 import io
 from main import app  
-from database import get_session
+from src.database import get_session
+from src.user.models import User
+from src.user import utils as password_utils
+from src.jobs.models import Job
+from src.jobs import service as jobs_service
+import src.utils as upload_utils
+import json
 import os
 
 client = TestClient(app)
 
 @pytest.fixture
-def mock_session():
-    session = Mock()
-    session.add = Mock()
-    session.commit = Mock()
-    return session
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'redeemx.db'}", connect_args={"check_same_thread": False})
+    SQLModel.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
 
 @pytest.fixture(autouse=True)
-def override_dependency(mock_session):
-    app.dependency_overrides[get_session] = lambda: mock_session
+def override_dependency(engine, monkeypatch):
+    def override_session():
+        with Session(engine) as session:
+            yield session
+    app.dependency_overrides[get_session] = override_session
+    # Hash in the request thread; the process pool is covered by the login benchmark.
+    monkeypatch.setattr(password_utils, "PASSWORD_HASH_WORKERS", 0)
+    # Run the import job inside the upload request.
+    monkeypatch.setattr(jobs_service, "JOB_WORKERS", 0)
     yield
     app.dependency_overrides.clear()
 
+def upload(content):
+    return client.post(
+        "/api/v1/user-upload/user/data/upload-excel/",
+        files={"file": ("test.csv", io.BytesIO(content.encode("utf-8")), "text/csv")},
+    )
+
+def finished_job(engine, response):
+    assert response.status_code == 202
+    with Session(engine) as session:
+        return session.get(Job, response.json()["job_id"])
+
 @pytest.fixture
 def valid_csv_file():
     csv_content = (
@@ -53,14 +78,121 @@ def empty_csv_file():
     file = UploadFile(filename="test.csv", file=io.BytesIO(b""))
     return file
 
-def test_upload_valid_csv(valid_csv_file, mock_session):
+def test_upload_valid_csv(valid_csv_file, engine):
     with patch("src.utils.generate_password", return_value="Password123"):
         response = client.post(
             "/api/v1/user-upload/user/data/upload-excel/",
             files={"file": ("test.csv", valid_csv_file.file, "text/csv")},
         ) 
-    assert response.status_code == 200
-    assert response.json() == {"message": "Excel data successfully loaded into the database."}
+    job = finished_job(engine, response)
+    assert response.json()["status_url"] == f"/api/v1/jobs/{job.id}"
+    assert (job.kind, job.status, job.processed, job.total) == ("user.import", "succeeded", 2, 2)
+    assert json.loads(job.summary) == {"total_rows": 2, "inserted": 2, "failed": 0}
+    assert json.loads(job.result) == []
+    assert job.payload_path is None
+
+def test_upload_reports_bad_rows_and_keeps_the_rest(engine):
+    with Session(engine) as session:
+        session.add(User(emp_id="789", username="789", name="Existing One", mobile_number="9876543210",
+                         email="existing@example.com", password="Password123", is_user=True))
+        session.commit()
+
+    with patch("src.utils.generate_password", side_effect=lambda name, emp_id: f"hash-{name}-{emp_id}"):
+        response = upload(
+            "Emp ID,Name,Official Mobile Number,Email\n"
+            "123,John Doeaa ,9876543210.0, John@Example.com\n"
+            "456,Jo,12345,not-an-email\n"
+            "123,John Again,9876543210,again@example.com\n"
+            "789,Existing Again,9876543210,other@example.com\n"
+            "321,Mail Taken,9876543210,Existing@Example.com\n"
+            ",No Id,9876543210,noid@example.com\n"
+            "654,Mail Repeated,9876543210,JOHN@example.com\n"
+        )
+
+    job = finished_job(engine, response)
+    assert json.loads(job.summary) == {"total_rows": 7, "inserted": 1, "failed": 6}
+    errors = {error["row"]: error["errors"] for error in json.loads(job.result)}
+    assert sorted(errors) == [3, 4, 5, 6, 7, 8]
+    assert errors[3] == ["Name must be between 3 and 50 characters long",
+                         "Mobile number must be exactly 10 digits long",
+                         "Email is not a valid email address"]
+    assert errors[4] == ["Emp ID appears earlier in the file"]
+    assert errors[5] == ["Emp ID is already registered"]
+    assert errors[6] == ["Email is already registered"]
+    assert errors[7] == ["Emp ID must be 3-30 letters, numbers, underscores, dots or hyphens"]
+    assert errors[8] == ["Email appears earlier in the file"]
+
+    with Session(engine) as session:
+        user = session.exec(select(User).where(User.emp_id == "123")).one()
+    # Login matches the email exactly and derives the default password from the name as given.
+    assert (user.username, user.mobile_number, user.email) == ("123", "9876543210", "John@Example.com")
+    assert user.name == "John Doeaa " and user.password == "hash-John Doeaa -123" and user.is_user
+
+def test_upload_inserts_in_batches(engine, monkeypatch):
+    monkeypatch.setattr(upload_utils, "USER_UPLOAD_BATCH_SIZE", 2)
+    rows = "".join(f"E{i:03},Employee {i},98765432{i:02},e{i}@example.com\n" for i in range(5))
+    with patch("src.utils.generate_password", return_value="Password123"):
+        response = upload("Emp ID,Name,Official Mobile Number,Email\n" + rows)
+
+    assert json.loads(finished_job(engine, response).summary)["inserted"] == 5
+    with Session(engine) as session:
+        assert len(session.exec(select(User)).all()) == 5
+
+def test_import_report_does_not_depend_on_which_attempt_inserted_a_row(engine, monkeypatch):
+    monkeypatch.setattr(upload_utils, "USER_UPLOAD_BATCH_SIZE", 2)
+    commit_checkpoint = upload_utils.commit_checkpoint
+    batches = []
+
+    def commit_then_lose_the_job(session, job, state):
+        commit_checkpoint(session, job, state)
+        batches.append(state["next_row"])
+        if len(batches) == 1:
+            # The first attempt looks dead after its first batch: the job is requeued and claimed again.
+            with Session(engine) as other:
+                other.get(Job, job.id).attempts += 1
+                other.commit()
+
+    monkeypatch.setattr(upload_utils, "commit_checkpoint", commit_then_lose_the_job)
+    rows = "".join(f"E{i:03},Employee {i},98765432{i:02},e{i}@example.com\n" for i in range(5))
+    with patch("src.utils.generate_password", return_value="Password123"):
+        response = upload("Emp ID,Name,Official Mobile Number,Email\n" + rows + "E000,Employee Again,9876543210,x@example.com\n")
+        assert response.status_code == 202
+        job_id = response.json()["job_id"]
+
+        def report():
+            with Session(engine) as session:
+                job = session.get(Job, job_id)
+                return job.status, json.loads(job.summary), json.loads(job.result)
+
+        with Session(engine) as session:
+            job = session.get(Job, job_id)
+            # The superseded attempt kept its first batch and rolled back the second.
+            assert (job.status, json.loads(job.checkpoint)["next_row"]) == ("running", 2)
+            job.status = "queued"
+            session.commit()
+        assert jobs_service.run_job(engine, job_id)
+
+    # The same report a single attempt makes: the first batch counts as inserted, not as already registered.
+    assert report() == ("succeeded", {"total_rows": 6, "inserted": 5, "failed": 1},
+                        [{"row": 7, "emp_id": "E000", "errors": ["Emp ID appears earlier in the file"]}])
+    with Session(engine) as session:
+        assert len(session.exec(select(User)).all()) == 5
+
+
+def test_upload_with_missing_columns_fails_the_job(engine):
+    job = finished_job(engine, upload("Emp ID,Name\n123,John Doeaa\n"))
+    assert job.status == "failed"
+    assert "Official Mobile Number" in job.error
+
+def test_hash_passwords_uses_the_password_pool(monkeypatch):
+    pool = Mock()
+    pool.map.return_value = iter(["h1", "h2"])
+    monkeypatch.setattr(password_utils, "PASSWORD_HASH_WORKERS", 2)
+    monkeypatch.setattr(password_utils, "password_pool", lambda: pool)
+
+    rows = [{"name": "John Doeaa", "emp_id": "123"}, {"name": "Jane Doeaa", "emp_id": "456"}]
+    assert upload_utils.hash_passwords(rows) == ["h1", "h2"]
+    assert pool.map.call_args.args[1:] == (["John Doeaa", "Jane Doeaa"], ["123", "456"])
 
 def test_upload_invalid_file(invalid_csv_file):
     response = client.post(
@@ -79,3 +211,20 @@ def test_logger():
         log_content = log_file.read()
     
     assert "Test log entry" in log_content
+
+def test_insert_users_falls_back_to_single_rows_on_conflict(engine):
+    def row(index, email):
+        return {"index": index, "values": {"id": f"id-{index}", "emp_id": f"E{index}", "username": f"E{index}",
+                                           "name": "Employee", "email": email, "mobile_number": "9876543210",
+                                           "password": "Password123", "is_user": True}}
+    errors = {}
+    with Session(engine) as session:
+        assert upload_utils.insert_users(session, [row(0, "taken@example.com")], errors) == 1
+        # Registered by another request between the lookup and the insert.
+        inserted = upload_utils.insert_users(session, [row(1, "free@example.com"), row(2, "taken@example.com")], errors)
+        session.commit()
+
+    assert inserted == 1
+    assert list(errors) == [2] and errors[2][0].startswith("Could not be saved")
+    with Session(engine) as session:
+        assert sorted(session.exec(select(User.email)).all()) == ["free@example.com", "taken@example.com"]
@@ -0,0 +1,4 @@
+class InsufficientPointsError(Exception):
+    def __init__(self, available_points:int):
+        super().__init__(f"Insufficient points: {available_points} available")
+        self.available_points = available_points
@@ -1,12 +1,23 @@
-from sqlmodel import Field, Relationship
+from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Index
 import uuid
 from typing import Optional
+from datetime import datetime, date
 
 from src.models import BaseModel
 
 
 
 class Transaction(BaseModel, table=True):
+    __table_args__ = (
+        # Per-user history (keyset pages on created_at, id) and credit/debit sums by date range.
+        Index("ix_transaction_user_id_created_at", "user_id", "created_at", "id", "points"),
+        # Per-vendor history (keyset pages on created_at, id), counts and sums by date range.
+        Index("ix_transaction_vendor_id_created_at", "vendor_id", "created_at", "id", "user_id", "points"),
+        # Admin-wide reports over a date range and MIN(created_at).
+        Index("ix_transaction_created_at", "created_at", "user_id", "vendor_id", "points"),
+    )
+
     points:int = Field(...)
     user_id:Optional[str] = Field(None, foreign_key="user.id")
     vendor_id:Optional[str] = Field(None, foreign_key="vendor.id")
@@ -15,10 +26,51 @@ class Transaction(BaseModel, table=True):
     user_transaction:Optional["User"] = Relationship(back_populates="user_transaction_details")
     vendor_transaction:Optional["Vendor"] = Relationship(back_populates="vendor_transaction_details")
 
+
+class UserBalance(SQLModel, table=True):
+    """Running SUM(transaction.points) per user, kept in step with every ledger insert."""
+    user_id:str = Field(primary_key=True, foreign_key="user.id")
+    points:int = Field(default=0)
+    updated_at:Optional[datetime] = Field(default=None)
+
+
+class DailyRollup(SQLModel, table=True):
+    """SUM(transaction.points) per day, vendor and whether a user is involved, kept in step with every ledger insert."""
+    day:date = Field(primary_key=True)
+    # "" for ledger rows without a vendor (admin credits to employees).
+    vendor_id:str = Field(default="", primary_key=True, max_length=255)
+    # False for ledger rows without a user (claim payouts to vendors).
+    has_user:bool = Field(primary_key=True)
+    points:int = Field(default=0)
+    transaction_count:int = Field(default=0)
+
+
+
+class PendingTotal(SQLModel, table=True):
+    """A committed redemption not yet applied to its vendor's VendorBalance and DailyRollup rows.
+
+    Redemptions append one of these instead of updating the payee's rows in the
+    payer's transaction, so payments to the same vendor never queue on each
+    other's locks. apply_pending_totals moves it into the totals and deletes it;
+    until then the rebuild and verify commands leave its ledger row out.
+    """
+    transaction_id:str = Field(primary_key=True, foreign_key="transaction.id")
+    vendor_id:str = Field(foreign_key="vendor.id", index=True)
+    created_at:datetime = Field(...)
+    points:int = Field(...)
+
+class RosterGrant(SQLModel, table=True):
+    """One row per day the roster grant has run; the primary key stops a second grant for the same day."""
+    day:date = Field(primary_key=True)
+    roster_size:int = Field(default=0)
+    transaction_count:int = Field(default=0)
+    created_at:Optional[datetime] = Field(default=None)
+
+
 # class reports(BaseModel, table=True):
 #     Points_redeemed_by_employees=Field(...)
 #     Vendor_balance_points=int=Field(...)
 #     Points_redeemed_by_vendor=Field(...)
 #     claim_id:Optional[str] = Field(None, foreign_key="claim_id")
 
-#     vendor_claim:Optional["Claim"] =Relationship(back_populates="vendor_claims")
\ No newline at end of file
+#     vendor_claim:Optional["Claim"] =Relationship(back_populates="vendor_claims")
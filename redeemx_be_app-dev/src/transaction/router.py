@@ -1,18 +1,27 @@
-from fastapi import APIRouter, Response, Query, UploadFile, File, Request
-from sqlmodel import select, or_, func,case
-from datetime import datetime
+from fastapi import APIRouter, Response, Query, UploadFile, File, Request, Header
+from sqlmodel import select, or_, func
+from datetime import datetime, date
+from typing import Optional
 
-import pandas as pd
 import calendar
 
 
 from src.response import RestResponse
-from src.database import session
+from src.database import session, read_session, async_session, async_read_session, read_source, reads_your_writes
 from src.user.models import User
 from src.vendor.models import Vendor
 from src.transaction.models import Transaction
 from src.auth.dependencies import auth_user
 from src.transaction.schemas import TransactionUserInputSchema
+from src.transaction.service import (record_transaction, get_user_balance, redeem_points, settle_pending_totals, summarize_points,
+                                     points_time_series, series_periods, series_start, ROSTER_SYNC_JOB,
+                                     TIME_SERIES_MAX_PERIODS)
+from src.transaction.exceptions import InsufficientPointsError
+from src.vendor.service import get_vendor_balance
+from src.idempotency import run_idempotent
+from src.report_cache import report_cache
+from src.single_flight import single_flight
+from src.jobs.service import submit_job
 from src.logging_config import logger
 
 router = APIRouter()
@@ -30,7 +39,7 @@ def admin_user_transaction(request:Request, transaction:Transaction, response:Re
         logger.info(f"Processing transaction - User ID: {transaction.user_id}, Points: {transaction.points}, Vendor: {transaction.vendor_id}")
         
         logger.debug(f"Adding transaction for user {transaction.user_id} to database session")
-        session.add(transaction)
+        record_transaction(session, transaction)
         session.commit()
         session.refresh(transaction)
         response.status_code = 201
@@ -41,7 +50,20 @@ def admin_user_transaction(request:Request, transaction:Transaction, response:Re
 
 
 @router.post("/user/vendor/transaction")
-def user_vendor_transaction(request:Request, transaction:TransactionUserInputSchema, response:Response, session=session, auth_user=auth_user):
+async def user_vendor_transaction(request:Request, transaction:TransactionUserInputSchema, response:Response, session=async_session, auth_user=auth_user,
+                                  idempotency_key:Optional[str] = Header(None, alias="Idempotency-Key")):
+    # The ledger services are synchronous; run_sync drives them over the async connection without a worker thread.
+    def redeem(sync_session):
+        result = run_idempotent(sync_session, response, idempotency_key, auth_user.get("user_id"), "transaction.user_vendor", transaction,
+                                lambda: _user_vendor_transaction(request, transaction, response, sync_session, auth_user))
+        # The payer's debit is committed; the vendor's totals follow in their own short transaction.
+        settle_pending_totals(sync_session)
+        return result
+
+    return await session.run_sync(redeem)
+
+
+def _user_vendor_transaction(request:Request, transaction:TransactionUserInputSchema, response:Response, session, auth_user):
     user_id = auth_user.get("user_id", "Unknown")
     if auth_user.get("is_user"):
         #check for the vendor
@@ -55,7 +77,7 @@ def user_vendor_transaction(request:Request, transaction:TransactionUserInputSch
             logger.error(f"Vendor not found for transaction request: {request_info}")
             return RestResponse(error="No vendor details found")
         
-        user_points = session.exec(select(func.sum(Transaction.points)).where(Transaction.user_id == auth_user.get("user_id"))).first()
+        user_points = get_user_balance(session, auth_user.get("user_id"))
         if not user_points:
             response.status_code = 400
             logger.error(f"User ID {user_id} has no points available.")
@@ -70,14 +92,12 @@ def user_vendor_transaction(request:Request, transaction:TransactionUserInputSch
             response.status_code = 400
             return RestResponse(error="Points should be greater than zero")
         
-        transaction_db = Transaction(
-            user_id=auth_user.get("user_id"),
-            vendor_id=get_vendor.id,
-            points=-1*(transaction.points)
-        )
-        session.add(transaction_db)
-        session.commit()
-        session.refresh(transaction_db)
+        try:
+            redeem_points(session, auth_user.get("user_id"), get_vendor.id, transaction.points)
+        except InsufficientPointsError as e:
+            response.status_code = 400
+            logger.error(f"User ID {user_id} tried to transfer {transaction.points} points but only has {e.available_points} points.")
+            return RestResponse(error="You don't have a enough points")
         response.status_code = 201
         logger.info(f"User ID {user_id} transferred {transaction.points} points to Vendor ID {get_vendor.id}.")
         return RestResponse(data=transaction, message="Points transfered successfully")
@@ -86,19 +106,28 @@ def user_vendor_transaction(request:Request, transaction:TransactionUserInputSch
 
 
 @router.get("/user/points")
-def user_get_points(response:Response, session=session, auth_user=auth_user):
-    user_points = session.exec(select(func.sum(Transaction.points)).where(Transaction.user_id == auth_user.get("user_id"))).first()
-    points = user_points if user_points else 0
+async def user_get_points(response:Response, session=async_read_session, auth_user=auth_user):
+    points = await session.run_sync(get_user_balance, auth_user.get("user_id"))
     return RestResponse(data={"points":points})
 
 
 #Vendor Transactions
 @router.get("/vendor/points")
-def vender_get_points(response:Response, session=session, auth_user=auth_user):
-    vendor_id = session.exec(select(Vendor.id).where(Vendor.user_id == auth_user.get("user_id"))).first()
-    user_points = session.exec(select(func.sum(Transaction.points)).where(Transaction.vendor_id == vendor_id)).first()
-    points = user_points if user_points else 0
-    return RestResponse(data={"points":-1*points})
+async def vender_get_points(response:Response, session=async_read_session, auth_user=auth_user):
+    vendor_id = (await session.exec(select(Vendor.id).where(Vendor.user_id == auth_user.get("user_id")))).first()
+    if not vendor_id:
+        return RestResponse(data={"points":0})
+
+    async def balance_points():
+        return (await session.run_sync(get_vendor_balance, vendor_id)).balance_points
+
+    # Dashboards opening together ask for the same balance; one read answers them all.
+    if reads_your_writes(session.sync_session):
+        points = await balance_points()
+    else:
+        key = report_cache.key("vendor/points", source=read_source(session.sync_session), vendor_id=vendor_id)
+        points = await single_flight.do_async(key, balance_points)
+    return RestResponse(data={"points":points})
 
 
 
@@ -108,7 +137,7 @@ def vendor_transaction_admin(transaction:Transaction, response:Response, session
         get_vendor = session.exec(select(Vendor).where(or_(Vendor.id == transaction.vendor_id, 
                                                            Vendor.user_id == transaction.vendor_id))).first()
     
-        session.add(transaction)
+        record_transaction(session, transaction)
         session.commit()
         session.refresh(transaction)
         response.status_code = 201
@@ -119,7 +148,7 @@ def vendor_transaction_admin(transaction:Transaction, response:Response, session
 
 
 @router.post("/user-data/upload/transaction")
-async def upload_file(
+def upload_file(
     request: Request, response: Response, file: UploadFile = File(...), session=session, auth_user=auth_user
 ):
     user_id = auth_user.get("user_id", "Unknown")
@@ -133,38 +162,12 @@ async def upload_file(
             logger.error(f"Invalid file format attempted: {file.filename}")
             return RestResponse(error="Invalid file format. Please upload a CSV or Excel file.")
 
-        if file.filename.endswith(".csv"):
-            df = pd.read_csv(file.file)
-        else:
-            df = pd.read_excel(file.file)
-
-        user_list = session.exec(select(User).filter(User.is_user == True)).all()
-        excel_emp_ids = df["E. Code"].unique().tolist()
-
-        unassigned_data = []
-        transactions_added = 0
-        transaction_user_id = None
-
-        for user in user_list:
-            if user.emp_id in excel_emp_ids:
-                transaction = Transaction(user_id=user.id, points=20)
-                session.add(transaction)
-                transactions_added += 1
-                transaction_user_id = user.id
-            else:
-                unassigned_data.append({"emp_id": user.emp_id, "details": "User not registered"})
-
-        session.commit()
-        
-        logger.info(f"File '{file.filename}' processed successfully. Transactions added: {transactions_added}")
-        
-        if transaction_user_id:
-            logger.info(f"File processed successfully for user ID {transaction_user_id}")
-
-        if unassigned_data:
-            logger.warning(f"Unassigned users from file '{file.filename}': {unassigned_data}")
-
-        return RestResponse(data=unassigned_data, message="File processed successfully.")
+        job = submit_job(session, "transaction.attendance", payload=file.file, filename=file.filename,
+                         created_by=user_id)
+        logger.info(f"File '{file.filename}' queued as job {job.id}")
+        response.status_code = 202
+        return RestResponse(data={"job_id": job.id, "status_url": f"/api/v1/jobs/{job.id}"},
+                            message="File accepted for processing.")
 
     
     user_id = auth_user.get("user_id", "Unknown")
@@ -174,12 +177,28 @@ async def upload_file(
 
 
 
+@router.post("/roster/sync")
+def sync_employee_roster(request: Request, response: Response, session=session, auth_user=auth_user):
+    user_id = auth_user.get("user_id", "Unknown")
+    if not auth_user.get("is_admin"):
+        response.status_code = 400
+        logger.error(f"Unauthorized access attempt by user: {auth_user}, User ID: {user_id}")
+        return RestResponse(error="You are not authorized")
+
+    job = submit_job(session, ROSTER_SYNC_JOB, created_by=user_id)
+    logger.info(f"Roster sync requested by {user_id}, queued as job {job.id}")
+    response.status_code = 202
+    return RestResponse(data={"job_id": job.id, "status_url": f"/api/v1/jobs/{job.id}"},
+                        message="Roster sync started.")
+
+
+
 #admin weekly points
 @router.get("/overallpoints")
 def get_overall_points(response:Response,request:Request,
     start_date: datetime = Query(None, description="Start date in YYYY-MM-DD format"),
     end_date: datetime = Query(None, description="End date in YYYY-MM-DD format"),
-    session = session, auth_user=auth_user):
+    session=read_session, auth_user=auth_user):
 
     user_id = auth_user.get("user_id", "Unknown")
     if auth_user.get("is_admin"):
@@ -187,48 +206,30 @@ def get_overall_points(response:Response,request:Request,
         request_info = f"{request.method}:{request.url.path},User ID: {user_id} "
         logger.info(f"Incoming request for overall points: {request_info}")
 
-        first_transaction_date = session.exec(select(func.min(Transaction.created_at))).first()
         today=datetime.today()
-        
-        if start_date is None:
-            start_date = first_transaction_date
-        if end_date is None:
-            end_date=today
-            
-        if start_date > end_date:
+        # An omitted start means the first transaction, which is never after today.
+        if start_date is not None and start_date > (end_date or today):
             response.status_code = 400
-            logger.error(f"Invalid date range: Start date {start_date} is after End date {end_date}")
+            logger.error(f"Invalid date range: Start date {start_date} is after End date {end_date or today}")
             return RestResponse(error="Start date cannot be after end date.")
-    
-        logger.info(f"Fetching overall points from {start_date} to {end_date}")
-        stmt = select(
-                func.coalesce(
-                    func.sum(case((Transaction.vendor_id.is_(None), Transaction.points), else_=0)),0
-                                ).label("points_assigned_to_employee"),
-                func.coalesce(
-                    func.sum(case((Transaction.user_id.isnot(None), Transaction.points), else_=0)),0
-                                ).label("points_assigned_to_employee_balance"),
-                func.coalesce(func.abs(
-                func.sum(case(((Transaction.vendor_id.isnot(None)) & (Transaction.user_id.isnot(None)),
-                                Transaction.points), else_=0))), 0).label("total_points_user_sends_to_vendor"),
-
-                func.coalesce((func.sum(case((Transaction.user_id.is_(None),Transaction.points), else_=0))), 0
-                ).label("points_claimed_by_vendor"),)
-        
-        if start_date and end_date:
-            stmt = stmt.where(Transaction.created_at.between(start_date, end_date))
-         
 
-        result = session.exec(stmt).first()  
+        def overall_points():
+            first_transaction_date = session.exec(select(func.min(Transaction.created_at))).first()
+            return summarize_points(session, start_date or first_transaction_date, end_date or datetime.today())
+
+        logger.info(f"Fetching overall points from {start_date or 'the first transaction'} to {end_date or today}")
+        # Open-ended bounds stay None in the cache scope, so any new transaction drops the entry.
+        result = report_cache.cached("overallpoints", overall_points, ("transaction",), session=session,
+                                     start=start_date, end=end_date)
         
-        points_yet_to_approve_to_vendor=abs(result.total_points_user_sends_to_vendor-result.points_claimed_by_vendor)
+        points_yet_to_approve_to_vendor=abs(result["total_points_user_sends_to_vendor"]-result["points_claimed_by_vendor"])
         
         logger.info(f"Query executed successfully. Data retrieved: {result}")
         return RestResponse(data = {
-            "points_assigned_to_employee": result.points_assigned_to_employee,
-            "points_assigned_to_employee_balance": result.points_assigned_to_employee_balance,
-            "total_points_user_sends_to_vendor": result.total_points_user_sends_to_vendor,
-            "points_claimed_by_vendor": result.points_claimed_by_vendor,
+            "points_assigned_to_employee": result["points_assigned_to_employee"],
+            "points_assigned_to_employee_balance": result["points_assigned_to_employee_balance"],
+            "total_points_user_sends_to_vendor": result["total_points_user_sends_to_vendor"],
+            "points_claimed_by_vendor": result["points_claimed_by_vendor"],
             "points_yet_to_approve_to_vendor": points_yet_to_approve_to_vendor,
         })
     response.status_code =400
@@ -243,7 +244,7 @@ def get_monthly_points(response:Response,request:Request,
     end_date: datetime = Query(None, description="End date in YYYY-MM-DD format"),
     month: int = Query(None, description="Month number (1-12)"),
     year: int =Query(None, description="Year (e.g., 2024)"),
-    session = session, auth_user=auth_user):
+    session=read_session, auth_user=auth_user):
 
     user_id = auth_user.get("user_id", "Unknown")
     if auth_user.get("is_admin"):
@@ -287,38 +288,59 @@ def get_monthly_points(response:Response,request:Request,
         
         
         logger.info(f"Fetching monthly points from {start_date} to {end_date} for user: {auth_user},User ID: {user_id}")
-        stmt = select(
-                func.coalesce(
-                    func.sum(case((Transaction.vendor_id.is_(None), Transaction.points), else_=0)),0
-                                ).label("points_assigned_to_employee"),
-                func.coalesce(
-                    func.sum(case((Transaction.user_id.isnot(None), Transaction.points), else_=0)),0
-                                ).label("points_assigned_to_employee_balance"),
-                func.coalesce(func.abs(
-                func.sum(case(((Transaction.vendor_id.isnot(None)) & (Transaction.user_id.isnot(None)),
-                                Transaction.points), else_=0))), 0).label("total_points_user_sends_to_vendor"),
-
-                func.coalesce((func.sum(case((Transaction.user_id.is_(None),Transaction.points), else_=0))), 0
-                ).label("points_claimed_by_vendor"),)
-        
-        if start_date and end_date:
-            stmt = stmt.where(Transaction.created_at.between(start_date, end_date))
-         
-
-        result = session.exec(stmt).first()  
+        # summarize_points covers the whole ledger unless both bounds are set.
+        if start_date is None or end_date is None:
+            start_date = end_date = None
+        result = report_cache.cached("monthlypoints", lambda: summarize_points(session, start_date, end_date),
+                                     ("transaction",), session=session, start=start_date, end=end_date)
         
-        points_yet_to_approve_to_vendor=abs(result.total_points_user_sends_to_vendor-result.points_claimed_by_vendor)
+        points_yet_to_approve_to_vendor=abs(result["total_points_user_sends_to_vendor"]-result["points_claimed_by_vendor"])
         
         logger.info(f"Query executed successfully. Data retrieved: {result}")
         logger.info(f"Response generated successfully for user: {auth_user},User ID: {user_id}")
         return RestResponse(data = {
-            "points_assigned_to_employee": result.points_assigned_to_employee,
-            "points_assigned_to_employee_balance": result.points_assigned_to_employee_balance,
-            "total_points_user_sends_to_vendor": result.total_points_user_sends_to_vendor,
-            "points_claimed_by_vendor": result.points_claimed_by_vendor,
+            "points_assigned_to_employee": result["points_assigned_to_employee"],
+            "points_assigned_to_employee_balance": result["points_assigned_to_employee_balance"],
+            "total_points_user_sends_to_vendor": result["total_points_user_sends_to_vendor"],
+            "points_claimed_by_vendor": result["points_claimed_by_vendor"],
             "points_yet_to_approve_to_vendor": points_yet_to_approve_to_vendor,
         })
     
     response.status_code =400
     logger.error(f"Unauthorized access attempt by user: {auth_user}, User ID: {user_id}")
-    return RestResponse(error="You are not authorized")
\ No newline at end of file
+    return RestResponse(error="You are not authorized")
+
+
+#admin points chart: one query for every bucket
+@router.get("/points/series")
+def get_points_series(response:Response, request:Request,
+    start_date: date = Query(None, description="First day in YYYY-MM-DD format; defaults to 12 buckets before end_date"),
+    end_date: date = Query(None, description="Last day in YYYY-MM-DD format; defaults to today"),
+    interval: str = Query("month", pattern="^(day|week|month)$", description="Bucket size: day, week or month"),
+    by_vendor: bool = Query(False, description="Also break redeemed, claimed and pending points down per vendor"),
+    session=read_session, auth_user=auth_user):
+
+    user_id = auth_user.get("user_id", "Unknown")
+    if not auth_user.get("is_admin"):
+        response.status_code = 400
+        logger.error(f"Unauthorized access attempt by user: {auth_user},User ID: {user_id}")
+        return RestResponse(error="You are not authorized")
+
+    request_info = f"{request.method}:{request.url.path},User ID: {user_id} "
+    logger.info(f"Incoming request for points series: {request_info}")
+
+    if end_date is None:
+        end_date = date.today()
+    if start_date is None:
+        start_date = series_start(end_date, interval, 12)
+    if start_date > end_date:
+        response.status_code = 400
+        logger.error(f"Invalid date range: Start date {start_date} is after End date {end_date}")
+        return RestResponse(error="Start date cannot be after end date.")
+    if len(series_periods(start_date, end_date, interval)) > TIME_SERIES_MAX_PERIODS:
+        response.status_code = 400
+        logger.error(f"Points series too long: {start_date} to {end_date} by {interval}")
+        return RestResponse(error=f"At most {TIME_SERIES_MAX_PERIODS} {interval} buckets per request; use a larger interval.")
+
+    logger.info(f"Fetching points series from {start_date} to {end_date} by {interval}")
+    return RestResponse(data=points_time_series(session, start_date, end_date, interval, by_vendor))
@@ -1,37 +1,627 @@
-from fastapi import HTTPException,APIRouter
-from sqlmodel import select
+from sqlmodel import select, update, delete, func, literal
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from datetime import datetime, date, time, timedelta
+from zoneinfo import ZoneInfo
+from typing import Optional
+import asyncio
 import httpx
+import uuid
+import os
 
 from src.user.models import User
-from src.database import session
-from src.transaction.models import Transaction
-from src.response import RestResponse
+from src.models import new_id, period_start
+from src.vendor.models import Vendor
+from src.transaction.models import Transaction, UserBalance, DailyRollup, RosterGrant, PendingTotal
+from src.transaction.exceptions import InsufficientPointsError
+from src.vendor.service import apply_vendor_transaction, applied_ledger_rows
+from src.transaction.utils import read_emp_codes
+from src.pagination import iter_pages
+from src.jobs.service import job_handler, open_payload
+from src.database import commit_with_retry
+from src.report_cache import record_write
+from src.logging_config import logger
 
-router = APIRouter()
+ROSTER_API_URL = os.getenv("ROSTER_API_URL", "http://127.0.0.1:8000/employees")
+ROSTER_PAGE_SIZE = int(os.getenv("ROSTER_PAGE_SIZE", "1000"))
+ROSTER_TIMEOUT_SECONDS = float(os.getenv("ROSTER_TIMEOUT_SECONDS", "10"))
+ROSTER_MAX_CONNECTIONS = int(os.getenv("ROSTER_MAX_CONNECTIONS", "4"))
+ROSTER_SYNC_JOB = "transaction.roster_sync"
+# Stops a roster API that never returns a short page.
+ROSTER_MAX_PAGES = 1000
+# Employee codes per INSERT ... SELECT; keeps the IN list under SQLite's bound-parameter limit.
+ROSTER_MATCH_BATCH_SIZE = 5000
+# Points credited per employee present in an attendance upload or on the day's roster.
+ATTENDANCE_POINTS = 20
+# Longest points time series one request may ask for: a little over a year of days.
+TIME_SERIES_MAX_PERIODS = 400
+# Pending redemption totals applied per sweep.
+PENDING_TOTALS_BATCH_SIZE = 500
 
-THIRD_PARTY_API_URL = "http://127.0.0.1:8000/employees"  
 
-async def fetch_all_employees():
-    async with httpx.AsyncClient() as client:
-        response = await client.get(THIRD_PARTY_API_URL)
-        if response.status_code == 404:
-            return None
-        return response.json()
-
-@router.post("/process/all/transactions")
-async def process_transactions(session=session):
-    third_party_employees = await fetch_all_employees()
-    if not third_party_employees:
-        raise HTTPException(status_code=404, detail="No employees found in third-party API")
-    local_employees = session.exec(select(User)).all()
-    local_emp_ids = {emp["empid"] for emp in third_party_employees}
-    
-    unassigned_data = []
-    for emp in local_employees:
-        if emp.emp_id in local_emp_ids:  
-            transaction = Transaction(user_id=emp.id, points=20)
-            session.add(transaction)
+#Ledger writes
+def record_transaction(session, transaction:Transaction) -> Transaction:
+    """Add a ledger row and apply it to the materialized balances in the same DB transaction."""
+    session.add(transaction)
+    if transaction.user_id is not None:
+        apply_user_balance(session, transaction.user_id, transaction.points)
+    if transaction.vendor_id is not None:
+        apply_vendor_transaction(session, transaction.vendor_id, transaction.points)
+    apply_daily_rollup(session, transaction)
+    return transaction
+
+
+def apply_user_balance(session, user_id:str, delta:int):
+    result = session.exec(
+        update(UserBalance)
+        .where(UserBalance.user_id == user_id)
+        .values(points=UserBalance.points + delta, updated_at=datetime.now(ZoneInfo("Asia/Kolkata")))
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount:
+        return
+
+    # First ledger write for this user since the balance table was introduced:
+    # seed the row from the ledger, which already holds the pending transaction.
+    if not seed_user_balance(session, user_id):
+        # Another request seeded the row first; its snapshot cannot include our
+        # uncommitted insert, so apply the delta on top of it.
+        apply_user_balance(session, user_id, delta)
+
+
+def seed_user_balance(session, user_id:str) -> bool:
+    """Create the balance row from the ledger. Returns False if a concurrent request created it first."""
+    session.flush()
+    ledger_points = session.exec(
+        select(func.coalesce(func.sum(Transaction.points), 0)).where(Transaction.user_id == user_id)
+    ).one()
+    try:
+        with session.begin_nested():
+            session.add(UserBalance(user_id=user_id, points=ledger_points,
+                                    updated_at=datetime.now(ZoneInfo("Asia/Kolkata"))))
+    except IntegrityError:
+        return False
+    return True
+
+
+def redeem_points(session, user_id:str, vendor_id:str, points:int, description:str=None) -> Transaction:
+    """Debit a user and credit a vendor without a read-then-write race.
+
+    The balance check and the debit are one guarded UPDATE on the payer's
+    balance row, so the database serialises concurrent redemptions for the
+    same user on that row only; other users are never blocked. The payee's
+    VendorBalance and DailyRollup rows are not touched here: a PendingTotal
+    row is appended instead, and apply_pending_totals applies it after the
+    commit, so payments to the same vendor do not queue behind each other.
+    Raises InsufficientPointsError when the balance cannot cover the debit.
+    """
+    if session.exec(select(UserBalance.points).where(UserBalance.user_id == user_id)).first() is None:
+        seed_user_balance(session, user_id)
+
+    result = session.exec(
+        update(UserBalance)
+        .where(UserBalance.user_id == user_id, UserBalance.points >= points)
+        .values(points=UserBalance.points - points, updated_at=datetime.now(ZoneInfo("Asia/Kolkata")))
+        .execution_options(synchronize_session=False)
+    )
+    if not result.rowcount:
+        raise InsufficientPointsError(get_user_balance(session, user_id))
+
+    transaction = Transaction(user_id=user_id, vendor_id=vendor_id, points=-points, description=description)
+    session.add(transaction)
+    session.add(PendingTotal(transaction_id=transaction.id, vendor_id=vendor_id, created_at=transaction.created_at,
+                             points=transaction.points))
+    session.info.setdefault("pending_totals", []).append(transaction.id)
+    return transaction
+
+
+def apply_pending_totals(session, transaction_ids:list=None) -> int:
+    """Apply pending redemptions to VendorBalance and DailyRollup, each in its own short DB transaction.
+
+    transaction_ids limits it to those redemptions; by default the oldest
+    PENDING_TOTALS_BATCH_SIZE are applied. Each one is deleted in the
+    transaction that applies it, so concurrent callers apply it once.
+    Returns the number applied.
+    """
+    if transaction_ids is None:
+        transaction_ids = session.exec(
+            select(PendingTotal.transaction_id).order_by(PendingTotal.created_at).limit(PENDING_TOTALS_BATCH_SIZE)
+        ).all()
+        session.commit()
+    return sum(commit_with_retry(session, lambda: _apply_pending_total(session, transaction_id))
+               for transaction_id in transaction_ids)
+
+
+def _apply_pending_total(session, transaction_id:str) -> int:
+    pending = session.exec(
+        select(PendingTotal.vendor_id, PendingTotal.created_at, PendingTotal.points)
+        .where(PendingTotal.transaction_id == transaction_id)
+        .with_for_update()
+    ).first()
+    # Another caller applied it first (its delete committed before our locking read).
+    if pending is None or not session.exec(
+            delete(PendingTotal).where(PendingTotal.transaction_id == transaction_id)
+            .execution_options(synchronize_session=False)).rowcount:
+        return 0
+    vendor_id, created_at, points = pending
+    apply_vendor_transaction(session, vendor_id, points)
+    apply_rollup_delta(session, created_at.date(), vendor_id, True, points, 1)
+    # The totals behind cached reports move now, not when the redemption committed.
+    record_write(session, "transaction", vendor_id, created_at)
+    return 1
+
+
+def settle_pending_totals(session) -> int:
+    """Apply the pending totals of the redemptions this session has just committed.
+
+    The redemption is already committed, so a failure here is only logged;
+    the periodic apply_pending_totals sweep picks the rows up again.
+    """
+    transaction_ids = session.info.pop("pending_totals", [])
+    try:
+        return apply_pending_totals(session, transaction_ids)
+    except Exception as e:
+        session.rollback()
+        logger.error(f"Applying pending redemption totals failed, left for the sweep: {e}")
+        return 0
+
+
+def apply_daily_rollup(session, transaction:Transaction):
+    apply_rollup_delta(session, transaction.created_at.date(), transaction.vendor_id or "",
+                       transaction.user_id is not None, transaction.points, 1)
+
+
+def apply_rollup_delta(session, day, vendor_id:str, has_user:bool, points:int, transaction_count:int):
+    result = session.exec(
+        update(DailyRollup)
+        .where(DailyRollup.day == day, DailyRollup.vendor_id == vendor_id, DailyRollup.has_user == has_user)
+        .values(points=DailyRollup.points + points,
+                transaction_count=DailyRollup.transaction_count + transaction_count)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount:
+        return
+
+    # First ledger row in this bucket: seed it from the ledger, which already holds the pending rows.
+    session.flush()
+    ledger_points, ledger_count = session.exec(
+        select(func.coalesce(func.sum(Transaction.points), 0), func.count())
+        .where(Transaction.created_at >= datetime.combine(day, time.min),
+               Transaction.created_at < datetime.combine(day + timedelta(days=1), time.min),
+               _rollup_vendor_id() == vendor_id,
+               _rollup_has_user() == has_user,
+               applied_ledger_rows())
+    ).one()
+    try:
+        with session.begin_nested():
+            session.add(DailyRollup(day=day, vendor_id=vendor_id, has_user=has_user,
+                                    points=ledger_points, transaction_count=ledger_count))
+    except IntegrityError:
+        apply_rollup_delta(session, day, vendor_id, has_user, points, transaction_count)
+
+
+def grant_points(session, user_ids:list, points:int, batch_size:int=1000) -> int:
+    """Credit points to every user in user_ids with one bulk INSERT and set-based balance updates.
+
+    This is record_transaction for many admin credits at once: the ledger
+    rows go in as a single executemany, balances move with one UPDATE per
+    batch of users, and the day's rollup bucket is bumped once.
+    Returns the number of ledger rows written.
+    """
+    if not user_ids:
+        return 0
+    now = datetime.now(ZoneInfo("Asia/Kolkata"))
+    session.execute(insert(Transaction), [
+        {"id": str(uuid.uuid4()), "created_at": now, "user_id": user_id, "points": points}
+        for user_id in user_ids
+    ])
+
+    for start in range(0, len(user_ids), batch_size):
+        batch = user_ids[start:start + batch_size]
+        seeded = set(session.exec(select(UserBalance.user_id).where(UserBalance.user_id.in_(batch))).all())
+        if seeded:
+            session.exec(
+                update(UserBalance)
+                .where(UserBalance.user_id.in_(seeded))
+                .values(points=UserBalance.points + points, updated_at=now)
+                .execution_options(synchronize_session=False)
+            )
+        unseeded = [user_id for user_id in batch if user_id not in seeded]
+        if unseeded:
+            # First ledger write for these users: seed their balances from the ledger, which holds the new rows.
+            ledger = (
+                select(Transaction.user_id, func.sum(Transaction.points), literal(now))
+                .where(Transaction.user_id.in_(unseeded))
+                .group_by(Transaction.user_id)
+            )
+            try:
+                with session.begin_nested():
+                    session.exec(insert(UserBalance).from_select(["user_id", "points", "updated_at"], ledger))
+            except IntegrityError:
+                # A concurrent request seeded some of them; apply_user_balance handles that race per user.
+                for user_id in unseeded:
+                    apply_user_balance(session, user_id, points)
+
+    apply_rollup_delta(session, now.date(), "", True, points * len(user_ids), len(user_ids))
+    return len(user_ids)
+
+
+@job_handler("transaction.attendance")
+def assign_attendance_points(session, job, progress) -> tuple:
+    """Credit ATTENDANCE_POINTS to every registered employee listed in an attendance upload.
+
+    The file is streamed into a set of codes, and the employees are matched
+    against it in one keyset pass. Returns (summary, employees not credited).
+    """
+    with open_payload(job) as file:
+        present_emp_ids = set(read_emp_codes(file, job.filename))
+    progress(0, None, "Matching employees")
+
+    registered = select(User.id, User.emp_id, User.created_at).where(User.is_user == True)
+    assigned_user_ids, unassigned = [], []
+    for user in iter_pages(session, registered, User):
+        if user.emp_id in present_emp_ids:
+            assigned_user_ids.append(user.id)
         else:
-            unassigned_data.append({"emp_id": emp.emp_id, "details": "User not registered"})
-    session.commit()
-    return RestResponse(data=unassigned_data, message="File processed successfully.")
\ No newline at end of file
+            unassigned.append({"emp_id": user.emp_id, "details": "User not registered"})
+    progress(len(assigned_user_ids) + len(unassigned), len(assigned_user_ids) + len(unassigned), "Granting points")
+
+    transactions_added = grant_points(session, assigned_user_ids, ATTENDANCE_POINTS)
+    return {"codes_in_file": len(present_emp_ids), "transactions_added": transactions_added,
+            "unassigned": len(unassigned)}, unassigned
+
+
+#Ledger reads
+def get_user_balance(session, user_id:str) -> int:
+    points = session.exec(select(UserBalance.points).where(UserBalance.user_id == user_id)).first()
+    if points is None:
+        points = session.exec(select(func.sum(Transaction.points)).where(Transaction.user_id == user_id)).first()
+    return points or 0
+
+
+def _rollup_vendor_id():
+    return func.coalesce(Transaction.vendor_id, "")
+
+
+def _rollup_has_user():
+    return Transaction.user_id.isnot(None)
+
+
+def _ledger_point_buckets(session, *conditions) -> list:
+    # Like the rollup, leave out redemptions whose totals are still pending.
+    return session.exec(
+        select(_rollup_vendor_id(), _rollup_has_user(), func.sum(Transaction.points))
+        .where(applied_ledger_rows(), *conditions)
+        .group_by(_rollup_vendor_id(), _rollup_has_user())
+    ).all()
+
+
+def _rollup_point_buckets(session, *conditions) -> list:
+    return session.exec(
+        select(DailyRollup.vendor_id, DailyRollup.has_user, func.sum(DailyRollup.points))
+        .where(*conditions)
+        .group_by(DailyRollup.vendor_id, DailyRollup.has_user)
+    ).all()
+
+
+def point_buckets(session, start_date:datetime=None, end_date:datetime=None) -> list:
+    """(vendor_id, has_user, points) sums for the ledger rows created in [start_date, end_date].
+
+    Whole days are read from the daily rollup; a partial day at either end
+    of the range is summed from the ledger so the result is exactly what
+    summing the ledger over the same range would return. Both leave out
+    redemptions whose PendingTotal has not been applied yet, so a pending
+    redemption is missing from every bucket until it is, not only from whole days.
+    """
+    if start_date is None or end_date is None:
+        return _rollup_point_buckets(session)
+
+    first_day = start_date.date() if start_date.time() == time.min else start_date.date() + timedelta(days=1)
+    last_day = end_date.date() if end_date.time() == time.max else end_date.date() - timedelta(days=1)
+    if first_day > last_day:
+        return _ledger_point_buckets(session, Transaction.created_at >= start_date, Transaction.created_at <= end_date)
+
+    buckets = list(_rollup_point_buckets(session, DailyRollup.day >= first_day, DailyRollup.day <= last_day))
+    if start_date.time() != time.min:
+        buckets += _ledger_point_buckets(session, Transaction.created_at >= start_date,
+                                         Transaction.created_at < datetime.combine(first_day, time.min))
+    if end_date.time() != time.max:
+        buckets += _ledger_point_buckets(session, Transaction.created_at > datetime.combine(last_day, time.max),
+                                         Transaction.created_at <= end_date)
+    return buckets
+
+
+def summarize_points(session, start_date:datetime=None, end_date:datetime=None) -> dict:
+    """Admin totals for the ledger rows created in [start_date, end_date], or for the whole ledger."""
+    buckets = point_buckets(session, start_date, end_date)
+    return {
+        "points_assigned_to_employee": sum(points for vendor_id, has_user, points in buckets if not vendor_id),
+        "points_assigned_to_employee_balance": sum(points for vendor_id, has_user, points in buckets if has_user),
+        "total_points_user_sends_to_vendor": abs(sum(points for vendor_id, has_user, points in buckets
+                                                     if vendor_id and has_user)),
+        "points_claimed_by_vendor": sum(points for vendor_id, has_user, points in buckets if not has_user),
+    }
+
+
+def _bucket_start(day:date, interval:str) -> date:
+    if interval == "week":
+        return day - timedelta(days=day.weekday())
+    if interval == "month":
+        return day.replace(day=1)
+    return day
+
+
+def _next_bucket(start:date, interval:str) -> date:
+    if interval == "week":
+        return start + timedelta(days=7)
+    if interval == "month":
+        return (start + timedelta(days=32)).replace(day=1)
+    return start + timedelta(days=1)
+
+
+def series_periods(start_day:date, end_day:date, interval:str) -> list:
+    """The first day of each day, week (from Monday) or month bucket overlapping [start_day, end_day]."""
+    periods = []
+    period = _bucket_start(start_day, interval)
+    while period <= end_day:
+        periods.append(period)
+        period = _next_bucket(period, interval)
+    return periods
+
+
+def series_start(end_day:date, interval:str, periods:int) -> date:
+    """The first day of the bucket periods - 1 buckets before the one containing end_day."""
+    start = _bucket_start(end_day, interval)
+    for _ in range(periods - 1):
+        start = _bucket_start(start - timedelta(days=1), interval)
+    return start
+
+
+def points_time_series(session, start_day:date, end_day:date, interval:str = "month", by_vendor:bool = False) -> dict:
+    """Granted, redeemed, claimed and pending points per bucket over the whole days in [start_day, end_day].
+
+    One GROUP BY over the daily rollup returns every bucket; each value is what
+    summarize_points reports for the days of that bucket inside the range.
+    Buckets without ledger rows are zero. With by_vendor the same query also
+    carries the vendor name, for redeemed, claimed and pending per vendor.
+    """
+    period = period_start(DailyRollup.day, interval)
+    columns = [period, DailyRollup.vendor_id, DailyRollup.has_user, func.sum(DailyRollup.points)]
+    group_by = [period, DailyRollup.vendor_id, DailyRollup.has_user]
+    stmt = select(*columns)
+    if by_vendor:
+        stmt = stmt.add_columns(Vendor.vendor_name).outerjoin(Vendor, Vendor.id == DailyRollup.vendor_id)
+        group_by.append(Vendor.vendor_name)
+    rows = session.exec(
+        stmt.where(DailyRollup.day >= start_day, DailyRollup.day <= end_day).group_by(*group_by)
+    ).all()
+
+    periods = series_periods(start_day, end_day, interval)
+    index = {period: i for i, period in enumerate(periods)}
+    granted, redeemed, claimed = ([0] * len(periods) for _ in range(3))
+    vendors = {}
+    for row in rows:
+        bucket, vendor_id, has_user, points = index[row[0]], row[1], row[2], row[3]
+        if not vendor_id:
+            granted[bucket] += points
+            continue
+        # Redemptions are negative ledger rows; payouts for approved claims carry no user.
+        totals = redeemed if has_user else claimed
+        totals[bucket] += points
+        if by_vendor:
+            vendor = vendors.setdefault(vendor_id, {"vendor_id": vendor_id, "vendor_name": row[4],
+                                                    "redeemed": [0] * len(periods), "claimed": [0] * len(periods)})
+            vendor["redeemed" if has_user else "claimed"][bucket] += points
+
+    def finish(series):
+        series["redeemed"] = [abs(points) for points in series["redeemed"]]
+        series["pending"] = [abs(points - paid) for points, paid in zip(series["redeemed"], series["claimed"])]
+        return series
+
+    result = finish({
+        "interval": interval,
+        "start_date": start_day,
+        "end_date": end_day,
+        "periods": periods,
+        "granted": granted,
+        "redeemed": redeemed,
+        "claimed": claimed,
+    })
+    if by_vendor:
+        result["vendors"] = sorted((finish(vendor) for vendor in vendors.values()),
+                                   key=lambda vendor: vendor["vendor_name"] or "")
+    return result
+
+
+#Maintenance
+def rebuild_daily_rollups(session) -> int:
+    """Recompute the daily rollup from the ledger. Returns the number of rollup rows written."""
+    session.exec(delete(DailyRollup))
+    day = func.date(Transaction.created_at)
+    ledger = (
+        select(day, _rollup_vendor_id(), _rollup_has_user(), func.sum(Transaction.points), func.count())
+        .where(applied_ledger_rows())
+        .group_by(day, _rollup_vendor_id(), _rollup_has_user())
+    )
+    session.exec(insert(DailyRollup).from_select(["day", "vendor_id", "has_user", "points", "transaction_count"], ledger))
+    return session.exec(select(func.count()).select_from(DailyRollup)).one()
+
+
+def verify_daily_rollups(session) -> list:
+    """Compare the daily rollup with the ledger and return every mismatching bucket."""
+    day = func.date(Transaction.created_at)
+    ledger = {
+        (str(row_day), vendor_id, bool(has_user)): points
+        for row_day, vendor_id, has_user, points in session.exec(
+            select(day, _rollup_vendor_id(), _rollup_has_user(), func.sum(Transaction.points))
+            .where(applied_ledger_rows())
+            .group_by(day, _rollup_vendor_id(), _rollup_has_user())
+        ).all()
+    }
+    stored = {
+        (str(rollup.day), rollup.vendor_id, rollup.has_user): rollup.points
+        for rollup in session.exec(select(DailyRollup)).all()
+    }
+    return [
+        {"day": key[0], "vendor_id": key[1], "has_user": key[2], "ledger": ledger.get(key), "stored": stored.get(key)}
+        for key in sorted(ledger.keys() | stored.keys())
+        if (ledger.get(key) or 0) != (stored.get(key) or 0)
+    ]
+
+
+def rebuild_user_balances(session) -> int:
+    """Recompute every user balance from the ledger. Returns the number of balance rows written."""
+    session.exec(delete(UserBalance))
+    ledger = (
+        select(Transaction.user_id,
+               func.sum(Transaction.points),
+               literal(datetime.now(ZoneInfo("Asia/Kolkata"))))
+        .where(Transaction.user_id.isnot(None))
+        .group_by(Transaction.user_id)
+    )
+    session.exec(insert(UserBalance).from_select(["user_id", "points", "updated_at"], ledger))
+    return session.exec(select(func.count()).select_from(UserBalance)).one()
+
+
+def verify_user_balances(session) -> list:
+    """Compare the materialized balances with the ledger and return every mismatch."""
+    ledger = dict(session.exec(
+        select(Transaction.user_id, func.sum(Transaction.points))
+        .where(Transaction.user_id.isnot(None))
+        .group_by(Transaction.user_id)
+    ).all())
+    stored = dict(session.exec(select(UserBalance.user_id, UserBalance.points)).all())
+
+    mismatches = []
+    for user_id in ledger.keys() | stored.keys():
+        ledger_points = ledger.get(user_id) or 0
+        stored_points = stored.get(user_id)
+        if stored_points is None and ledger_points == 0:
+            continue
+        if stored_points != ledger_points:
+            mismatches.append({"user_id": user_id, "ledger": ledger_points, "stored": stored_points})
+    return mismatches
+
+
+#Roster sync
+def roster_client() -> httpx.AsyncClient:
+    """Client for the roster API: one bounded connection pool per sync, every request under a timeout."""
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(ROSTER_TIMEOUT_SECONDS),
+        limits=httpx.Limits(max_connections=ROSTER_MAX_CONNECTIONS, max_keepalive_connections=ROSTER_MAX_CONNECTIONS),
+    )
+
+
+async def fetch_roster_emp_ids(client:httpx.AsyncClient) -> set:
+    """Every employee code on the roster API, read ROSTER_PAGE_SIZE employees at a time.
+
+    Pages are requested with page/page_size until one comes back short.
+    A page larger than page_size means the API ignored the parameters and
+    sent the whole roster, and a page with no new codes means it is
+    repeating itself; either ends the fetch.
+    """
+    emp_ids = set()
+    for page in range(1, ROSTER_MAX_PAGES + 1):
+        response = await client.get(ROSTER_API_URL, params={"page": page, "page_size": ROSTER_PAGE_SIZE})
+        if response.status_code == 404:
+            break
+        response.raise_for_status()
+        body = response.json()
+        employees = body if isinstance(body, list) else body.get("data") or body.get("employees") or []
+        page_ids = {str(employee["empid"]).strip() for employee in employees}
+        new_ids = page_ids - emp_ids
+        emp_ids |= new_ids
+        if len(employees) != ROSTER_PAGE_SIZE or not new_ids:
+            break
+    return emp_ids
+
+
+def grant_roster_points(session, emp_ids:set, points:int) -> Optional[int]:
+    """Credit points to every registered employee on the roster, at most once per day.
+
+    The day's RosterGrant row is inserted first; if it already exists the
+    grant has been made and None is returned. The ledger rows are written by
+    INSERT ... SELECT straight from the user table, and balances and the
+    rollup follow with set-based statements, all in the caller's transaction.
+    Returns the number of ledger rows written.
+    """
+    now = datetime.now(ZoneInfo("Asia/Kolkata"))
+    guard = RosterGrant(day=now.date(), roster_size=len(emp_ids), created_at=now)
+    try:
+        with session.begin_nested():
+            session.add(guard)
+    except IntegrityError:
+        return None
+
+    description = f"Roster grant {now.date()}"
+    granted = 0
+    codes = sorted(emp_ids)
+    for start in range(0, len(codes), ROSTER_MATCH_BATCH_SIZE):
+        registered = (
+            select(new_id(), literal(now), User.id, literal(points), literal(description))
+            .where(User.is_user == True, User.emp_id.in_(codes[start:start + ROSTER_MATCH_BATCH_SIZE]))
+        )
+        granted += session.exec(
+            insert(Transaction).from_select(["id", "created_at", "user_id", "points", "description"], registered)
+        ).rowcount
+    if not granted:
+        return 0
+
+    # The guard makes the description unique to this grant; the date bound keeps the lookup on the created_at index.
+    granted_users = select(Transaction.user_id).where(Transaction.created_at >= datetime.combine(now.date(), time.min),
+                                                      Transaction.description == description)
+    session.exec(
+        update(UserBalance)
+        .where(UserBalance.user_id.in_(granted_users))
+        .values(points=UserBalance.points + points, updated_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    # First ledger write for the rest: seed their balances from the ledger, which holds the new rows.
+    # The ids are read first: MySQL rejects an INSERT whose SELECT reads the table being inserted into (error 1093).
+    unseeded = session.exec(
+        granted_users.where(Transaction.user_id.notin_(select(UserBalance.user_id)))
+    ).all()
+    for start in range(0, len(unseeded), ROSTER_MATCH_BATCH_SIZE):
+        batch = unseeded[start:start + ROSTER_MATCH_BATCH_SIZE]
+        try:
+            with session.begin_nested():
+                session.exec(insert(UserBalance).from_select(
+                    ["user_id", "points", "updated_at"],
+                    select(Transaction.user_id, func.sum(Transaction.points), literal(now))
+                    .where(Transaction.user_id.in_(batch))
+                    .group_by(Transaction.user_id)
+                ))
+        except IntegrityError:
+            # A concurrent request seeded some of them; apply_user_balance handles that race per user.
+            for user_id in batch:
+                apply_user_balance(session, user_id, points)
+
+    apply_rollup_delta(session, now.date(), "", True, points * granted, granted)
+    guard.transaction_count = granted
+    return granted
+
+
+@job_handler(ROSTER_SYNC_JOB)
+def sync_roster(session, job, progress) -> tuple:
+    """Fetch the roster and make the day's grant. Returns (summary, registered employees not on the roster)."""
+    async def fetch():
+        async with roster_client() as client:
+            return await fetch_roster_emp_ids(client)
+
+    try:
+        emp_ids = asyncio.run(fetch())
+    except httpx.HTTPError as e:
+        raise ConnectionError(f"Roster API request failed: {type(e).__name__} {e}".strip())
+    if not emp_ids:
+        raise ValueError("No employees found in the roster API")
+    progress(0, None, "Granting points")
+
+    transactions_added = grant_roster_points(session, emp_ids, ATTENDANCE_POINTS)
+    if transactions_added is None:
+        return {"roster_size": len(emp_ids), "transactions_added": 0, "skipped": "Already granted today"}, []
+
+    registered = select(User.emp_id, User.id, User.created_at).where(User.is_user == True)
+    unassigned = [{"emp_id": user.emp_id, "details": "User not registered"}
+                  for user in iter_pages(session, registered, User) if user.emp_id not in emp_ids]
+    return {"roster_size": len(emp_ids), "transactions_added": transactions_added,
+            "unassigned": len(unassigned)}, unassigned
@@ -0,0 +1,158 @@
+import random
+import pytest
+from datetime import datetime, timedelta, time
+from sqlmodel import SQLModel, Session, create_engine, select, func, case, update
+from sqlalchemy.pool import StaticPool
+
+from src.user.models import User
+from src.vendor.models import Vendor
+from src.transaction.models import Transaction, DailyRollup, PendingTotal
+from src.transaction.service import (
+    record_transaction,
+    redeem_points,
+    apply_pending_totals,
+    settle_pending_totals,
+    summarize_points,
+    rebuild_daily_rollups,
+    verify_daily_rollups,
+)
+
+START = datetime(2024, 1, 1, 9, 0, 0)
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def ledger(engine):
+    """Sixty days of credits, redemptions and claim payouts at random times of day."""
+    rng = random.Random(6)
+    with Session(engine) as session:
+        users = [User(name=f"Employee {i}", username=f"employee{i}", password="Password123",
+                      email=f"employee{i}@example.com", mobile_number="9876543210",
+                      emp_id=f"AJA{i:03}", is_user=True) for i in range(4)]
+        owners = [User(name=f"Owner {i}", username=f"owner{i}", password="Password123",
+                       email=f"owner{i}@example.com", mobile_number="9876543210", is_vendor=True) for i in range(2)]
+        vendors = [Vendor(vendor_name=f"Vendor {i}", qr_code="qr-code", user_id=owner.id, bank_name="Bank",
+                          account_holder_name="Owner", account_number="12345678", ifsc_code="ABCD0123456",
+                          branch_name="Main", aadhar_card="123456789012", pan_card="ABCDE1234F")
+                   for i, owner in enumerate(owners)]
+        session.add_all([*users, *owners, *vendors])
+        session.commit()
+
+        for day in range(60):
+            for _ in range(rng.randint(1, 6)):
+                created_at = START + timedelta(days=day, seconds=rng.randint(-9 * 3600, 15 * 3600 - 1),
+                                               microseconds=rng.randint(0, 999999))
+                kind = rng.choice(["credit", "redeem", "payout"])
+                if kind == "credit":
+                    transaction = Transaction(user_id=rng.choice(users).id, points=20, created_at=created_at)
+                elif kind == "redeem":
+                    transaction = Transaction(user_id=rng.choice(users).id, vendor_id=rng.choice(vendors).id,
+                                              points=-rng.randint(1, 15), created_at=created_at)
+                else:
+                    transaction = Transaction(vendor_id=rng.choice(vendors).id, points=rng.randint(1, 30),
+                                              created_at=created_at)
+                record_transaction(session, transaction)
+        session.commit()
+        return {"users": [user.id for user in users], "vendors": [vendor.id for vendor in vendors]}
+
+
+def ledger_summary(session, start_date=None, end_date=None):
+    """The aggregate the admin reports ran over the ledger before the rollup existed."""
+    stmt = select(
+        func.coalesce(func.sum(case((Transaction.vendor_id.is_(None), Transaction.points), else_=0)), 0),
+        func.coalesce(func.sum(case((Transaction.user_id.isnot(None), Transaction.points), else_=0)), 0),
+        func.coalesce(func.abs(func.sum(case(((Transaction.vendor_id.isnot(None)) & (Transaction.user_id.isnot(None)),
+                                              Transaction.points), else_=0))), 0),
+        func.coalesce(func.sum(case((Transaction.user_id.is_(None), Transaction.points), else_=0)), 0),
+    )
+    if start_date and end_date:
+        stmt = stmt.where(Transaction.created_at.between(start_date, end_date))
+    result = session.exec(stmt).first()
+    return dict(zip(["points_assigned_to_employee", "points_assigned_to_employee_balance",
+                     "total_points_user_sends_to_vendor", "points_claimed_by_vendor"], result))
+
+
+@pytest.mark.parametrize("start_date, end_date", [
+    (None, None),
+    (datetime(2024, 1, 1), datetime.combine(datetime(2024, 1, 31), time.max)),
+    (datetime(2024, 2, 1), datetime(2024, 2, 29, 23, 59, 59)),
+    (datetime(2024, 1, 5, 13, 30), datetime(2024, 2, 10, 8, 15, 0, 500)),
+    (datetime(2024, 1, 20, 6, 0), datetime(2024, 1, 20, 18, 0)),
+    (datetime(2024, 1, 20, 6, 0), datetime(2024, 1, 21, 5, 0)),
+    (datetime(2023, 6, 1), datetime(2023, 6, 30)),
+])
+def test_rollup_summary_matches_ledger(engine, ledger, start_date, end_date):
+    with Session(engine) as session:
+        assert summarize_points(session, start_date, end_date) == ledger_summary(session, start_date, end_date)
+
+
+def test_redemptions_are_rolled_up(engine, ledger):
+    with Session(engine) as session:
+        record_transaction(session, Transaction(user_id=ledger["users"][0], points=100))
+        redeem_points(session, ledger["users"][0], ledger["vendors"][0], 40)
+        session.commit()
+        # Until it is applied the redemption is pending, which verify leaves out on both sides.
+        assert verify_daily_rollups(session) == []
+
+        assert settle_pending_totals(session) == 1
+        assert summarize_points(session) == ledger_summary(session)
+        assert verify_daily_rollups(session) == []
+
+
+def test_pending_redemptions_count_alike_in_whole_and_partial_days(engine, ledger):
+    start_date, end_date = datetime(2024, 1, 20, 18, 0), datetime(2024, 1, 22, 6, 0)
+    with Session(engine) as session:
+        record_transaction(session, Transaction(user_id=ledger["users"][0], points=100))
+        # One redemption in the partial first day of the range, one in the whole day after it.
+        for points, created_at in ((10, datetime(2024, 1, 20, 22, 0)), (15, datetime(2024, 1, 21, 10, 0))):
+            redemption = redeem_points(session, ledger["users"][0], ledger["vendors"][0], points)
+            session.flush()
+            redemption.created_at = created_at
+            session.exec(update(PendingTotal).where(PendingTotal.transaction_id == redemption.id)
+                         .values(created_at=created_at))
+        session.commit()
+
+        pending = summarize_points(session, start_date, end_date)
+        assert settle_pending_totals(session) == 2
+        applied = summarize_points(session, start_date, end_date)
+        assert applied == ledger_summary(session, start_date, end_date)
+        assert pending["total_points_user_sends_to_vendor"] == applied["total_points_user_sends_to_vendor"] - 25
+        assert pending["points_assigned_to_employee_balance"] == applied["points_assigned_to_employee_balance"] + 25
+
+
+def test_rebuild_leaves_pending_redemptions_to_be_applied(engine, ledger):
+    with Session(engine) as session:
+        record_transaction(session, Transaction(user_id=ledger["users"][0], points=100))
+        redeem_points(session, ledger["users"][0], ledger["vendors"][0], 40)
+        session.commit()
+        session.info.pop("pending_totals")
+
+        rebuild_daily_rollups(session)
+        session.commit()
+        assert apply_pending_totals(session) == 1
+        assert summarize_points(session) == ledger_summary(session)
+        assert verify_daily_rollups(session) == []
+
+
+def test_rebuild_and_verify_rollups(engine, ledger):
+    with Session(engine) as session:
+        expected = session.exec(select(func.count()).select_from(DailyRollup)).one()
+        rollup = session.exec(select(DailyRollup)).first()
+        rollup.points += 5
+        session.add(rollup)
+        session.commit()
+
+        mismatches = verify_daily_rollups(session)
+        assert len(mismatches) == 1
+        assert mismatches[0]["stored"] == mismatches[0]["ledger"] + 5
+
+        assert rebuild_daily_rollups(session) == expected
+        session.commit()
+        assert verify_daily_rollups(session) == []
@@ -0,0 +1,154 @@
+import random
+import pytest
+from contextlib import contextmanager
+from datetime import date, datetime, time, timedelta
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel, Session, create_engine
+
+from src.database import get_session
+from src.auth.dependencies import validate_token
+from src.user.models import User
+from src.vendor.models import Vendor
+from src.transaction.models import Transaction
+from src.transaction.router import router as transaction_router
+from src.transaction.service import record_transaction, summarize_points, series_periods, series_start
+
+START = datetime(2024, 1, 1, 9, 0, 0)
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def ledger(engine):
+    """Credits, redemptions and claim payouts on random days from January to mid-April 2024."""
+    rng = random.Random(23)
+    with Session(engine) as session:
+        users = [User(name=f"Employee {i}", username=f"employee{i}", password="Password123",
+                      email=f"employee{i}@example.com", mobile_number="9876543210",
+                      emp_id=f"AJA{i:03}", is_user=True) for i in range(3)]
+        owners = [User(name=f"Owner {i}", username=f"owner{i}", password="Password123",
+                       email=f"owner{i}@example.com", mobile_number="9876543210", is_vendor=True) for i in range(2)]
+        vendors = [Vendor(vendor_name=f"Vendor {i}", qr_code="qr-code", user_id=owner.id, bank_name="Bank",
+                          account_holder_name="Owner", account_number="12345678", ifsc_code="ABCD0123456",
+                          branch_name="Main", aadhar_card="123456789012", pan_card="ABCDE1234F")
+                   for i, owner in enumerate(owners)]
+        session.add_all([*users, *owners, *vendors])
+        session.commit()
+
+        for _ in range(300):
+            created_at = START + timedelta(days=rng.randint(0, 105), seconds=rng.randint(-9 * 3600, 14 * 3600))
+            kind = rng.choice(["credit", "redeem", "payout"])
+            if kind == "credit":
+                transaction = Transaction(user_id=rng.choice(users).id, points=20, created_at=created_at)
+            elif kind == "redeem":
+                transaction = Transaction(user_id=rng.choice(users).id, vendor_id=rng.choice(vendors).id,
+                                          points=-rng.randint(1, 15), created_at=created_at)
+            else:
+                transaction = Transaction(vendor_id=rng.choice(vendors).id, points=rng.randint(1, 30),
+                                          created_at=created_at)
+            record_transaction(session, transaction)
+        session.commit()
+        return {vendor.vendor_name: vendor.id for vendor in vendors}
+
+
+@pytest.fixture
+def client(engine):
+    app = FastAPI()
+    app.include_router(transaction_router, prefix="/api/v1/transaction")
+
+    def override_session():
+        with Session(engine) as session:
+            yield session
+
+    app.dependency_overrides[get_session] = override_session
+    app.dependency_overrides[validate_token] = lambda: {"user_id": "admin", "is_admin": True}
+    return TestClient(app)
+
+
+@contextmanager
+def count_queries(engine):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+def test_series_periods_cover_the_range():
+    assert series_periods(date(2024, 1, 30), date(2024, 3, 2), "month") == \
+        [date(2024, 1, 1), date(2024, 2, 1), date(2024, 3, 1)]
+    # 2024-01-03 is a Wednesday; weeks start on Monday.
+    assert series_periods(date(2024, 1, 3), date(2024, 1, 15), "week") == \
+        [date(2024, 1, 1), date(2024, 1, 8), date(2024, 1, 15)]
+    assert series_start(date(2024, 3, 15), "month", 12) == date(2023, 4, 1)
+    assert series_start(date(2024, 3, 15), "day", 1) == date(2024, 3, 15)
+
+
+@pytest.mark.parametrize("interval", ["day", "week", "month"])
+def test_each_bucket_matches_the_range_report(engine, ledger, client, interval):
+    start_day, end_day = date(2024, 1, 10), date(2024, 4, 10)
+    with count_queries(engine) as statements:
+        response = client.get("/api/v1/transaction/points/series",
+                              params={"start_date": str(start_day), "end_date": str(end_day), "interval": interval})
+    assert response.status_code == 200
+    assert len(statements) == 1
+
+    data = response.json()["data"]
+    periods = [date.fromisoformat(period) for period in data["periods"]]
+    assert periods == series_periods(start_day, end_day, interval)
+    with Session(engine) as session:
+        for i, period in enumerate(periods):
+            # The bucket's days inside the requested range.
+            next_period = series_periods(period, period + timedelta(days=31), interval)[1]
+            first, last = max(period, start_day), min(next_period - timedelta(days=1), end_day)
+            expected = summarize_points(session, datetime.combine(first, time.min), datetime.combine(last, time.max))
+            assert data["granted"][i] == expected["points_assigned_to_employee"]
+            assert data["redeemed"][i] == expected["total_points_user_sends_to_vendor"]
+            assert data["claimed"][i] == expected["points_claimed_by_vendor"]
+            assert data["pending"][i] == abs(expected["total_points_user_sends_to_vendor"]
+                                             - expected["points_claimed_by_vendor"])
+
+
+def test_vendor_breakdown_adds_up_to_the_totals(engine, ledger, client):
+    with count_queries(engine) as statements:
+        data = client.get("/api/v1/transaction/points/series",
+                          params={"start_date": "2024-01-01", "end_date": "2024-04-30", "by_vendor": True}).json()["data"]
+    assert len(statements) == 1
+    assert [vendor["vendor_name"] for vendor in data["vendors"]] == ["Vendor 0", "Vendor 1"]
+    assert {vendor["vendor_id"] for vendor in data["vendors"]} == set(ledger.values())
+    for series in ("redeemed", "claimed"):
+        assert [sum(points) for points in zip(*(vendor[series] for vendor in data["vendors"]))] == data[series]
+    assert "vendors" not in client.get("/api/v1/transaction/points/series").json()["data"]
+
+
+def test_empty_buckets_are_zero_and_defaults_cover_twelve_buckets(client):
+    data = client.get("/api/v1/transaction/points/series", params={"end_date": "2024-06-30"}).json()["data"]
+    assert data["start_date"] == "2023-07-01"
+    assert len(data["periods"]) == 12
+    assert data["granted"] == [0] * 12 and data["pending"] == [0] * 12
+
+
+def test_invalid_requests(client):
+    url = "/api/v1/transaction/points/series"
+    response = client.get(url, params={"start_date": "2024-02-01", "end_date": "2024-01-01"})
+    assert (response.status_code, response.json()["error"]) == (400, "Start date cannot be after end date.")
+    assert client.get(url, params={"start_date": "2020-01-01", "end_date": "2024-01-01", "interval": "day"}).status_code == 400
+    assert client.get(url, params={"interval": "year"}).status_code == 422
+
+    client.app.dependency_overrides[validate_token] = lambda: {"user_id": "employee", "is_user": True}
+    response = client.get(url)
+    assert (response.status_code, response.json()["error"]) == (400, "You are not authorized")
@@ -0,0 +1,115 @@
+import pytest
+from sqlalchemy import event
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlmodel import SQLModel, Session, create_engine, select
+
+from src.database import get_session
+from src.auth.dependencies import validate_token
+from src.user.models import User
+from src.transaction.models import Transaction, UserBalance, DailyRollup
+from src.transaction.service import record_transaction, grant_points, verify_user_balances, verify_daily_rollups
+from src.transaction.router import router as transaction_router
+from src.jobs.router import router as jobs_router
+from src.jobs import service as jobs_service
+import src.pagination as pagination
+import src.transaction.utils as upload_utils
+
+UPLOAD = "/api/v1/transaction/user-data/upload/transaction"
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'redeemx.db'}", connect_args={"check_same_thread": False})
+    SQLModel.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def employees(engine):
+    with Session(engine) as session:
+        users = [User(name=f"Employee {i}", username=f"employee{i}", password="Password123",
+                      email=f"employee{i}@example.com", mobile_number="9876543210",
+                      emp_id=f"{100 + i}", is_user=True) for i in range(6)]
+        session.add_all(users)
+        session.commit()
+        # One employee already has a balance row, the rest are seeded by the upload.
+        record_transaction(session, Transaction(user_id=users[0].id, points=5))
+        session.commit()
+        return {user.emp_id: user.id for user in users}
+
+
+@pytest.fixture
+def client(engine, monkeypatch):
+    # Run the upload job inside the request so the result is ready when it returns.
+    monkeypatch.setattr(jobs_service, "JOB_WORKERS", 0)
+    app = FastAPI()
+    app.include_router(transaction_router, prefix="/api/v1/transaction")
+    app.include_router(jobs_router, prefix="/api/v1/jobs")
+
+    def override_session():
+        with Session(engine) as session:
+            yield session
+
+    app.dependency_overrides[get_session] = override_session
+    app.dependency_overrides[validate_token] = lambda: {"user_id": "admin", "is_admin": True}
+    return TestClient(app)
+
+
+def upload(client, csv_data):
+    response = client.post(UPLOAD, files={"file": ("attendance.csv", csv_data, "text/csv")})
+    assert response.status_code == 202
+    assert response.json()["message"] == "File accepted for processing."
+    return client.get(response.json()["data"]["status_url"]).json()["data"]
+
+
+def test_upload_grants_matched_employees_and_reports_the_rest(engine, employees, client, monkeypatch):
+    # Small pages so the pass over the employees crosses several keyset pages.
+    monkeypatch.setattr(pagination, "STREAM_BATCH_SIZE", 2)
+    job = upload(client, "Name,E. Code\nA,100\nB, 102 \nC,104\nD,104\nE,999\n")
+
+    assert job["status"] == "succeeded"
+    assert job["summary"] == {"codes_in_file": 4, "transactions_added": 3, "unassigned": 3}
+    unassigned = client.get(f"/api/v1/jobs/{job['id']}/result").json()
+    assert sorted(item["emp_id"] for item in unassigned) == ["101", "103", "105"]
+    assert {item["details"] for item in unassigned} == {"User not registered"}
+
+    with Session(engine) as session:
+        balances = dict(session.exec(select(UserBalance.user_id, UserBalance.points)).all())
+        assert balances == {employees["100"]: 25, employees["102"]: 20, employees["104"]: 20}
+        assert len(session.exec(select(Transaction).where(Transaction.points == 20)).all()) == 3
+        assert verify_user_balances(session) == []
+        assert verify_daily_rollups(session) == []
+
+
+def test_upload_reads_the_file_in_chunks(engine, employees, client, monkeypatch):
+    monkeypatch.setattr(upload_utils, "UPLOAD_CHUNK_ROWS", 2)
+    job = upload(client, "E. Code\n" + "".join(f"{code}\n" for code in range(90, 110)))
+
+    assert job["summary"]["unassigned"] == 0
+    with Session(engine) as session:
+        assert len(session.exec(select(UserBalance)).all()) == 6
+
+
+def test_upload_without_the_code_column_fails_the_job(employees, client):
+    job = upload(client, "Name\nA\n")
+    assert job["status"] == "failed"
+    assert "E. Code" in job["error"]
+
+
+def test_grant_points_uses_one_insert(engine, employees):
+    inserts = []
+
+    def count_inserts(conn, cursor, statement, parameters, context, executemany):
+        if statement.upper().replace('"', "").startswith("INSERT INTO TRANSACTION "):
+            inserts.append(executemany)
+
+    event.listen(engine, "before_cursor_execute", count_inserts)
+    with Session(engine) as session:
+        assert grant_points(session, list(employees.values()), 20, batch_size=4) == 6
+        session.commit()
+        assert session.exec(select(DailyRollup.transaction_count).where(DailyRollup.vendor_id == "")).one() == 7
+        assert verify_user_balances(session) == []
+    event.remove(engine, "before_cursor_execute", count_inserts)
+    assert inserts == [True]
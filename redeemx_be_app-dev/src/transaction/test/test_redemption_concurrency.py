@@ -0,0 +1,199 @@
+import os
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
+from sqlmodel import SQLModel, Session, create_engine, select, func
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+
+from src.user.models import User
+from src.vendor.models import Vendor, VendorBalance
+from src.vendor.service import verify_vendor_balances
+from src.transaction.models import Transaction, UserBalance, DailyRollup, PendingTotal
+from src.transaction import service
+from src.transaction.service import (record_transaction, redeem_points, get_user_balance, settle_pending_totals,
+                                      apply_pending_totals, verify_daily_rollups)
+from src.transaction.exceptions import InsufficientPointsError
+
+
+@pytest.fixture
+def engine(tmp_path):
+    # Set TEST_DATABASE_URL to run the stress test against MySQL/InnoDB row locks.
+    database_url = os.getenv("TEST_DATABASE_URL")
+    if database_url:
+        engine = create_engine(database_url, pool_size=20, max_overflow=20)
+    else:
+        engine = create_engine(f"sqlite:///{tmp_path / 'redemption.db'}",
+                               connect_args={"check_same_thread": False, "timeout": 30})
+
+        # pysqlite defers BEGIN; take the write lock up front so concurrent
+        # writers queue on the busy timeout instead of failing lock upgrades.
+        @event.listens_for(engine, "connect")
+        def disable_pysqlite_begin(dbapi_connection, connection_record):
+            dbapi_connection.isolation_level = None
+
+        @event.listens_for(engine, "begin")
+        def begin_immediate(connection):
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+    SQLModel.metadata.create_all(engine)
+    yield engine
+    SQLModel.metadata.drop_all(engine)
+    engine.dispose()
+
+
+def create_user(session, index):
+    user = User(name=f"Employee {index}", username=f"employee_{index}", password="Password123",
+                email=f"employee{index}@example.com", mobile_number="9876543210", emp_id=f"AJA{index}", is_user=True)
+    session.add(user)
+    return user
+
+
+@pytest.fixture
+def vendor(engine):
+    with Session(engine) as session:
+        user = User(name="Canteen Owner", username="canteen", password="Password123",
+                    email="canteen@example.com", mobile_number="9876543210", is_vendor=True)
+        vendor = Vendor(vendor_name="Canteen", qr_code="qr-code", user_id=user.id, bank_name="Bank",
+                        account_holder_name="Owner", account_number="12345678", ifsc_code="ABCD0123456",
+                        branch_name="Main", aadhar_card="123456789012", pan_card="ABCDE1234F")
+        session.add(user)
+        session.add(vendor)
+        session.commit()
+        return vendor.id
+
+
+def redeem(engine, barrier, user_id, vendor_id, points):
+    barrier.wait()
+    with Session(engine) as session:
+        try:
+            redeem_points(session, user_id, vendor_id, points)
+            session.commit()
+            settle_pending_totals(session)
+            return True
+        except InsufficientPointsError:
+            session.rollback()
+            return False
+
+
+def test_concurrent_redemptions_cannot_double_spend(engine, vendor):
+    with Session(engine) as session:
+        user_id = create_user(session, 1).id
+        session.commit()
+        record_transaction(session, Transaction(user_id=user_id, points=100))
+        session.commit()
+
+    attempts = 40
+    barrier = Barrier(attempts)
+    with ThreadPoolExecutor(max_workers=attempts) as executor:
+        results = list(executor.map(lambda _: redeem(engine, barrier, user_id, vendor, 10), range(attempts)))
+
+    assert results.count(True) == 10
+    with Session(engine) as session:
+        assert get_user_balance(session, user_id) == 0
+        assert session.exec(select(func.sum(Transaction.points)).where(Transaction.user_id == user_id)).one() == 0
+        assert session.get(VendorBalance, vendor).received_points == 100
+
+
+def test_concurrent_redemptions_across_users_all_succeed(engine, vendor):
+    with Session(engine) as session:
+        user_ids = [create_user(session, index).id for index in range(20)]
+        session.commit()
+        for user_id in user_ids:
+            record_transaction(session, Transaction(user_id=user_id, points=20))
+        session.commit()
+
+    barrier = Barrier(len(user_ids))
+    with ThreadPoolExecutor(max_workers=len(user_ids)) as executor:
+        results = list(executor.map(lambda user_id: redeem(engine, barrier, user_id, vendor, 15), user_ids))
+
+    assert all(results)
+    with Session(engine) as session:
+        assert set(session.exec(select(UserBalance.points)).all()) == {5}
+        assert session.get(VendorBalance, vendor).received_points == 15 * len(user_ids)
+
+
+def test_redemption_seeds_missing_balance_row(engine, vendor):
+    with Session(engine) as session:
+        user_id = create_user(session, 1).id
+        session.add(Transaction(user_id=user_id, points=30))
+        session.commit()
+
+        redeem_points(session, user_id, vendor, 25)
+        session.commit()
+        assert session.get(UserBalance, user_id).points == 5
+
+        with pytest.raises(InsufficientPointsError) as error:
+            redeem_points(session, user_id, vendor, 10)
+        assert error.value.available_points == 5
+
+
+def test_redemption_leaves_the_vendors_rows_to_after_the_commit(engine, vendor):
+    with Session(engine) as session:
+        user_id = create_user(session, 1).id
+        session.commit()
+        record_transaction(session, Transaction(user_id=user_id, points=100))
+        session.commit()
+
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement.lower())
+
+        event.listen(engine, "before_cursor_execute", record)
+        redeem_points(session, user_id, vendor, 30)
+        session.commit()
+        event.remove(engine, "before_cursor_execute", record)
+        assert not [statement for statement in statements if "vendorbalance" in statement or "dailyrollup" in statement]
+        # Pending until applied, and left out of the ledger side of verify until then.
+        assert session.exec(select(func.count()).select_from(PendingTotal)).one() == 1
+        assert verify_vendor_balances(session) == [] and verify_daily_rollups(session) == []
+
+        assert settle_pending_totals(session) == 1
+        assert session.get(VendorBalance, vendor).received_points == 30
+        assert session.exec(select(func.count()).select_from(PendingTotal)).one() == 0
+        assert verify_vendor_balances(session) == [] and verify_daily_rollups(session) == []
+
+
+def test_deadlocked_apply_is_run_again(engine, vendor, monkeypatch):
+    with Session(engine) as session:
+        user_id = create_user(session, 1).id
+        session.commit()
+        record_transaction(session, Transaction(user_id=user_id, points=100))
+        redeem_points(session, user_id, vendor, 30)
+        session.commit()
+
+        apply_vendor_transaction = service.apply_vendor_transaction
+        failures = [OperationalError("UPDATE vendorbalance", {}, Exception(1213, "Deadlock found when trying to get lock"))]
+
+        def deadlock_once(*args):
+            if failures:
+                raise failures.pop()
+            apply_vendor_transaction(*args)
+
+        monkeypatch.setattr(service, "apply_vendor_transaction", deadlock_once)
+        assert settle_pending_totals(session) == 1
+        assert session.get(VendorBalance, vendor).received_points == 30
+        assert verify_daily_rollups(session) == []
+
+
+def test_failed_apply_is_left_for_the_sweep(engine, vendor, monkeypatch):
+    with Session(engine) as session:
+        user_id = create_user(session, 1).id
+        session.commit()
+        record_transaction(session, Transaction(user_id=user_id, points=100))
+        redeem_points(session, user_id, vendor, 30)
+        session.commit()
+
+        def lost_connection(*args):
+            raise OperationalError("UPDATE vendorbalance", {}, Exception(2013, "Lost connection to MySQL server"))
+
+        monkeypatch.setattr(service, "apply_vendor_transaction", lost_connection)
+        assert settle_pending_totals(session) == 0
+        monkeypatch.undo()
+
+        assert session.get(VendorBalance, vendor) is None
+        assert apply_pending_totals(session) == 1
+        assert apply_pending_totals(session) == 0
+        assert session.get(VendorBalance, vendor).received_points == 30
+        assert verify_vendor_balances(session) == []
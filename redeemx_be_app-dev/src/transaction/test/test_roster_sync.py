@@ -0,0 +1,190 @@
+import json
+import threading
+from datetime import datetime
+import time
+import pytest
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlmodel import SQLModel, Session, create_engine, select
+
+from src.database import get_session
+from src.auth.dependencies import validate_token
+from src.user.models import User
+from src.transaction.models import Transaction, UserBalance, RosterGrant
+from src.transaction.router import router as transaction_router
+from src.transaction.service import record_transaction, verify_user_balances, verify_daily_rollups
+from src.transaction import service as transaction_service
+from src.jobs.router import router as jobs_router
+from src.jobs import service as jobs_service
+from src.jobs.models import SchedulerLease, SchedulerRun
+from src.jobs.schedule import run_scheduled_task
+from src import config
+
+
+class RosterStub(BaseHTTPRequestHandler):
+    """Stands in for the roster API: pages of {"empid": ...} honouring page/page_size."""
+    employees = []
+    paginate = True
+    delay = 0
+    requests = []
+
+    def do_GET(self):
+        params = parse_qs(urlparse(self.path).query)
+        RosterStub.requests.append(params)
+        time.sleep(self.delay)
+        employees = self.employees
+        if self.paginate:
+            page, page_size = int(params["page"][0]), int(params["page_size"][0])
+            employees = employees[(page - 1) * page_size:page * page_size]
+        body = json.dumps([{"empid": emp_id, "name": f"Employee {emp_id}"} for emp_id in employees]).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class RosterServer(ThreadingHTTPServer):
+    # Let server_close() wait for a delayed response, and drop the broken pipe when the client has timed out.
+    daemon_threads = False
+
+    def handle_error(self, request, client_address):
+        pass
+
+
+@pytest.fixture
+def roster(monkeypatch):
+    server = RosterServer(("127.0.0.1", 0), RosterStub)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(RosterStub, "employees", ["100", "101", "102", "103", "104", "999"])
+    monkeypatch.setattr(RosterStub, "paginate", True)
+    monkeypatch.setattr(RosterStub, "delay", 0)
+    monkeypatch.setattr(RosterStub, "requests", [])
+    monkeypatch.setattr(transaction_service, "ROSTER_API_URL", f"http://127.0.0.1:{server.server_port}/employees")
+    monkeypatch.setattr(transaction_service, "ROSTER_PAGE_SIZE", 2)
+    yield RosterStub
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'redeemx.db'}", connect_args={"check_same_thread": False})
+    SQLModel.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def employees(engine):
+    with Session(engine) as session:
+        users = [User(name=f"Employee {i}", username=f"employee{i}", password="Password123",
+                      email=f"employee{i}@example.com", mobile_number="9876543210",
+                      emp_id=f"{100 + i * 2}", is_user=True) for i in range(4)]
+        session.add_all(users)
+        session.commit()
+        # One employee already has a balance row, the rest are seeded by the grant.
+        record_transaction(session, Transaction(user_id=users[0].id, points=5))
+        session.commit()
+        return {user.emp_id: user.id for user in users}
+
+
+@pytest.fixture
+def client(engine, monkeypatch):
+    monkeypatch.setattr(jobs_service, "JOB_WORKERS", 0)
+    app = FastAPI()
+    app.include_router(transaction_router, prefix="/api/v1/transaction")
+    app.include_router(jobs_router, prefix="/api/v1/jobs")
+
+    def override_session():
+        with Session(engine) as session:
+            yield session
+
+    app.dependency_overrides[get_session] = override_session
+    app.dependency_overrides[validate_token] = lambda: {"user_id": "admin", "is_admin": True}
+    return TestClient(app)
+
+
+def sync(client):
+    response = client.post("/api/v1/transaction/roster/sync")
+    assert response.status_code == 202
+    return client.get(response.json()["data"]["status_url"]).json()["data"]
+
+
+def test_roster_sync_grants_registered_employees_once_a_day(engine, employees, roster, client):
+    job = sync(client)
+
+    assert job["status"] == "succeeded"
+    assert job["summary"] == {"roster_size": 6, "transactions_added": 3, "unassigned": 1}
+    assert len(roster.requests) == 4
+    assert [params["page"] for params in roster.requests] == [["1"], ["2"], ["3"], ["4"]]
+    unassigned = client.get(f"/api/v1/jobs/{job['id']}/result").json()
+    assert unassigned == [{"emp_id": "106", "details": "User not registered"}]
+
+    with Session(engine) as session:
+        balances = dict(session.exec(select(UserBalance.user_id, UserBalance.points)).all())
+        assert balances == {employees["100"]: 25, employees["102"]: 20, employees["104"]: 20}
+        assert session.exec(select(RosterGrant.transaction_count)).one() == 3
+        assert verify_user_balances(session) == []
+        assert verify_daily_rollups(session) == []
+
+    again = sync(client)
+    assert again["status"] == "succeeded"
+    assert again["summary"]["skipped"] == "Already granted today"
+    with Session(engine) as session:
+        assert len(session.exec(select(Transaction).where(Transaction.points == 20)).all()) == 3
+
+
+def test_roster_api_without_paging_is_read_once(engine, employees, roster, client):
+    roster.paginate = False
+    job = sync(client)
+
+    assert job["summary"]["transactions_added"] == 3
+    assert len(roster.requests) == 1
+
+
+def test_slow_roster_api_fails_the_job_without_using_up_the_day(engine, employees, roster, client, monkeypatch):
+    monkeypatch.setattr(transaction_service, "ROSTER_TIMEOUT_SECONDS", 0.2)
+    roster.delay = 1
+    job = sync(client)
+
+    assert job["status"] == "failed"
+    assert job["error"].startswith("Roster API request failed: ReadTimeout")
+    with Session(engine) as session:
+        assert session.exec(select(RosterGrant)).all() == []
+
+    roster.delay = 0
+    assert sync(client)["summary"]["transactions_added"] == 3
+
+
+def test_roster_sync_needs_an_admin(engine, client):
+    client.app.dependency_overrides[validate_token] = lambda: {"user_id": "employee", "is_user": True}
+    response = client.post("/api/v1/transaction/roster/sync")
+    assert response.status_code == 400
+    assert response.json()["error"] == "You are not authorized"
+
+
+def test_scheduled_sync_fails_its_run_until_the_grant_is_made(engine, employees, roster, monkeypatch):
+    monkeypatch.setattr(config, "engine", engine)
+    scheduled_for = datetime(2024, 1, 1, 16, 27)
+
+    roster.employees = []
+    assert run_scheduled_task(engine, "sync_employee_roster", scheduled_for) is True
+    with Session(engine) as session:
+        run = session.exec(select(SchedulerRun)).one()
+        assert run.status == "failed"
+        assert "No employees found in the roster API" in run.error
+        # The occurrence is still owed, so catch-up runs it again.
+        assert session.get(SchedulerLease, "sync_employee_roster").last_scheduled_for is None
+
+    roster.employees = ["100", "102"]
+    assert run_scheduled_task(engine, "sync_employee_roster", scheduled_for) is True
+    with Session(engine) as session:
+        assert session.get(SchedulerLease, "sync_employee_roster").last_scheduled_for == scheduled_for
+        assert session.exec(select(RosterGrant.transaction_count)).one() == 2
@@ -0,0 +1,93 @@
+import pytest
+from sqlmodel import SQLModel, Session, create_engine, select
+from sqlalchemy.pool import StaticPool
+
+from src.user.models import User
+from src.vendor.models import Vendor
+from src.transaction.models import Transaction, UserBalance
+from src.transaction.service import (
+    record_transaction,
+    get_user_balance,
+    rebuild_user_balances,
+    verify_user_balances,
+)
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def user(engine):
+    with Session(engine) as session:
+        user = User(name="Balance User", username="balance_user", password="Password123",
+                    email="balance@example.com", mobile_number="9876543210", emp_id="AJA001", is_user=True)
+        session.add(user)
+        session.commit()
+        return user.id
+
+
+def test_record_transaction_maintains_balance(engine, user):
+    with Session(engine) as session:
+        record_transaction(session, Transaction(user_id=user, points=20))
+        record_transaction(session, Transaction(user_id=user, points=20))
+        record_transaction(session, Transaction(user_id=user, points=-15))
+        session.commit()
+
+    with Session(engine) as session:
+        assert session.get(UserBalance, user).points == 25
+        assert get_user_balance(session, user) == 25
+
+
+def test_balance_row_is_seeded_from_existing_ledger(engine, user):
+    with Session(engine) as session:
+        session.add(Transaction(user_id=user, points=40))
+        session.commit()
+
+    with Session(engine) as session:
+        assert get_user_balance(session, user) == 40
+        record_transaction(session, Transaction(user_id=user, points=-10))
+        session.commit()
+
+    with Session(engine) as session:
+        assert session.get(UserBalance, user).points == 30
+
+
+def test_rollback_discards_balance_update(engine, user):
+    with Session(engine) as session:
+        record_transaction(session, Transaction(user_id=user, points=20))
+        session.commit()
+
+    with Session(engine) as session:
+        record_transaction(session, Transaction(user_id=user, points=-20))
+        session.rollback()
+
+    with Session(engine) as session:
+        assert get_user_balance(session, user) == 20
+
+
+def test_vendor_only_transaction_does_not_touch_user_balances(engine):
+    with Session(engine) as session:
+        record_transaction(session, Transaction(vendor_id=None, user_id=None, points=50))
+        session.commit()
+        assert session.exec(select(UserBalance)).all() == []
+
+
+def test_rebuild_and_verify(engine, user):
+    with Session(engine) as session:
+        record_transaction(session, Transaction(user_id=user, points=20))
+        session.commit()
+        session.get(UserBalance, user).points = 999
+        session.commit()
+
+        assert verify_user_balances(session) == [{"user_id": user, "ledger": 20, "stored": 999}]
+
+        assert rebuild_user_balances(session) == 1
+        session.commit()
+        session.expire_all()
+        assert session.get(UserBalance, user).points == 20
+        assert verify_user_balances(session) == []
@@ -1,127 +1,151 @@
 import pytest
 from fastapi.testclient import TestClient
-from unittest.mock import Mock, MagicMock
-from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import SQLModel, Session, create_engine, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from main import app
-from src.transaction.schemas import TransactionUserInputSchema
-from database import get_session  
+from src.database import get_async_session
+from src.user.models import User
+from src.vendor.models import Vendor, VendorBalance
+from src.transaction.models import Transaction, UserBalance, PendingTotal
+from src.transaction.service import record_transaction
+from src.transaction.exceptions import InsufficientPointsError
+from src.transaction import router as transaction_router_module
+from src.auth.utils import create_access_token
 
 client = TestClient(app)
 
 
-from src.auth.utils import create_access_token  
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'redeemx.db'}", connect_args={"check_same_thread": False})
+    SQLModel.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
 
 @pytest.fixture
-def mock_auth_user():
-    return {"user_id": 1, "is_user": True}
+def accounts(engine):
+    with Session(engine) as session:
+        employee = User(name="Employee One", username="employee", password="Password123",
+                        email="employee@example.com", mobile_number="9876543210", emp_id="AJA001", is_user=True)
+        owner = User(name="Vendor Owner", username="vendor1", password="Password123",
+                     email="vendor1@example.com", mobile_number="9876543210", is_vendor=True)
+        vendor = Vendor(vendor_name="vendor1", qr_code="qr-code", user_id=owner.id, bank_name="Bank",
+                        account_holder_name="Owner", account_number="12345678", ifsc_code="ABCD0123456",
+                        branch_name="Main", aadhar_card="123456789012", pan_card="ABCDE1234F")
+        session.add_all([employee, owner, vendor])
+        session.commit()
+        return {"employee": employee.id, "vendor": vendor.id}
 
 
+@pytest.fixture(autouse=True)
+def async_session_override(engine):
+    async_engine = create_async_engine(engine.url.set(drivername="sqlite+aiosqlite"), poolclass=NullPool)
 
+    async def override_async_session():
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            yield session
 
-@pytest.fixture
-def mock_session():
-    return Mock(spec=Session)
+    app.dependency_overrides[get_async_session] = override_async_session
+    yield
+    app.dependency_overrides.clear()
 
-@pytest.fixture
-def auth_header(mock_auth_user):
+
+def give_points(engine, user_id, points):
+    with Session(engine) as session:
+        record_transaction(session, Transaction(user_id=user_id, points=points))
+        session.commit()
+
+
+def auth_header(user_id):
     """Generate a valid JWT token for authentication."""
-    token = create_access_token(data=mock_auth_user)  # Generate a proper JWT token
-    return {"Authorization": f"Bearer {token}"} # Simulated auth token
+    token = create_access_token(data={"user_id": user_id, "is_user": True})
+    return {"Authorization": f"Bearer {token}"}
 
-@pytest.fixture
-def transaction_input():
-    return {
-        "vendor_name": "vendor1",
-        "vendor_id": "2ec45e7a-8d6c-4bb7-9256-429975f556f9",
-        "points": 50
-    }
-
-def test_user_vendor_transaction_success(mock_session, auth_header, transaction_input):
-    app.dependency_overrides[get_session] = lambda: mock_session  
-
-    # Mock vendor and user points
-    mock_vendor = MagicMock()
-    mock_vendor.id = 2
-    mock_session.exec = Mock(side_effect=[
-        MagicMock(first=Mock(return_value=mock_vendor)),  # Vendor exists
-        MagicMock(first=Mock(return_value=100))  # User has enough points
-    ])
-
-    response = client.post(
+
+def redeem(user_id, points=50, vendor_name="vendor1"):
+    return client.post(
         "/api/v1/transaction/user/vendor/transaction",
-        json=transaction_input,
-        headers=auth_header  # Use properly generated JWT token
+        json={"vendor_name": vendor_name, "points": points},
+        headers=auth_header(user_id),
     )
 
+
+def ledger(engine, user_id):
+    with Session(engine) as session:
+        balance = session.exec(select(UserBalance.points).where(UserBalance.user_id == user_id)).first()
+        redemptions = session.exec(select(Transaction.points).where(Transaction.user_id == user_id,
+                                                                    Transaction.vendor_id.isnot(None))).all()
+        pending = session.exec(select(PendingTotal)).all()
+        return balance, redemptions, pending
+
+
+def test_user_vendor_transaction_success(engine, accounts):
+    give_points(engine, accounts["employee"], 100)
+
+    response = redeem(accounts["employee"])
+
     assert response.status_code == 201
     assert response.json()["message"] == "Points transfered successfully"
-    mock_session.add.assert_called_once()
-    mock_session.commit.assert_called_once()
+    # The debit is on the payer's row; the vendor's totals were applied from PendingTotal after the commit.
+    assert ledger(engine, accounts["employee"]) == (50, [-50], [])
+    with Session(engine) as session:
+        assert session.get(VendorBalance, accounts["vendor"]).received_points == 50
 
-    
 
-def test_user_vendor_transaction_no_vendor(mock_session, auth_header, transaction_input):
-    app.dependency_overrides[get_session] = lambda: mock_session  
+def test_user_vendor_transaction_no_vendor(engine, accounts):
+    give_points(engine, accounts["employee"], 100)
 
-    # Mock vendor not found
-    mock_session.exec = Mock(side_effect=[
-        MagicMock(first=Mock(return_value=None))  # Vendor does not exist
-    ])
-
-    response = client.post(
-        "/api/v1/transaction/user/vendor/transaction",
-        json=transaction_input,
-        headers=auth_header
-    )
+    response = redeem(accounts["employee"], vendor_name="nobody")
 
     assert response.status_code == 400
     assert response.json()["error"] == "No vendor details found"
-    mock_session.add.assert_not_called()
-    mock_session.commit.assert_not_called()
+    assert ledger(engine, accounts["employee"]) == (100, [], [])
 
 
-def test_user_vendor_transaction_no_points(mock_session, auth_header, transaction_input):
-    app.dependency_overrides[get_session] = lambda: mock_session  
+def test_user_vendor_transaction_no_points(engine, accounts):
+    response = redeem(accounts["employee"])
 
-    # Mock vendor exists but user has no points
-    mock_vendor = MagicMock()
-    mock_vendor.id = 2
-    mock_session.exec = Mock(side_effect=[
-        MagicMock(first=Mock(return_value=mock_vendor)),  
-        MagicMock(first=Mock(return_value=None))  # No points found
-    ])
+    assert response.status_code == 400
+    assert response.json()["error"] == "You don't have a points"
+    balance, redemptions, pending = ledger(engine, accounts["employee"])
+    assert (redemptions, pending) == ([], [])
 
-    response = client.post(
-        "/api/v1/transaction/user/vendor/transaction",
-        json=transaction_input,
-        headers=auth_header
-    )
+
+def test_user_vendor_transaction_insufficient_points(engine, accounts):
+    give_points(engine, accounts["employee"], 30)
+
+    response = redeem(accounts["employee"])
 
     assert response.status_code == 400
-    assert response.json()["error"] == "You don't have a points"
-    mock_session.add.assert_not_called()
-    mock_session.commit.assert_not_called()
+    assert response.json()["error"] == "You don't have a enough points"
+    assert ledger(engine, accounts["employee"]) == (30, [], [])
 
 
-def test_user_vendor_transaction_insufficient_points(mock_session, auth_header, transaction_input):
-    app.dependency_overrides[get_session] = lambda: mock_session  
+def test_guarded_debit_rejects_a_balance_spent_after_the_check(engine, accounts, monkeypatch):
+    give_points(engine, accounts["employee"], 30)
+    # The pre-check read a balance that a concurrent redemption has since spent.
+    monkeypatch.setattr(transaction_router_module, "get_user_balance", lambda session, user_id: 100)
+    redeem_points = transaction_router_module.redeem_points
+    rejected = []
 
-    # Mock vendor exists but user has insufficient points
-    mock_vendor = MagicMock()
-    mock_vendor.id = 2
-    mock_session.exec = Mock(side_effect=[
-        MagicMock(first=Mock(return_value=mock_vendor)),  
-        MagicMock(first=Mock(return_value=30))  # User has fewer points than required
-    ])
+    def guarded_redeem(*args):
+        try:
+            return redeem_points(*args)
+        except InsufficientPointsError as e:
+            rejected.append(e.available_points)
+            raise
 
-    response = client.post(
-        "/api/v1/transaction/user/vendor/transaction",
-        json=transaction_input,
-        headers=auth_header
-    )
+    monkeypatch.setattr(transaction_router_module, "redeem_points", guarded_redeem)
+
+    response = redeem(accounts["employee"])
 
     assert response.status_code == 400
     assert response.json()["error"] == "You don't have a enough points"
-    mock_session.add.assert_not_called()
-    mock_session.commit.assert_not_called()
+    assert rejected == [30]
+    assert ledger(engine, accounts["employee"]) == (30, [], [])
+    with Session(engine) as session:
+        assert session.get(VendorBalance, accounts["vendor"]) is None
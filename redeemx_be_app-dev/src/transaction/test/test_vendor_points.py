@@ -1,8 +1,10 @@
 import pytest
 from fastapi.testclient import TestClient
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, AsyncMock
 from main import app
 from src.auth.utils import create_access_token
+from src.database import get_async_session
+from src.vendor.models import VendorBalance
 
 client = TestClient(app)
 
@@ -21,12 +23,17 @@ def auth_header(admin_vendor):
 def mock_session():
     
     session = MagicMock()
+    session.exec = AsyncMock()
+    session.run_sync = AsyncMock()
+    app.dependency_overrides[get_async_session] = lambda: session
     yield session
+    app.dependency_overrides.pop(get_async_session, None)
 
 
 def test_vendor_with_points(auth_header, mock_session):
    
-    mock_session.exec.return_value.first.return_value = (100,)  
+    mock_session.exec.return_value.first.return_value = "vendor_id"
+    mock_session.run_sync.return_value = VendorBalance(vendor_id="vendor_id", received_points=100, claimed_points=40)
 
    
     response = client.get("/api/v1/transaction/vendor/points", headers=auth_header)
@@ -36,4 +43,4 @@ def test_vendor_with_points(auth_header, mock_session):
     print(response.json())
     assert "data" in response.json()
     assert "points" in response.json()["data"]  
-    assert response.json()["data"]["points"] == {}  
+    assert response.json()["data"]["points"] == 60
@@ -1,4 +1,5 @@
 from sqlmodel import Field, Relationship
+from sqlalchemy import Index
 from pydantic import EmailStr
 from typing import Optional, List
 
@@ -8,6 +9,16 @@ from src.models import BaseModel
 
 
 class User(BaseModel, table=True):
+    __table_args__ = (
+        # Admin employee and vendor listings, newest first.
+        Index("ix_user_is_user_created_at", "is_user", "created_at", "id"),
+        Index("ix_user_is_vendor_created_at", "is_vendor", "created_at", "id"),
+        # Listing search: a prefix LIKE on each column (email is covered by its unique index).
+        Index("ix_user_name", "name"),
+        Index("ix_user_username", "username"),
+        Index("ix_user_emp_id", "emp_id"),
+    )
+
     username: str = Field(..., 
                           min_length=3, 
                           max_length=30, 
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Response, Request,Query
+from fastapi import APIRouter, Response, Request,Query,Depends
 from sqlmodel import Session, select, or_,func
 import uuid
 from datetime import datetime,timedelta,date
@@ -6,14 +6,17 @@ import calendar
 
 
 from src.response import RestResponse
-from src.database import session
+from src.database import session, read_session
 from src.user.models import User
 from src.transaction.models import Transaction
+from src.transaction.service import get_user_balance
+from src.user.service import filter_users
 from src.user.utils import hash_password, verify_password
 from src.auth.dependencies import auth_user
 from src.user.schemas import ChangePasswordSchema,UserUpdate,TransactionUserSchema
 from src.user.schemas import TransactionUserSchema
 from src.vendor.models import Vendor
+from src.pagination import get_cursor_params, paginate, stream_ndjson
 from src.logging_config import logger
 
 
@@ -37,6 +40,7 @@ def user_create(user: User, response: Response, request: Request, session=sessio
         user.is_user = True
         session.add(user)
         session.commit()
+        # The response is built from the row as stored.
         session.refresh(user)
         response.status_code = 201
         response_data = user.dict()
@@ -51,22 +55,40 @@ def user_create(user: User, response: Response, request: Request, session=sessio
 
 
 @router.get("/get_all/users")
-def get_all_users(response: Response, request: Request, session=session, auth_user=auth_user):
+def get_all_users(response: Response, request: Request,
+    search: str = Query(None, description="Prefix of the name, username, email or employee id"),
+    session=read_session, auth_user=auth_user, pagination: dict = Depends(get_cursor_params)):
     request_info = f"{request.method}:{request.url.path} user:{auth_user['user_id']}"
     user_ip = request.client.host
     logger.info(f"Fetch all users attempt - Request: {request_info}, IP: {user_ip}")
     
     if auth_user.get("is_admin"):
-        users = session.exec(select(User).where(User.is_user == True)).all()
+        users, metadata = paginate(session, filter_users(select(User).where(User.is_user == True), search), User, pagination)
         response_data = users if users else []
         logger.info(f"Fetch all users successful - Request: {request_info}, IP: {user_ip}, Data count: {len(response_data)}")
-        return RestResponse(data=response_data)
+        return RestResponse(data=response_data, metadata=metadata)
     
     response.status_code = 401
     logger.error(f"Unauthorized access to fetch users - Request: {request_info}, IP: {user_ip}, Reason: Not authorized")
     return RestResponse(error="You are not authorized")
 
 
+@router.get("/get_all/users/stream")
+def stream_all_users(response: Response, request: Request,
+    search: str = Query(None, description="Prefix of the name, username, email or employee id"),
+    session=read_session, auth_user=auth_user):
+    request_info = f"{request.method}:{request.url.path} user:{auth_user['user_id']}"
+    user_ip = request.client.host
+    logger.info(f"Stream all users attempt - Request: {request_info}, IP: {user_ip}")
+
+    if auth_user.get("is_admin"):
+        return stream_ndjson(session, filter_users(select(User).where(User.is_user == True), search), User, lambda user: user)
+
+    response.status_code = 401
+    logger.error(f"Unauthorized access to stream users - Request: {request_info}, IP: {user_ip}, Reason: Not authorized")
+    return RestResponse(error="You are not authorized")
+
+
 
 @router.patch('/change-password')
 def user_change_password(data: ChangePasswordSchema,request:Request, response:Response, session=session, auth_user=auth_user):
@@ -87,7 +109,6 @@ def user_change_password(data: ChangePasswordSchema,request:Request, response:Re
     
     get_user.password = hash_password(data.new_password)
     session.commit()
-    session.refresh(get_user)
     logger.info(f"Password change successful - Request: {request_info}, IP: {user_ip}")
     return RestResponse(message="Password updated successfully")
 
@@ -97,7 +118,7 @@ def user_change_password(data: ChangePasswordSchema,request:Request, response:Re
 def get_recent_transaction(response: Response,request:Request,                    
     start_date: datetime = Query(None, description="Start date for the transactions"),
     end_date: datetime = Query(None, description="End date for the transactions"),
-    session=session, auth_user=auth_user):
+    session=read_session, auth_user=auth_user, pagination: dict = Depends(get_cursor_params)):
     
     request_info =  f"{request.method}:{request.url.path} user:{auth_user['user_id']}"
     user_ip = request.client.host
@@ -130,9 +151,8 @@ def get_recent_transaction(response: Response,request:Request,
         .where(Transaction.user_id == auth_user.get("user_id"),
                Transaction.created_at >= start_date,
                Transaction.created_at <= end_date)
-        .order_by(Transaction.created_at.desc())
     )
-    transactions = session.exec(transaction_query).all()
+    transactions, metadata = paginate(session, transaction_query, Transaction, pagination)
     all_transactions = [
         
         TransactionUserSchema(
@@ -145,14 +165,14 @@ def get_recent_transaction(response: Response,request:Request,
     ]
     
     logger.info(f"Recent transactions fetched successfully - Request: {request_info}, IP: {user_ip}, Transactions count: {len(all_transactions)}")
-    return RestResponse(data=all_transactions)
+    return RestResponse(data=all_transactions, metadata=metadata)
 
 
 @router.get('/credit-transactions')
 def get_credit_transaction(response: Response,request:Request, start_date: datetime = Query(None, 
                         description="Start date for the transactions"),
     end_date: datetime = Query(None, description="End date for the transactions"),
-    session=session, auth_user=auth_user):
+    session=read_session, auth_user=auth_user, pagination: dict = Depends(get_cursor_params)):
     
     request_info =  f"{request.method}:{request.url.path} user:{auth_user['user_id']}"
     user_ip = request.client.host
@@ -179,15 +199,15 @@ def get_credit_transaction(response: Response,request:Request, start_date: datet
         start_date = datetime.combine(start_date, datetime.min.time())
         end_date = datetime.combine(end_date, datetime.max.time())
 
-    credited = session.exec(
+    credited, metadata = paginate(session,
         select(Transaction).where(Transaction.user_id == auth_user.get("user_id"), Transaction.points > 0,
-        Transaction.created_at >= start_date, Transaction.created_at <= end_date)
-        .order_by(Transaction.created_at.desc())).all()
+        Transaction.created_at >= start_date, Transaction.created_at <= end_date),
+        Transaction, pagination)
     
     credited_points = [TransactionUserSchema(name="Admin", date=credit.created_at, points=credit.points,description=credit.description) for credit in credited]
     
     logger.info(f"Credit transactions fetched successfully - Request: {request_info}, IP: {user_ip}, Transactions count: {len(credited_points)}")
-    return RestResponse(data=credited_points)
+    return RestResponse(data=credited_points, metadata=metadata)
 
 
 @router.get("/all/points")
@@ -199,7 +219,7 @@ def all_points(
     end_date: datetime = Query(None, description="End date in YYYY-MM-DD format"),
     month: int = Query(None, description="Month number (1-12)"),
     year: int = Query(None, description="Year (e.g., 2024)"),
-    session=session,
+    session=read_session,
     auth_user=auth_user
 ):
     request_info = f"{request.method}:{request.url.path} user:{auth_user['user_id']}"
@@ -242,9 +262,7 @@ def all_points(
         logger.error(f"User not found - Request: {request_info}, IP: {user_ip}, Reason: User details not found")
         return RestResponse(error="User details not found")
     
-    total_points = session.exec(
-        select(func.sum(Transaction.points)).where(Transaction.user_id == user_id)
-    ).first()
+    total_points = get_user_balance(session, user_id)
     
     total_credited_points = session.exec(
         select(func.sum(Transaction.points)).where(
@@ -280,7 +298,7 @@ def all_points(
 def get_debit_transaction(response:Response,request: Request, start_date: datetime = Query(None, 
                         description="Start date for the transactions"),
     end_date: datetime = Query(None, description = "End date for the transactions"),
-    session= session,auth_user=auth_user, ):
+    session=read_session,auth_user=auth_user, pagination: dict = Depends(get_cursor_params)):
 
     request_info = f"{request.method}:{request.url.path} user:{auth_user['user_id']}"
     user_ip = request.client.host
@@ -308,27 +326,26 @@ def get_debit_transaction(response:Response,request: Request, start_date: dateti
         end_date = datetime.combine(end_date, datetime.max.time())
         
     debited_query = (
-        select(Transaction).where(Transaction.user_id == auth_user.get("user_id"), Transaction.points < 0,
-        Transaction.created_at>=start_date,Transaction.created_at<=end_date)
-        .order_by(Transaction.created_at.desc()))
+        select(Transaction.id, Transaction.created_at, Transaction.points, Transaction.description, Vendor.vendor_name)
+        .join(Vendor, Vendor.id == Transaction.vendor_id, isouter=True)
+        .where(Transaction.user_id == auth_user.get("user_id"), Transaction.points < 0,
+        Transaction.created_at>=start_date,Transaction.created_at<=end_date))
 
     
-    debited = session.exec(debited_query).all()
+    debited, metadata = paginate(session, debited_query, Transaction, pagination)
     debited_points = [{
-        "name":"Admin" if transaction.vendor_id is None else session.exec(
-            select(Vendor.vendor_name).where(Vendor.id == transaction.vendor_id)
-        ).first(),
+        "name":transaction.vendor_name or "Admin",
         "date":transaction.created_at,
         "points":transaction.points,
         "description":transaction.description
     }for transaction in debited]
     logger.info(f"Debit transactions retrieved - Request: {request_info}, IP: {user_ip}, Total Transactions: {len(debited_points)}")
     
-    return RestResponse(data = debited_points)
+    return RestResponse(data = debited_points, metadata=metadata)
 
 
 @router.get("/vendor/details")
-def get_vendor_details(response: Response, request: Request, session=session, auth_user=auth_user):
+def get_vendor_details(response: Response, request: Request, session=read_session, auth_user=auth_user):
     request_info = f"{request.method}:{request.url.path} user:{auth_user.get('user_id')}"
     user_ip = request.client.host
     logger.info(f"Vendor details request - Request: {request_info}, IP: {user_ip}")
@@ -0,0 +1,25 @@
+from sqlmodel import or_
+
+from src.user.models import User
+
+LIKE_ESCAPE = "\\"
+
+
+def escape_like(text:str) -> str:
+    """text with LIKE wildcards escaped, so it only matches itself."""
+    return text.replace(LIKE_ESCAPE, LIKE_ESCAPE * 2).replace("%", LIKE_ESCAPE + "%").replace("_", LIKE_ESCAPE + "_")
+
+
+def filter_users(query, search:str=None):
+    """Prefix match on name, username, email or employee id.
+
+    The columns' case-insensitive collation makes the match ignore case, and a
+    plain `col LIKE 'text%'` can use each column's index.
+    """
+    if search:
+        pattern = f"{escape_like(search.strip())}%"
+        query = query.where(or_(User.name.like(pattern, escape=LIKE_ESCAPE),
+                                User.username.like(pattern, escape=LIKE_ESCAPE),
+                                User.email.like(pattern, escape=LIKE_ESCAPE),
+                                User.emp_id.like(pattern, escape=LIKE_ESCAPE)))
+    return query
@@ -1,8 +1,21 @@
 from passlib.context import CryptContext
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from fastapi.concurrency import run_in_threadpool
 from datetime import datetime, timedelta
+from typing import Optional, Tuple
+import asyncio
+import os
+
+# bcrypt cost factor. Hashes made with any other cost are rehashed on the next successful login.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# Processes that verify passwords for /auth/login; 0 verifies in the request threadpool instead.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
 
 # Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__default_rounds=BCRYPT_ROUNDS,
+                           bcrypt__min_rounds=BCRYPT_ROUNDS, bcrypt__max_rounds=BCRYPT_ROUNDS)
+_password_pool = None
 
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
@@ -12,6 +25,38 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_rehash(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password and, when its hash uses another cost, return a replacement hash."""
+    if not pwd_context.verify(plain_password, hashed_password):
+        return False, None
+    if pwd_context.needs_update(hashed_password):
+        return True, pwd_context.hash(plain_password)
+    return True, None
+
+
+def password_pool() -> ProcessPoolExecutor:
+    global _password_pool
+    if _password_pool is None:
+        # spawn, not fork: the server process already runs threads (scheduler, anyio workers).
+        _password_pool = ProcessPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, mp_context=get_context("spawn"))
+    return _password_pool
+
+
+async def verify_password_in_pool(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """verify_and_rehash on the password process pool, so bcrypt never holds a request thread or the event loop."""
+    if PASSWORD_HASH_WORKERS <= 0:
+        return await run_in_threadpool(verify_and_rehash, plain_password, hashed_password)
+    return await asyncio.get_running_loop().run_in_executor(password_pool(), verify_and_rehash,
+                                                            plain_password, hashed_password)
+
+
+def shutdown_password_pool():
+    global _password_pool
+    if _password_pool is not None:
+        _password_pool.shutdown(cancel_futures=True)
+        _password_pool = None
+
+
 def generate_password(name:str, emp_id:str) -> str:
     password = name+'@'+emp_id
     return hash_password(password)
@@ -1,41 +1,168 @@
 #Api for adding user using excel data
 from fastapi import  UploadFile, HTTPException, APIRouter
-import pandas as pd
+from sqlalchemy import func, insert, or_
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select
+from datetime import datetime
+from zoneinfo import ZoneInfo
+import uuid
+import os
+
 from src.database import session
+from src.user import utils as password_utils
 from src.user.utils import generate_password
 from src.user.models import User
+from src.jobs.service import submit_job, job_handler, open_payload, load_checkpoint, commit_checkpoint
+from src.logging_config import logger
 
 router = APIRouter()
 
-@router.post("/user/data/upload-excel/")
-async def upload_excel(file: UploadFile, session=session):
+# Employees hashed and inserted per round trip during CSV onboarding.
+USER_UPLOAD_BATCH_SIZE = int(os.getenv("USER_UPLOAD_BATCH_SIZE", "1000"))
+
+UPLOAD_COLUMNS = ["Emp ID", "Name", "Official Mobile Number", "Email"]
+USERNAME_PATTERN = r"^[a-zA-Z0-9_.-]{3,30}$"
+EMAIL_PATTERN = r"^[^@\s]+@[^@\s]+\.[^@\s]+$"
+
+
+def validate_upload_rows(df):
+    """Clean the upload columns and return (df, errors), where errors maps a row index to its problems."""
+    df = df[UPLOAD_COLUMNS].copy()
+    df.columns = ["emp_id", "name", "mobile_number", "email"]
+    # The name is kept as given: it is part of the default password (name@emp_id).
+    for column in ("emp_id", "mobile_number", "email"):
+        df[column] = df[column].str.strip()
+    # Spreadsheets often save phone numbers as floats.
+    df["mobile_number"] = df["mobile_number"].str.replace(r"\.0+$", "", regex=True)
+
+    checks = [
+        (~df["emp_id"].str.fullmatch(USERNAME_PATTERN),
+         "Emp ID must be 3-30 letters, numbers, underscores, dots or hyphens"),
+        (~df["name"].str.strip().str.len().between(3, 50), "Name must be between 3 and 50 characters long"),
+        (~df["mobile_number"].str.fullmatch(r"\d{10}"), "Mobile number must be exactly 10 digits long"),
+        (~df["email"].str.fullmatch(EMAIL_PATTERN), "Email is not a valid email address"),
+        (df["emp_id"].ne("") & df["emp_id"].duplicated(keep="first"), "Emp ID appears earlier in the file"),
+        (df["email"].ne("") & df["email"].str.lower().duplicated(keep="first"), "Email appears earlier in the file"),
+    ]
+    errors = {}
+    for failed, message in checks:
+        for index in df.index[failed]:
+            errors.setdefault(index, []).append(message)
+    return df, errors
+
+
+def find_existing_users(session, rows):
+    """Return the emp IDs and the lowercased emails in rows that are already registered, emails matched ignoring case."""
+    emp_ids = [row["emp_id"] for row in rows]
+    emails = [row["email"].lower() for row in rows]
+    existing = session.exec(
+        select(User.username, User.emp_id, User.email)
+        .where(or_(User.username.in_(emp_ids), User.emp_id.in_(emp_ids), func.lower(User.email).in_(emails)))
+    ).all()
+    taken_ids = {value for user in existing for value in (user.username, user.emp_id) if value}
+    taken_emails = {user.email.lower() for user in existing}
+    return taken_ids, taken_emails
+
+
+def hash_passwords(rows):
+    """bcrypt every row's default password, across the password process pool when one is configured."""
+    names = [row["name"] for row in rows]
+    emp_ids = [row["emp_id"] for row in rows]
+    workers = password_utils.PASSWORD_HASH_WORKERS
+    if workers <= 0:
+        return list(map(generate_password, names, emp_ids))
+    chunksize = max(1, len(rows) // (workers * 4))
+    return list(password_utils.password_pool().map(generate_password, names, emp_ids, chunksize=chunksize))
+
+
+def insert_users(session, rows, errors):
+    """Insert rows in one statement; if that conflicts, retry one row at a time so only the bad rows fail."""
+    try:
+        with session.begin_nested():
+            session.execute(insert(User), [row["values"] for row in rows])
+        return len(rows)
+    except IntegrityError:
+        pass
+    inserted = 0
+    for row in rows:
+        try:
+            with session.begin_nested():
+                session.execute(insert(User), [row["values"]])
+            inserted += 1
+        except IntegrityError as e:
+            errors.setdefault(row["index"], []).append(f"Could not be saved: {e.orig}")
+    return inserted
+
+
+@job_handler("user.import")
+def import_employees(session, job, progress):
+    """Register every valid row of an employee CSV. Returns (summary, rejected rows with their reasons)."""
+    # pandas takes ~0.3s to import; load it on the first upload rather than at startup.
+    import pandas as pd
+    try:
+        with open_payload(job) as file:
+            df = pd.read_csv(file, dtype=str, keep_default_na=False)
+    except (pd.errors.EmptyDataError, pd.errors.ParserError, UnicodeDecodeError) as e:
+        raise ValueError(f"Could not read the CSV file: {e}")
+    missing = [column for column in UPLOAD_COLUMNS if column not in df.columns]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+
+    df, errors = validate_upload_rows(df)
+    valid = df.drop(index=list(errors))
+    rows = [{"index": index, **row} for index, row in zip(valid.index, valid.to_dict("records"))]
+    # Rows rejected by validation count as processed from the start.
+    rejected = len(df) - len(rows)
+
+    # An earlier attempt of this job committed some batches: take its counts and row errors
+    # rather than reporting the employees it registered as already registered.
+    checkpoint = load_checkpoint(job)
+    resume = checkpoint.get("next_row", 0)
+    inserted = checkpoint.get("inserted", 0)
+    errors.update({int(index): messages for index, messages in checkpoint.get("errors", {}).items()})
+    progress(rejected + resume, len(df), "Registering employees")
+
+    for start in range(resume, len(rows), USER_UPLOAD_BATCH_SIZE):
+        batch = rows[start:start + USER_UPLOAD_BATCH_SIZE]
+        taken_ids, taken_emails = find_existing_users(session, batch)
+        fresh = []
+        for row in batch:
+            if row["emp_id"] in taken_ids:
+                errors.setdefault(row["index"], []).append("Emp ID is already registered")
+            elif row["email"].lower() in taken_emails:
+                errors.setdefault(row["index"], []).append("Email is already registered")
+            else:
+                fresh.append(row)
+        if fresh:
+            now = datetime.now(ZoneInfo("Asia/Kolkata"))
+            for row, password in zip(fresh, hash_passwords(fresh)):
+                row["values"] = {
+                    "id": str(uuid.uuid4()), "created_at": now, "emp_id": row["emp_id"],
+                    "username": row["emp_id"], "name": row["name"], "email": row["email"],
+                    "mobile_number": row["mobile_number"], "password": password,
+                    "is_user": True, "is_vendor": False, "is_admin": False,
+                }
+            inserted += insert_users(session, fresh, errors)
+        # Commit per batch so a large file holds neither locks nor a long transaction.
+        commit_checkpoint(session, job, {"next_row": start + len(batch), "inserted": inserted,
+                                         "errors": {str(index): messages for index, messages in errors.items()}})
+        progress(rejected + start + len(batch))
+
+    # Row numbers match the spreadsheet: the header is row 1.
+    report = [
+        {"row": int(index) + 2, "emp_id": df.at[index, "emp_id"], "errors": errors[index]}
+        for index in sorted(errors)
+    ]
+    return {"total_rows": len(df), "inserted": inserted, "failed": len(report)}, report
+
+
+@router.post("/user/data/upload-excel/", status_code=202)
+def upload_excel(file: UploadFile, session=session):
 
     if not file.filename.endswith(".csv"):
         raise HTTPException(status_code=400, detail="Only .csv files are allowed.")
 
-    try:
-        df = pd.read_csv(file.file)
-        for index, row in df.iterrows():
-            emp_id = str(row["Emp ID"]) if str(row["Emp ID"]) else "NA"
-            username = str(row["Emp ID"]) if str(row["Emp ID"]) else "NA"
-            name = row["Name"] if row["Name"] else "NA"
-            mobile_number = int(row["Official Mobile Number"]) if int(row["Official Mobile Number"]) else 9999999999
-            email = row["Email"]
-            hash_password = generate_password(name, emp_id)
-
-            user = User(
-                emp_id=emp_id,
-                name=name,
-                mobile_number=str(mobile_number),
-                email=email,
-                password=hash_password,
-                is_user = True,
-                username = username
-            )
-         
-            session.add(user)
-        session.commit()
-
-        return {"message": "Excel data successfully loaded into the database."}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"An error occurred: {e}")
+    job = submit_job(session, "user.import", payload=file.file, filename=file.filename)
+    logger.info(f"Employee upload '{file.filename}' queued as job {job.id}")
+    return {"message": "Upload accepted; poll the job for progress and the rejected rows.",
+            "job_id": job.id, "status_url": f"/api/v1/jobs/{job.id}"}